@@ -0,0 +1,134 @@
+"""
+実数データのキューブ（cube.WageCube）の切り出し速度を比較するベンチマーク。
+
+毎勤原表の整形済みデータを模した合成データ（小計行・改訂による重複行を含む）を生成し、
+従来の切り出し（オブジェクト型の列に対する真偽値マスク）と
+cube.get() の処理時間を比較し、結果が一致することを確認する。
+
+実行方法:
+    python benchmarks/bench_cube.py [月数]
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "extract"))
+
+from cube import WageCube  # noqa: E402
+from schema import apply_schema, table_dtypes  # noqa: E402
+
+
+INDUSTRIES = ['T', '0', '1', '3', '4', '5', '7', '9']
+GENDERS = ['T', 'M', 'F']
+EMPLOYMENT_TYPES = ['T', 'N', 'P']
+
+
+def make_frame(n_months: int, seed: int = 0) -> pd.DataFrame:
+    """
+    整形済みの実数データを模した合成データを生成する
+
+    実データと同じく、次元のコードが空の小計行（産業コード・性別がNULL）と、
+    改訂で後から差し込まれた同じセルの行を含み、列はスキーマの型（時間はfloat32）にそろえる。
+
+    Args:
+        n_months: 月数
+        seed: 乱数シード
+
+    Returns:
+        英文字カラム名のDataFrame
+    """
+    rng = random.Random(seed)
+    months = [str(p) for p in pd.period_range('2024-01', periods=n_months, freq='M')]
+
+    rows = []
+    for month in months:
+        for industry in INDUSTRIES:
+            for gender in GENDERS:
+                for employment_type in EMPLOYMENT_TYPES:
+                    rows.append({
+                        'year_month': month,
+                        'industry_code': industry,
+                        'gender': gender,
+                        'employment_type': employment_type,
+                        'total_cash_earnings': rng.randrange(100_000, 600_000),
+                        'overtime_hours': round(rng.uniform(0, 20), 1),
+                    })
+        # 小計行（産業コード・性別がNULL）
+        rows.append({
+            'year_month': month,
+            'industry_code': None,
+            'gender': None,
+            'employment_type': 'T',
+            'total_cash_earnings': rng.randrange(100_000, 600_000),
+            'overtime_hours': round(rng.uniform(0, 20), 1),
+        })
+
+    # 改訂: 最初の月の調査産業計・男女計・就業形態計を後から差し込む
+    rows.append({
+        'year_month': months[0],
+        'industry_code': 'T',
+        'gender': 'T',
+        'employment_type': 'T',
+        'total_cash_earnings': 999_999,
+        'overtime_hours': 9.9,
+    })
+
+    return apply_schema(pd.DataFrame(rows), table_dtypes('actual_wages'))
+
+
+def mask_select(df: pd.DataFrame, gender: str, employment_type: str) -> pd.DataFrame:
+    """従来の切り出し（全行に対する真偽値マスク）"""
+    return df[(df['gender'] == gender) & (df['employment_type'] == employment_type)]
+
+
+def measure(func, repeat: int = 20) -> float:
+    """最短実行時間（秒）を返す"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    n_months = int(sys.argv[1]) if len(sys.argv) > 1 else 240
+
+    print("=" * 100)
+    print(f"キューブ ベンチマーク（{n_months}ヶ月）")
+    print("=" * 100)
+
+    df = make_frame(n_months)
+    cube = WageCube.from_frame(df)
+
+    # 小計行は含まず、重複したセルは後の行の値を使う
+    # （float32の時間はカラム定義の桁数で丸めて元の値に戻る）
+    expected_shape = (n_months, len(INDUSTRIES), len(GENDERS), len(EMPLOYMENT_TYPES))
+    assert cube.shape == expected_shape, cube.shape
+    assert cube.get('total_cash_earnings', cube.months[0], 'T', 'T', 'T') == 999_999
+    assert cube.get('overtime_hours', cube.months[0], 'T', 'T', 'T') == 9.9
+
+    # 結果の一致（重複と小計行を除いた行と比較）
+    deduped = df.dropna(subset=['industry_code', 'gender']).drop_duplicates(
+        subset=['year_month', 'industry_code', 'gender', 'employment_type'], keep='last'
+    )
+    legacy = mask_select(deduped, 'F', 'P').set_index(['year_month', 'industry_code'])['total_cash_earnings']
+    sliced = cube.get('total_cash_earnings', gender='F', employment_type='P')
+    for (month, industry), value in legacy.items():
+        assert sliced[cube.position('month', month), cube.position('industry', industry)] == value
+
+    legacy_time = measure(lambda: mask_select(deduped, 'F', 'P'))
+    cube_time = measure(lambda: cube.get('total_cash_earnings', gender='F', employment_type='P'))
+
+    print(f"行数: {len(df):,}（小計行 {n_months}行・重複 1行を含む）  キューブ: {cube.shape}  {cube.nbytes / 1e6:.2f}MB")
+    print(f"真偽値マスク: {legacy_time * 1e3:8.3f}ミリ秒")
+    print(f"cube.get():   {cube_time * 1e3:8.3f}ミリ秒")
+    print(f"速度比: {legacy_time / cube_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+EStatAPIClient.json_to_dataframe の変換速度を比較するベンチマーク。
+
+e-Stat APIのVALUE配列を模した合成データを生成し、以下の処理時間・メモリ使用量を比較する。
+
+- 従来の変換: pd.DataFrame(values) + 後から数値変換（型付けなし）
+- 従来の変換 + 型付け: 従来の変換の後に次元の列をカテゴリ型にする（values_to_dataframeと同じ結果）
+- 型付きの変換: values_to_dataframe（DataFrameを1回作り、型付けした列から組み直す）
+
+実行方法:
+    python benchmarks/bench_json_to_dataframe.py [行数]
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "extract"))
+
+from client import values_to_dataframe  # noqa: E402
+
+
+def make_values(n_rows: int, seed: int = 0) -> list:
+    """
+    e-Stat APIのVALUE配列を模した合成データを生成する
+
+    Args:
+        n_rows: 生成する行数
+        seed: 乱数シード
+
+    Returns:
+        VALUE行（辞書）のリスト
+    """
+    rng = random.Random(seed)
+    cat01 = [f"{i:03d}" for i in range(40)]
+    areas = [f"{i:02d}000" for i in range(48)]
+    times = [f"{y}00{m:02d}{m:02d}" for y in range(2000, 2026) for m in range(1, 13)]
+    markers = ["-", "***", "x"]
+
+    values = []
+    for _ in range(n_rows):
+        value = markers[rng.randrange(3)] if rng.random() < 0.02 else f"{rng.uniform(0, 1e6):.1f}"
+        values.append({
+            "@tab": "01",
+            "@cat01": rng.choice(cat01),
+            "@area": rng.choice(areas),
+            "@time": rng.choice(times),
+            "@unit": "円",
+            "$": value,
+        })
+    return values
+
+
+def legacy_convert(values: list) -> pd.DataFrame:
+    """従来の変換（オブジェクト型のDataFrameを作ってから数値化）"""
+    df = pd.DataFrame(values)
+    df["$"] = pd.to_numeric(df["$"], errors="coerce")
+    return df
+
+
+def legacy_typed_convert(values: list) -> pd.DataFrame:
+    """従来の変換の後に、values_to_dataframeと同じ型にそろえる"""
+    df = legacy_convert(values)
+    for column in df.columns:
+        if column != "$":
+            df[column] = df[column].astype("category")
+    return df
+
+
+def measure(func, values: list, repeat: int = 3):
+    """最短実行時間と結果DataFrameのメモリ使用量を返す"""
+    best = float("inf")
+    df = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = func(values)
+        best = min(best, time.perf_counter() - start)
+    return best, df.memory_usage(deep=True).sum()
+
+
+def main():
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+
+    print("=" * 100)
+    print(f"json_to_dataframe ベンチマーク（{n_rows:,}行）")
+    print("=" * 100)
+
+    values = make_values(n_rows)
+
+    # 結果の一致（period列を除く）
+    expected = legacy_typed_convert(values)
+    typed = values_to_dataframe(values)
+    pd.testing.assert_frame_equal(typed[expected.columns], expected, check_categorical=False)
+
+    legacy_time, legacy_mem = measure(legacy_convert, values)
+    legacy_typed_time, legacy_typed_mem = measure(legacy_typed_convert, values)
+    typed_time, typed_mem = measure(values_to_dataframe, values)
+
+    print(f"従来の変換:           {legacy_time:8.3f}秒  {legacy_mem / 1e6:8.1f}MB")
+    print(f"従来の変換 + 型付け:  {legacy_typed_time:8.3f}秒  {legacy_typed_mem / 1e6:8.1f}MB")
+    print(f"型付きの変換:         {typed_time:8.3f}秒  {typed_mem / 1e6:8.1f}MB（period列を含む）")
+    print(f"速度比（従来の変換 / 型付き）:          {legacy_time / typed_time:.2f}x  メモリ比: {legacy_mem / typed_mem:.2f}x")
+    print(f"速度比（従来の変換 + 型付け / 型付き）: {legacy_typed_time / typed_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
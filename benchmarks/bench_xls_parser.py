@@ -0,0 +1,92 @@
+"""
+毎勤原表（.xls）の読み込み速度を比較するベンチマーク。
+
+ダウンロード済みの毎勤原表ファイルを使い、
+従来の読み込み（pd.read_excel + iloc + 列ごとのpd.to_numeric）と
+xls_parser.read_actual_wages_sheet の処理時間を比較し、結果が一致することを確認する。
+
+実行方法（リポジトリルートから）:
+    python src/extract/download_historical_actual_data.py   # 先に毎勤原表を取得
+    python benchmarks/bench_xls_parser.py [Excelファイル ...]
+
+ファイルを省略した場合は data/temp_historical/*.xls を使う。
+"""
+
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src" / "extract"))
+
+from extraction import ACTUAL_WAGES_COLUMNS, ACTUAL_WAGES_NUMERIC_COLUMNS  # noqa: E402
+from xls_parser import read_actual_wages_sheet  # noqa: E402
+
+
+def legacy_parse(excel_path: Path) -> pd.DataFrame:
+    """従来の読み込み処理（download_*.py の process_excel_to_dataframe と同じ）"""
+    df = pd.read_excel(excel_path, sheet_name=0, engine='xlrd', header=None)
+
+    df_data = df.iloc[6:].copy()
+    df_data.columns = ACTUAL_WAGES_COLUMNS
+    df_data = df_data.reset_index(drop=True)
+
+    df_data = df_data.iloc[1:].copy()
+    df_data = df_data.reset_index(drop=True)
+
+    for col in ACTUAL_WAGES_NUMERIC_COLUMNS:
+        df_data[col] = pd.to_numeric(df_data[col], errors='coerce')
+
+    return df_data.dropna(how='all', subset=ACTUAL_WAGES_NUMERIC_COLUMNS)
+
+
+def fast_parse(excel_path: Path) -> pd.DataFrame:
+    """xls_parser による読み込み"""
+    return read_actual_wages_sheet(excel_path, ACTUAL_WAGES_COLUMNS)
+
+
+def measure(func, paths: list, repeat: int = 3) -> float:
+    """全ファイルを読み込む時間の最短値（秒）を返す（読み込み時のログは表示しない）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for path in paths:
+                func(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    paths = [Path(p) for p in sys.argv[1:]] or sorted(Path("data/temp_historical").glob("*.xls"))
+
+    if not paths:
+        print("毎勤原表のExcelファイルが見つかりません。")
+        print("先に download_historical_actual_data.py を実行するか、ファイルを引数で指定してください。")
+        return 1
+
+    print("=" * 100)
+    print(f"毎勤原表 読み込みベンチマーク（{len(paths)}ファイル）")
+    print("=" * 100)
+
+    # 結果が一致することを確認
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = legacy_parse(paths[0]).reset_index(drop=True)
+        actual = fast_parse(paths[0])
+    pd.testing.assert_frame_equal(actual, expected)
+    print(f"✓ 結果が一致しました: {paths[0].name}（{len(actual):,}行）")
+
+    legacy_time = measure(legacy_parse, paths)
+    fast_time = measure(fast_parse, paths)
+
+    print(f"従来の読み込み: {legacy_time:8.3f}秒")
+    print(f"高速パーサー:   {fast_time:8.3f}秒")
+    print(f"速度比: {legacy_time / fast_time:.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
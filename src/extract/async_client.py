@@ -0,0 +1,412 @@
+"""
+Asynchronous e-Stat API client for fetching many tables concurrently.
+
+AsyncEStatAPIClient mirrors the surface of EStatAPIClient
+(get_stats_data / get_stats_list / fetch_and_transform, plus page and value
+iterators) on top of httpx.AsyncClient. One client holds a pooled set of
+keep-alive connections, so fanning out over many StatConfigs from a single
+event loop only pays connection setup once per pooled connection:
+
+    async with AsyncEStatAPIClient() as client:
+        frames = await asyncio.gather(
+            *(client.fetch_and_transform(config, typed=True) for config in configs)
+        )
+
+Requests follow the same RetryPolicy and CircuitBreaker as the synchronous
+Transport. httpx is an optional dependency (``pip install httpx``).
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from urllib.parse import urlparse
+
+import pandas as pd
+
+from client import (
+    EStatAPIClient,
+    StatConfig,
+    class_inf_from_meta_info,
+    class_inf_key,
+    is_cacheable_response,
+    remember_class_inf,
+    stats_data_params,
+    stats_list_params,
+    values_to_dataframe,
+)
+from dimensions import DimensionIndex
+from metadata_cache import MetadataCache, make_key
+from transport import CircuitBreaker, RetryPolicy, parse_retry_after
+
+
+# Maximum number of simultaneous connections held by one client
+DEFAULT_MAX_CONNECTIONS = 10
+
+# Request timeout in seconds
+DEFAULT_TIMEOUT = 60.0
+
+
+class AsyncEStatAPIClient:
+    """
+    Asynchronous client for the e-Stat API.
+
+    Attributes:
+        api_key: API key for e-Stat authentication
+        client: Underlying httpx.AsyncClient (connection pool)
+        policy: Retry policy for transient failures
+        breaker: Per-host circuit breaker (can be shared with a Transport)
+        metadata_cache: TTL + LRU cache for table lists and CLASS_INF, or None
+    """
+
+    BASE_URL = EStatAPIClient.BASE_URL
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        timeout: float = DEFAULT_TIMEOUT,
+        policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        cache_metadata: bool = True
+    ):
+        """
+        Initialize the asynchronous e-Stat API client.
+
+        Args:
+            api_key: e-Stat API key. If not provided, reads from ESTAT_API_KEY env var.
+            max_connections: Size of the connection pool; also bounds how many
+                requests are in flight at once
+            timeout: Request timeout in seconds
+            policy: Retry policy. Defaults to the standard RetryPolicy.
+            breaker: Circuit breaker. Defaults to a new CircuitBreaker.
+            metadata_cache: Cache for get_stats_list() and CLASS_INF; can be
+                shared with synchronous clients
+            cache_metadata: If False and no metadata_cache is given, metadata
+                is requested every time.
+
+        Raises:
+            ValueError: If API key is not provided or found in environment.
+            ImportError: If httpx is not installed.
+        """
+        self.api_key = api_key or os.getenv("ESTAT_API_KEY")
+        if not self.api_key:
+            raise ValueError(
+                "API key is required. Provide via argument or ESTAT_API_KEY env var."
+            )
+
+        try:
+            import httpx
+        except ImportError as e:
+            raise ImportError("AsyncEStatAPIClient requires httpx (pip install httpx)") from e
+
+        self._httpx = httpx
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            ),
+            timeout=timeout
+        )
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.metadata_cache = metadata_cache or (MetadataCache() if cache_metadata else None)
+
+    async def _get_json(self, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a GET request and decode the JSON body, retrying transient failures.
+
+        Args:
+            endpoint: Request URL
+            params: Query parameters
+
+        Returns:
+            JSON response as a dictionary
+
+        Raises:
+            httpx.HTTPStatusError: If the API returns an error status
+            httpx.TransportError: If the API cannot be reached after retrying
+            transport.CircuitOpenError: If the circuit breaker is open
+        """
+        host = urlparse(endpoint).netloc
+        waited = 0.0
+        attempt = 0
+
+        while True:
+            trial = self.breaker.before_request(host)
+
+            try:
+                response = await self.client.get(endpoint, params=params)
+            except self._httpx.TransportError:
+                delay = self.policy.next_delay(attempt, waited)
+                # One breaker failure per request that exhausted its retries
+                # (a failed half-open trial re-opens the breaker at once)
+                if delay is None or trial:
+                    self.breaker.record_failure(host)
+                if delay is None:
+                    raise
+            except BaseException:
+                # Cancellation or a programming error is not a host failure
+                if trial:
+                    self.breaker.release_trial(host)
+                raise
+            else:
+                if response.status_code not in self.policy.status_codes:
+                    self.breaker.record_success(host)
+                    break
+
+                delay = self.policy.next_delay(
+                    attempt, waited, parse_retry_after(response.headers.get("Retry-After"))
+                )
+                if delay is None or trial:
+                    self.breaker.record_failure(host)
+                if delay is None:
+                    break
+
+            await asyncio.sleep(delay)
+            waited += delay
+            attempt += 1
+
+        response.raise_for_status()
+
+        try:
+            return response.json()
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON response from API: {e}")
+
+    async def get_stats_data(
+        self,
+        config: StatConfig,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Fetch a single page of statistical data (see EStatAPIClient.get_stats_data).
+
+        Args:
+            config: Configuration object specifying which data to retrieve
+            **kwargs: Additional query parameters for the API
+
+        Returns:
+            JSON response from the API as a dictionary
+        """
+        endpoint = f"{self.BASE_URL}/getStatsData"
+        params = stats_data_params(self.api_key, config, **kwargs)
+
+        json_response = await self._get_json(endpoint, params)
+        if self.metadata_cache is not None:
+            remember_class_inf(self.metadata_cache, params, json_response)
+
+        return json_response
+
+    async def iter_stats_pages(
+        self,
+        config: StatConfig,
+        prefetch: bool = True,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over every page of a statistical table.
+
+        Args:
+            config: Configuration object specifying which data to retrieve
+            prefetch: If True, request the next page as a background task
+                while the caller processes the current one
+            **kwargs: Additional query parameters for the API
+
+        Yields:
+            JSON response for each page as a dictionary
+        """
+        page = await self.get_stats_data(config, **kwargs)
+        next_page = None
+
+        try:
+            while True:
+                next_key = EStatAPIClient._next_key(page)
+
+                if next_key is not None and prefetch:
+                    next_page = asyncio.ensure_future(
+                        self.get_stats_data(config, **EStatAPIClient._continuation(kwargs, next_key))
+                    )
+
+                yield page
+
+                if next_key is None:
+                    return
+
+                if next_page is not None:
+                    page, next_page = await next_page, None
+                else:
+                    page = await self.get_stats_data(config, **EStatAPIClient._continuation(kwargs, next_key))
+        finally:
+            if next_page is not None:
+                next_page.cancel()
+
+    async def iter_values(
+        self,
+        config: StatConfig,
+        prefetch: bool = True,
+        **kwargs
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Iterate over the VALUE rows of a statistical table across all pages.
+
+        Args:
+            config: Configuration object specifying which data to retrieve
+            prefetch: Whether to prefetch the next page (see iter_stats_pages)
+            **kwargs: Additional query parameters for the API
+
+        Yields:
+            VALUE entries (dicts with keys like ``@cat01``, ``@time``, ``$``)
+        """
+        async for page in self.iter_stats_pages(config, prefetch=prefetch, **kwargs):
+            for value in EStatAPIClient._extract_values(page):
+                yield value
+
+    async def get_stats_list(
+        self,
+        search_word: Optional[str] = None,
+        stats_code: Optional[str] = None,
+        limit: int = 100,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Search for available statistical datasets (see EStatAPIClient.get_stats_list).
+
+        Args:
+            search_word: Keyword to search for
+            stats_code: Statistical survey code
+            limit: Maximum number of results
+            **kwargs: Additional query parameters for the API
+
+        Returns:
+            JSON response containing list of available datasets
+        """
+        endpoint = f"{self.BASE_URL}/getStatsList"
+        params = stats_list_params(self.api_key, search_word, stats_code, limit, **kwargs)
+        return await self._cached(
+            make_key(endpoint, params),
+            lambda: self._get_json(endpoint, params),
+            is_cacheable_response
+        )
+
+    async def get_class_inf(self, stats_data_id: str) -> Dict[str, Any]:
+        """
+        Fetch the dimension definitions (CLASS_INF) of a statistical table
+        (see EStatAPIClient.get_class_inf).
+
+        Args:
+            stats_data_id: Statistical table ID
+
+        Returns:
+            CLASS_INF section (``{"CLASS_OBJ": [...]}``)
+        """
+        endpoint = f"{self.BASE_URL}/getMetaInfo"
+        params = {"appId": self.api_key, "statsDataId": stats_data_id}
+
+        async def fetch():
+            return class_inf_from_meta_info(await self._get_json(endpoint, params))
+
+        return await self._cached(class_inf_key(stats_data_id), fetch)
+
+    async def get_dimension_index(self, stats_data_id: str) -> DimensionIndex:
+        """
+        Build the dimension index of a statistical table
+        (see EStatAPIClient.get_dimension_index).
+
+        Args:
+            stats_data_id: Statistical table ID
+
+        Returns:
+            DimensionIndex decoded from the (cached) CLASS_INF
+        """
+        return DimensionIndex.from_class_inf(await self.get_class_inf(stats_data_id))
+
+    async def _cached(
+        self,
+        key: str,
+        fetch: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = bool
+    ) -> Any:
+        """
+        Return a metadata value from the cache, awaiting ``fetch`` on a miss.
+
+        Fetched values are only stored when ``cacheable`` accepts them
+        (see MetadataCache.get_or_fetch).
+        """
+        if self.metadata_cache is None:
+            return await fetch()
+
+        value = self.metadata_cache.get(key)
+        if value is None:
+            value = await fetch()
+            if cacheable(value):
+                self.metadata_cache.set(key, value)
+        return value
+
+    # Conversion does no I/O, so it is shared with the synchronous client
+    _extract_values = staticmethod(EStatAPIClient._extract_values)
+    json_to_dataframe = EStatAPIClient.json_to_dataframe
+
+    async def fetch_and_transform(
+        self,
+        config: StatConfig,
+        typed: bool = False,
+        labels: bool = False
+    ) -> pd.DataFrame:
+        """
+        Fetch all pages of a table and transform them to a DataFrame.
+
+        Args:
+            config: Configuration for data retrieval
+            typed: Whether to build typed columns (see EStatAPIClient.json_to_dataframe)
+            labels: Whether to add name columns decoded from CLASS_INF
+
+        Returns:
+            DataFrame containing the fetched and transformed data
+        """
+        values = [value async for value in self.iter_values(config)]
+
+        if typed:
+            df = values_to_dataframe(values)
+        elif not values:
+            return pd.DataFrame()
+        else:
+            df = pd.DataFrame(values)
+
+        if labels and not df.empty:
+            df = (await self.get_dimension_index(config.stats_data_id)).label(df)
+
+        return df
+
+    async def fetch_many(
+        self,
+        configs: List[StatConfig],
+        typed: bool = False,
+        labels: bool = False
+    ) -> List[pd.DataFrame]:
+        """
+        Fetch several tables concurrently.
+
+        Args:
+            configs: Configurations for data retrieval
+            typed: Whether to build typed columns
+            labels: Whether to add name columns decoded from CLASS_INF
+
+        Returns:
+            DataFrames in the same order as ``configs``
+        """
+        return list(await asyncio.gather(
+            *(self.fetch_and_transform(config, typed=typed, labels=labels) for config in configs)
+        ))
+
+    async def aclose(self):
+        """Close the connection pool."""
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.aclose()
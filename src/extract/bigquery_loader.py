@@ -0,0 +1,448 @@
+"""
+整形済みデータ・派生指標・マスターテーブルをBigQueryに読み込む。
+
+行の挿入（insert_rows）ではなく、Parquetの読み込みジョブで一括して読み込む。
+年月を持つテーブルは年月の月単位パーティション分割テーブル、
+産業コード・性別・就業形態でクラスタ化したテーブルとして作成する。
+BigQueryの時間単位パーティション分割はDATE型の列が必要なため、
+year_month（YYYY-MM）から月初日の year_month_date 列を作成して使う。
+
+- 全件の読み込み: ファイルを年月ごとに少しずつ読み、UPLOAD_BATCH_ROWS行ずつ
+  Parquetにしてアップロードする（最初のジョブでテーブルを置き換え、以降は追加）
+- 差分の読み込み（months指定）: 指定した年月のパーティションだけを
+  パーティションデコレータ（table$YYYYMM）への置き換えジョブで入れ替える
+
+BigQueryのクライアントは引数で渡せるため、ローカルのエミュレータ
+（環境変数 JMACRO_BIGQUERY_ENDPOINT、例: http://localhost:9050）や、
+create_dataset()・load_table_from_file()・project を持つ代替オブジェクトに対して
+実行・検証できる。
+
+要 google-cloud-bigquery・pyarrow。
+"""
+
+import io
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from query import DATA_DIR, VIEWS
+from storage import (
+    PARTITION_KEY,
+    iter_groups,
+    list_partitions,
+    normalize_dtypes,
+    read_months,
+    read_partitioned,
+    read_table,
+    resolve_table,
+)
+
+
+# 読み込み先のデータセット（環境変数で変更できる）
+DEFAULT_DATASET = 'japan_macro_dashboard'
+DATASET_ENV = 'JMACRO_BIGQUERY_DATASET'
+
+# プロジェクトID（省略時はクライアントの既定のプロジェクト）
+PROJECT_ENV = 'GOOGLE_CLOUD_PROJECT'
+
+# ローカルのエミュレータ等、BigQuery APIの接続先を変更する環境変数
+ENDPOINT_ENV = 'JMACRO_BIGQUERY_ENDPOINT'
+
+# 月単位パーティション分割に使う列（year_month の月初日、DATE型）
+PARTITION_DATE_COLUMN = 'year_month_date'
+
+# クラスタ化に使う列（テーブルに含まれる列のみ使用）
+CLUSTERING_COLUMNS = ('industry_code', 'gender', 'employment_type')
+
+# 年月の列を持ち、パーティション分割するテーブル
+PARTITIONED_TABLES = (
+    'actual_wages_historical',
+    'actual_wages_latest',
+    'index_monthly',
+    'wage_trends',
+    'gender_gap',
+    'parttime_gap',
+    'real_wage_index',
+)
+
+# 全件の読み込みで1回のジョブにまとめる行数の目安
+UPLOAD_BATCH_ROWS = 500_000
+
+
+def create_client(project: Optional[str] = None, endpoint: Optional[str] = None):
+    """
+    BigQueryのクライアントを作成する
+
+    Args:
+        project: プロジェクトID（省略時は環境変数 GOOGLE_CLOUD_PROJECT、または認証情報の既定値）
+        endpoint: APIの接続先（省略時は環境変数 JMACRO_BIGQUERY_ENDPOINT）。
+                  指定した場合は認証なしで接続する（ローカルのエミュレータ用）
+
+    Returns:
+        google.cloud.bigquery.Client
+
+    Raises:
+        ImportError: google-cloud-bigqueryがインストールされていない場合
+    """
+    try:
+        from google.cloud import bigquery
+    except ImportError as e:
+        raise ImportError(
+            "BigQueryに読み込むには google-cloud-bigquery が必要です（pip install google-cloud-bigquery）"
+        ) from e
+
+    project = project or os.getenv(PROJECT_ENV)
+    endpoint = endpoint or os.getenv(ENDPOINT_ENV)
+
+    if endpoint:
+        from google.api_core.client_options import ClientOptions
+        from google.auth.credentials import AnonymousCredentials
+        return bigquery.Client(
+            project=project,
+            client_options=ClientOptions(api_endpoint=endpoint),
+            credentials=AnonymousCredentials()
+        )
+
+    return bigquery.Client(project=project)
+
+
+def partition_decorator(year_month: str) -> str:
+    """年月（YYYY-MM）を月単位パーティションのデコレータ（$YYYYMM）にする"""
+    return f"${str(year_month).replace('-', '')}"
+
+
+def with_partition_date(df: pd.DataFrame) -> pd.DataFrame:
+    """year_month（YYYY-MM）から月初日のDATE列（year_month_date）を追加する"""
+    df = df.copy()
+    df[PARTITION_DATE_COLUMN] = pd.to_datetime(df[PARTITION_KEY].astype(str) + '-01').dt.date
+    return df
+
+
+def to_parquet_buffer(df: pd.DataFrame) -> io.BytesIO:
+    """
+    DataFrameをメモリ上のParquetにする（ファイルに書き出さずにアップロードするため）
+
+    列の型はスキーマ（schema.py）にそろえるため、BigQueryの列の型は
+    カテゴリ → STRING、Int32 → INT64、float32 → FLOAT64 になる。
+    """
+    buffer = io.BytesIO()
+    normalize_dtypes(df).to_parquet(buffer, index=False)
+    buffer.seek(0)
+    return buffer
+
+
+def source_path(name: str, data_dir: Path = DATA_DIR) -> Optional[Path]:
+    """
+    テーブルの読み込み元を返す
+
+    Args:
+        name: テーブル名（query.VIEWSのビュー名と同じ）
+        data_dir: データディレクトリ
+
+    Returns:
+        データファイル、またはパーティション分割データセットのディレクトリ（無ければNone）
+    """
+    path = Path(data_dir) / VIEWS[name]
+    root = path.with_suffix('')
+    if root.is_dir():
+        return root if list_partitions(root) else None
+
+    path = resolve_table(path)
+    return path if path.exists() else None
+
+
+def _month_frames(path: Path) -> Iterator[pd.DataFrame]:
+    """年月の列を持つデータを、年月ごとに少しずつ読み込む"""
+    if path.is_dir():
+        for value in list_partitions(path):
+            yield read_partitioned(path, values=[value])
+    else:
+        for _, group in iter_groups(path, PARTITION_KEY):
+            yield group
+
+
+def iter_batches(path: Path, partitioned: bool, batch_rows: int = UPLOAD_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    アップロードする行のまとまりを返す
+
+    Args:
+        path: 読み込み元
+        partitioned: 年月の列を持つテーブルの場合はTrue（年月ごとに読み、batch_rows行ずつまとめる）
+        batch_rows: 1回のアップロードの行数の目安
+
+    Yields:
+        DataFrame
+    """
+    if not partitioned:
+        yield read_table(path)
+        return
+
+    pending: List[pd.DataFrame] = []
+    pending_rows = 0
+    for frame in _month_frames(path):
+        pending.append(frame)
+        pending_rows += len(frame)
+        if pending_rows >= batch_rows:
+            yield pd.concat(pending, ignore_index=True)
+            pending, pending_rows = [], 0
+
+    if pending:
+        yield pd.concat(pending, ignore_index=True)
+
+
+class BigQueryLoader:
+    """
+    整形済みデータをBigQueryのデータセットに読み込む
+
+    Attributes:
+        client: BigQueryのクライアント（またはcreate_dataset()・load_table_from_file()・projectを持つ代替）
+        dataset: データセット名
+        data_dir: データディレクトリ
+        batch_rows: 全件の読み込みで1回のジョブにまとめる行数の目安
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        dataset: Optional[str] = None,
+        data_dir: Path = DATA_DIR,
+        location: Optional[str] = None,
+        batch_rows: int = UPLOAD_BATCH_ROWS
+    ):
+        """
+        Args:
+            client: BigQueryのクライアント（省略時はcreate_client()で作成）
+            dataset: データセット名（省略時は環境変数 JMACRO_BIGQUERY_DATASET、未設定なら japan_macro_dashboard）
+            data_dir: データディレクトリ（cleaned/・derived/・master/ を含む）
+            location: データセット・ジョブのロケーション（例: asia-northeast1）
+            batch_rows: 全件の読み込みで1回のジョブにまとめる行数の目安
+        """
+        from google.cloud import bigquery
+
+        self._bigquery = bigquery
+        self.client = client if client is not None else create_client()
+        self.dataset = dataset or os.getenv(DATASET_ENV) or DEFAULT_DATASET
+        self.data_dir = Path(data_dir)
+        self.location = location
+        self.batch_rows = batch_rows
+
+    @property
+    def dataset_id(self) -> str:
+        """プロジェクトID付きのデータセットID"""
+        return f"{self.client.project}.{self.dataset}"
+
+    def table_id(self, name: str, year_month: Optional[str] = None) -> str:
+        """
+        テーブルID（year_month指定時はそのパーティションのデコレータ付き）
+
+        Args:
+            name: テーブル名
+            year_month: 年月（YYYY-MM）
+
+        Returns:
+            project.dataset.table または project.dataset.table$YYYYMM
+        """
+        table_id = f"{self.dataset_id}.{name}"
+        if year_month is not None:
+            table_id += partition_decorator(year_month)
+        return table_id
+
+    def ensure_dataset(self):
+        """データセットが無ければ作成する"""
+        dataset = self._bigquery.Dataset(self.dataset_id)
+        if self.location:
+            dataset.location = self.location
+        self.client.create_dataset(dataset, exists_ok=True)
+
+    def job_config(self, name: str, columns: Iterable[str], write_disposition: str):
+        """
+        Parquetの読み込みジョブの設定
+
+        Args:
+            name: テーブル名
+            columns: 読み込む列
+            write_disposition: WRITE_TRUNCATE / WRITE_APPEND
+
+        Returns:
+            LoadJobConfig（年月を持つテーブルは月単位パーティション分割・クラスタ化）
+        """
+        bigquery = self._bigquery
+        config = bigquery.LoadJobConfig(
+            source_format=bigquery.SourceFormat.PARQUET,
+            write_disposition=write_disposition,
+        )
+
+        if name in PARTITIONED_TABLES:
+            config.time_partitioning = bigquery.TimePartitioning(
+                type_=bigquery.TimePartitioningType.MONTH,
+                field=PARTITION_DATE_COLUMN,
+            )
+            clustering = [column for column in CLUSTERING_COLUMNS if column in set(columns)]
+            if clustering:
+                config.clustering_fields = clustering
+
+        return config
+
+    def _submit(self, name: str, df: pd.DataFrame, destination: str, write_disposition: str):
+        """DataFrameをParquetにして読み込みジョブを開始する（完了は待たない）"""
+        if name in PARTITIONED_TABLES:
+            df = with_partition_date(df)
+        return self.client.load_table_from_file(
+            to_parquet_buffer(df),
+            destination,
+            job_config=self.job_config(name, df.columns, write_disposition),
+            location=self.location,
+        )
+
+    def load_table(self, name: str) -> int:
+        """
+        テーブル全体を置き換える
+
+        最初のまとまりでテーブルを置き換え（WRITE_TRUNCATE）、完了後に残りの
+        まとまりを追加（WRITE_APPEND）する。ファイル全体をメモリに載せない。
+
+        Args:
+            name: テーブル名
+
+        Returns:
+            読み込んだ行数（読み込み元が無ければ0）
+        """
+        path = source_path(name, self.data_dir)
+        if path is None:
+            return 0
+
+        write_truncate = self._bigquery.WriteDisposition.WRITE_TRUNCATE
+        write_append = self._bigquery.WriteDisposition.WRITE_APPEND
+
+        jobs = []
+        rows = 0
+        for i, batch in enumerate(iter_batches(path, name in PARTITIONED_TABLES, self.batch_rows)):
+            job = self._submit(name, batch, self.table_id(name), write_truncate if i == 0 else write_append)
+            if i == 0:
+                # 置き換えが終わる前に追加のジョブが走らないよう、最初のジョブだけ完了を待つ
+                job.result()
+            else:
+                jobs.append(job)
+            rows += len(batch)
+
+        for job in jobs:
+            job.result()
+        return rows
+
+    def load_partitions(self, name: str, months: Iterable[str]) -> Dict[str, int]:
+        """
+        指定した年月のパーティションだけを置き換える
+
+        年月ごとにパーティションデコレータ（table$YYYYMM）への置き換えジョブを
+        まとめて開始し、全ジョブの完了を待つ。読み込み元に無い年月は変更しない。
+
+        Args:
+            name: テーブル名（PARTITIONED_TABLESのいずれか）
+            months: 置き換える年月（YYYY-MM形式）
+
+        Returns:
+            年月 → 読み込んだ行数
+        """
+        path = source_path(name, self.data_dir)
+        if path is None:
+            return {}
+
+        df = read_months(path, sorted(set(months)))
+        if df.empty:
+            return {}
+
+        write_truncate = self._bigquery.WriteDisposition.WRITE_TRUNCATE
+        jobs = {}
+        for year_month, part_df in df.groupby(PARTITION_KEY, sort=True, observed=True):
+            jobs[str(year_month)] = (
+                self._submit(name, part_df, self.table_id(name, str(year_month)), write_truncate),
+                len(part_df),
+            )
+
+        loaded = {}
+        for year_month, (job, rows) in jobs.items():
+            job.result()
+            loaded[year_month] = rows
+        return loaded
+
+    def load(self, tables: Optional[List[str]] = None, months: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        テーブルを読み込む
+
+        Args:
+            tables: 読み込むテーブル（省略時は全テーブル）
+            months: 指定した場合、年月を持つテーブルはその年月のパーティションだけを置き換える
+                    （年月を持たないテーブルは全体を置き換える）
+
+        Returns:
+            テーブル名 → 読み込んだ行数（読み込み元が無いテーブルは含まない）
+        """
+        self.ensure_dataset()
+
+        loaded = {}
+        for name in tables or list(VIEWS):
+            if months and name in PARTITIONED_TABLES:
+                rows = sum(self.load_partitions(name, months).values())
+            else:
+                rows = self.load_table(name)
+
+            if rows:
+                loaded[name] = rows
+                print(f"  ✓ {self.table_id(name)}: {rows:,}行")
+            else:
+                print(f"  - {name}: 読み込み元が無いためスキップ")
+
+        return loaded
+
+
+def main(
+    tables: Optional[List[str]] = None,
+    months: Optional[List[str]] = None,
+    dataset: Optional[str] = None,
+    project: Optional[str] = None,
+    location: Optional[str] = None
+):
+    """
+    Args:
+        tables: 読み込むテーブル（省略時は全テーブル）
+        months: 置き換える年月（省略時はテーブル全体を置き換える）
+        dataset: データセット名
+        project: プロジェクトID
+        location: データセット・ジョブのロケーション
+    """
+    print("=" * 100)
+    print("BigQueryへの読み込み")
+    print("=" * 100)
+    print()
+
+    loader = BigQueryLoader(create_client(project), dataset, location=location)
+    print(f"データセット: {loader.dataset_id}")
+    if months:
+        print(f"モード: 差分（{', '.join(sorted(months))} のパーティションを置き換え）")
+    else:
+        print("モード: 全件（テーブル全体を置き換え）")
+    print()
+
+    loaded = loader.load(tables, months)
+
+    print()
+    print(f"✓ {len(loaded)}テーブル、{sum(loaded.values()):,}行を読み込みました")
+    return 0
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tables', nargs='+', choices=list(VIEWS), help='読み込むテーブル（省略時は全テーブル）')
+    parser.add_argument('--months', nargs='+', metavar='YYYY-MM',
+                        help='置き換える年月（指定した年月のパーティションだけを置き換える）')
+    parser.add_argument('--dataset', help=f'データセット名（デフォルト: {DEFAULT_DATASET}）')
+    parser.add_argument('--project', help='プロジェクトID')
+    parser.add_argument('--location', help='ロケーション（例: asia-northeast1）')
+    args = parser.parse_args()
+
+    sys.exit(main(args.tables, args.months, args.dataset, args.project, args.location))
@@ -0,0 +1,91 @@
+"""
+取得したデータを分析用の英文字カラム名・型に整形する（メモリ上の処理のみ）。
+
+列の型はschema.py（カラム定義マスターから生成）に従う。
+
+ダウンロードスクリプトはExcelを読み込んだDataFrameをそのまま渡して
+data/cleaned/ の出力を作成し、convert_to_english_columns.py は
+保存済みファイルを読み込んで同じ処理で再作成する。
+"""
+
+import numpy as np
+import pandas as pd
+
+from schema import apply_schema, table_dtypes
+
+
+# 整形済みデータの保存先ディレクトリ名（出力ディレクトリからの相対パス）
+CLEANED_DIRNAME = 'cleaned'
+
+# 実数データのカラム名マッピング
+ACTUAL_WAGES_COLUMN_MAPPING = {
+    '年月': 'year_month',
+    '産業コード': 'industry_code',
+    '性別': 'gender',
+    '就業形態': 'employment_type',
+    '常用労働者数_前調査期間末': 'regular_workers_prev',
+    '常用労働者数_本月増加': 'regular_workers_increase',
+    '常用労働者数_本月減少': 'regular_workers_decrease',
+    '常用労働者数_本調査期間末': 'regular_workers_current',
+    'パートタイム労働者数': 'parttime_workers',
+    '出勤日数': 'working_days',
+    '実労働時間_総数': 'total_working_hours',
+    '実労働時間_所定内': 'scheduled_working_hours',
+    '実労働時間_所定外': 'overtime_hours',
+    '現金給与_総額': 'total_cash_earnings',
+    '現金給与_きまって支給': 'scheduled_cash_earnings',
+    '現金給与_所定内給与': 'contractual_cash_earnings',
+    '現金給与_超過労働給与': 'overtime_pay',
+    '現金給与_特別給与': 'special_cash_earnings'
+}
+
+# 指数データのカラム名
+INDEX_COLUMNS = ['year', 'jan', 'feb', 'mar', 'apr', 'may', 'jun',
+                 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+# 指数データのデータ行とみなす年の範囲
+INDEX_YEAR_RANGE = (1900, 2100)
+
+
+def clean_actual_wages(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    実数データのカラム名を英文字化し、列の型をスキーマにそろえる
+
+    Args:
+        df: 日本語カラム名の実数データ（Excel読み込み直後・保存済みファイルのどちらでもよい）
+
+    Returns:
+        英文字カラム名のDataFrame（入力は変更しない）
+    """
+    return apply_schema(df.rename(columns=ACTUAL_WAGES_COLUMN_MAPPING), table_dtypes('actual_wages'))
+
+
+def clean_index_sheet(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    指数データのシートからデータ行を抽出し、年・月別の表に整形する
+
+    指数データは特殊なヘッダー構造を持っているため、先頭列が年
+    （INDEX_YEAR_RANGEの範囲の整数）として読める行だけをデータ行とする。
+    シート全体を1回の数値変換で配列にしてから行を選ぶ（列ごとに変換しない）。
+
+    Args:
+        df: 読み込んだシート全体（ヘッダーなし・先頭行を列名とした読み込みのどちらでもよい）
+
+    Returns:
+        year, jan～dec 列のDataFrame（年・月の値はスキーマの型）
+    """
+    sheet = df.iloc[:, :len(INDEX_COLUMNS)]
+    values = pd.to_numeric(
+        pd.Series(sheet.to_numpy(dtype=object).ravel()),
+        errors='coerce'
+    ).to_numpy(dtype=np.float64).reshape(sheet.shape)
+
+    # 先頭列が年として読める行がデータ行
+    years = values[:, 0]
+    first_year, last_year = INDEX_YEAR_RANGE
+    rows = (years >= first_year) & (years <= last_year) & (years == np.floor(years))
+
+    df_data = pd.DataFrame(values[rows], columns=INDEX_COLUMNS)
+
+    # スキーマの型（年: Int32、月: float32）にそろえる
+    return apply_schema(df_data, table_dtypes('wage_index'))
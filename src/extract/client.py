@@ -6,11 +6,36 @@ and retrieve statistical data for economic analysis.
 """
 
 import os
-from typing import Optional, Dict, Any, List
-import requests
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Iterator
+import numpy as np
 import pandas as pd
 from dataclasses import dataclass
 
+from dimensions import DimensionIndex
+from metadata_cache import MetadataCache, make_key
+from transport import Transport
+
+
+# RESULT.STATUS values from this one up are errors (0: OK, 1: OK with no
+# matching data, 2: OK with some parameters ignored)
+ERROR_STATUS_MIN = 100
+
+
+class EStatAPIError(ValueError):
+    """
+    e-Stat returned an error payload (HTTP 200 with an error RESULT.STATUS).
+
+    Attributes:
+        status: RESULT.STATUS
+        error_msg: RESULT.ERROR_MSG
+    """
+
+    def __init__(self, status: int, error_msg: str):
+        super().__init__(f"e-Stat API error (STATUS {status}): {error_msg}")
+        self.status = status
+        self.error_msg = error_msg
+
 
 @dataclass
 class StatConfig:
@@ -21,6 +46,242 @@ class StatConfig:
     limit: int = 100000
 
 
+def parse_time_codes(codes: pd.Index) -> Optional[pd.PeriodIndex]:
+    """
+    Parse e-Stat ``@time`` codes into periods.
+
+    e-Stat time codes are 10 digits: ``YYYY00MMMM`` for a month
+    (e.g. ``2024000101`` = 2024-01) and ``YYYY000000`` for a calendar year.
+    Monthly codes take precedence: if any are present the result has
+    monthly frequency and other codes become NaT.
+
+    Args:
+        codes: Unique time codes as strings
+
+    Returns:
+        PeriodIndex aligned with ``codes``, or None if no code is recognized
+    """
+    codes = pd.Index(codes).astype(str)
+    year = codes.str[:4]
+    month = codes.str[6:8]
+
+    well_formed = (codes.str.len() == 10) & codes.str.isdigit()
+    monthly = (
+        well_formed
+        & (codes.str[4:6] == "00")
+        & (month == codes.str[8:10])
+        & (month >= "01") & (month <= "12")
+    )
+    annual = well_formed & (codes.str[4:] == "000000")
+
+    if monthly.any():
+        return pd.PeriodIndex(np.where(monthly, year + "-" + month, None), freq="M")
+    if annual.any():
+        return pd.PeriodIndex(np.where(annual, year, None), freq="Y")
+    return None
+
+
+def values_to_dataframe(values: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Build a typed DataFrame directly from e-Stat VALUE rows.
+
+    The rows are read into a frame once with pd.DataFrame (C-level dict
+    unpacking), and the typed columns are assembled into a new frame in one
+    step rather than reassigning each column of the object frame:
+
+    - dimension keys (``@tab``, ``@cat01``, ``@area``, ``@time``, ...) become
+      categoricals, so each distinct code is stored once
+    - ``$`` becomes float64; the markers e-Stat uses for missing or
+      confidential values (``-``, ``***``, ``x``, ...) are non-numeric and
+      become NaN
+    - ``@time`` is additionally parsed into a ``period`` column; only the
+      distinct codes are parsed and the result is expanded with a take()
+
+    Args:
+        values: VALUE entries from a getStatsData response
+
+    Returns:
+        DataFrame with one column per key plus ``period`` when time codes
+        are recognized
+    """
+    if not values:
+        return pd.DataFrame()
+
+    raw = pd.DataFrame(values)
+
+    columns = {}
+    for key, column in raw.items():
+        if key == "$":
+            columns[key] = pd.to_numeric(column, errors="coerce").astype("float64", copy=False)
+        else:
+            columns[key] = column.astype("category")
+
+    df = pd.DataFrame(columns)
+
+    if "@time" in df.columns:
+        time_codes = df["@time"].cat
+        periods = parse_time_codes(time_codes.categories)
+        if periods is not None:
+            df["period"] = periods.array.take(time_codes.codes, allow_fill=True)
+
+    return df
+
+
+def stats_data_params(api_key: str, config: StatConfig, **kwargs) -> Dict[str, Any]:
+    """
+    Build the query parameters of a getStatsData request.
+
+    Args:
+        api_key: e-Stat API key
+        config: Configuration object specifying which data to retrieve
+        **kwargs: Additional query parameters for the API
+
+    Returns:
+        Query parameters
+    """
+    params = {
+        "appId": api_key,
+        "statsDataId": config.stats_data_id,
+        "limit": config.limit,
+    }
+
+    # Add optional parameters if provided
+    if config.cd_cat01:
+        params["cdCat01"] = config.cd_cat01
+    if config.cd_time:
+        params["cdTime"] = config.cd_time
+
+    # Merge additional parameters
+    params.update(kwargs)
+
+    return params
+
+
+def stats_list_params(
+    api_key: str,
+    search_word: Optional[str] = None,
+    stats_code: Optional[str] = None,
+    limit: int = 100,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Build the query parameters of a getStatsList request.
+
+    Args:
+        api_key: e-Stat API key
+        search_word: Keyword to search for
+        stats_code: Statistical survey code
+        limit: Maximum number of results
+        **kwargs: Additional query parameters for the API
+
+    Returns:
+        Query parameters
+    """
+    params = {
+        "appId": api_key,
+        "limit": limit,
+    }
+
+    if search_word:
+        params["searchWord"] = search_word
+    if stats_code:
+        params["statsCode"] = stats_code
+
+    params.update(kwargs)
+
+    return params
+
+
+def result_status(json_response: Dict[str, Any]) -> Optional[int]:
+    """
+    Return RESULT.STATUS of an e-Stat response.
+
+    e-Stat reports errors with HTTP 200 and a non-zero status in the RESULT
+    section under the single top-level key (``GET_STATS_LIST``,
+    ``GET_META_INFO``, ...). 0 means success with data.
+
+    Args:
+        json_response: Decoded API response
+
+    Returns:
+        The status, or None if the response has no RESULT section
+    """
+    for section in json_response.values():
+        if isinstance(section, dict) and "RESULT" in section:
+            try:
+                return int(section["RESULT"].get("STATUS"))
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def raise_for_result(json_response: Dict[str, Any]):
+    """
+    Raise EStatAPIError if a response reports an error in RESULT.STATUS.
+
+    Statuses below ERROR_STATUS_MIN (including 1, no matching data) pass.
+
+    Args:
+        json_response: Decoded API response
+
+    Raises:
+        EStatAPIError: If RESULT.STATUS is an error status
+    """
+    status = result_status(json_response)
+    if status is not None and status >= ERROR_STATUS_MIN:
+        error_msg = next(
+            (section["RESULT"].get("ERROR_MSG", "") for section in json_response.values()
+             if isinstance(section, dict) and "RESULT" in section),
+            ""
+        )
+        raise EStatAPIError(status, error_msg)
+
+
+def is_cacheable_response(json_response: Dict[str, Any]) -> bool:
+    """Whether a metadata response may be cached (successful, status 0)."""
+    return bool(json_response) and result_status(json_response) == 0
+
+
+def class_inf_from_meta_info(json_response: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract CLASS_INF from a getMetaInfo response.
+
+    Args:
+        json_response: Decoded getMetaInfo response
+
+    Returns:
+        CLASS_INF section, or ``{}`` if the response reports an error
+    """
+    if result_status(json_response) != 0:
+        return {}
+    return json_response.get("GET_META_INFO", {}).get("METADATA_INF", {}).get("CLASS_INF", {})
+
+
+def class_inf_key(stats_data_id: str) -> str:
+    """Metadata cache key of the CLASS_INF of a statistical table."""
+    return make_key("CLASS_INF", {"statsDataId": stats_data_id})
+
+
+def remember_class_inf(cache: MetadataCache, params: Dict[str, Any], json_response: Dict[str, Any]):
+    """
+    Store the CLASS_INF embedded in a getStatsData response in the metadata cache.
+
+    Only unfiltered first pages are used: narrowing parameters (``cd*``,
+    ``lv*``) restrict CLASS_INF to the selected codes.
+
+    Args:
+        cache: Metadata cache
+        params: Query parameters of the request
+        json_response: Decoded getStatsData response
+    """
+    if any(name.startswith(("cd", "lv")) or name == "startPosition" for name in params):
+        return
+
+    class_inf = json_response.get("GET_STATS_DATA", {}).get("STATISTICAL_DATA", {}).get("CLASS_INF")
+    if class_inf and result_status(json_response) == 0:
+        cache.set(class_inf_key(params["statsDataId"]), class_inf)
+
+
 class EStatAPIClient:
     """
     Client for interacting with the e-Stat API.
@@ -31,16 +292,32 @@ class EStatAPIClient:
     Attributes:
         api_key: API key for e-Stat authentication
         base_url: Base URL for e-Stat API endpoints
+        transport: Transport used for every request (retries transient
+            failures with backoff and trips a per-host circuit breaker)
+        metadata_cache: TTL + LRU cache for table lists and CLASS_INF, or None
     """
 
     BASE_URL = "https://api.e-stat.go.jp/rest/3.0/app/json"
 
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        transport: Optional[Transport] = None,
+        metadata_cache: Optional[MetadataCache] = None,
+        cache_metadata: bool = True
+    ):
         """
         Initialize the e-Stat API client.
 
         Args:
             api_key: e-Stat API key. If not provided, reads from ESTAT_API_KEY env var.
+            transport: Transport to send requests through. Defaults to one
+                with the standard retry policy over a new session.
+            metadata_cache: Cache for get_stats_list() and CLASS_INF. Pass a
+                shared or disk-backed MetadataCache to reuse entries across
+                clients or processes.
+            cache_metadata: If False and no metadata_cache is given, metadata
+                is requested every time.
 
         Raises:
             ValueError: If API key is not provided or found in environment.
@@ -50,7 +327,9 @@ class EStatAPIClient:
             raise ValueError(
                 "API key is required. Provide via argument or ESTAT_API_KEY env var."
             )
-        self.session = requests.Session()
+        self.transport = transport or Transport()
+        self.session = self.transport.session
+        self.metadata_cache = metadata_cache or (MetadataCache() if cache_metadata else None)
 
     def get_stats_data(
         self,
@@ -60,6 +339,9 @@ class EStatAPIClient:
         """
         Fetch statistical data from e-Stat API.
 
+        Only a single page of at most ``config.limit`` values is returned.
+        Use iter_stats_pages() or iter_values() to read a whole table.
+
         Args:
             config: Configuration object specifying which data to retrieve
             **kwargs: Additional query parameters for the API
@@ -71,39 +353,139 @@ class EStatAPIClient:
             requests.exceptions.RequestException: If API request fails
         """
         endpoint = f"{self.BASE_URL}/getStatsData"
+        params = stats_data_params(self.api_key, config, **kwargs)
 
-        params = {
-            "appId": self.api_key,
-            "statsDataId": config.stats_data_id,
-            "limit": config.limit,
-        }
-
-        # Add optional parameters if provided
-        if config.cd_cat01:
-            params["cdCat01"] = config.cd_cat01
-        if config.cd_time:
-            params["cdTime"] = config.cd_time
-
-        # Merge additional parameters
-        params.update(kwargs)
-
-        response = self.session.get(endpoint, params=params)
+        response = self.transport.get(endpoint, params=params)
         response.raise_for_status()
 
         # Debug: Print response details if JSON parsing might fail
         try:
-            return response.json()
+            json_response = response.json()
         except ValueError as e:
             print(f"DEBUG: Failed to parse JSON response")
             print(f"DEBUG: Status Code: {response.status_code}")
             print(f"DEBUG: Response Text: {response.text[:500]}")
             raise ValueError(f"Invalid JSON response from API: {e}")
 
+        if self.metadata_cache is not None:
+            remember_class_inf(self.metadata_cache, params, json_response)
+
+        return json_response
+
+    def iter_stats_pages(
+        self,
+        config: StatConfig,
+        prefetch: bool = True,
+        **kwargs
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every page of a statistical table.
+
+        e-Stat returns at most ``config.limit`` values per request and signals
+        that more remain via RESULT_INF.NEXT_KEY. This generator follows that
+        continuation by passing it back as ``startPosition`` until the table
+        is exhausted. Only the first page carries CLASS_INF.
+
+        Args:
+            config: Configuration object specifying which data to retrieve
+            prefetch: If True, request the next page in a background thread
+                while the caller processes the current one. At most two pages
+                are held in memory at any time.
+            **kwargs: Additional query parameters for the API
+
+        Yields:
+            JSON response for each page as a dictionary
+        """
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+
+        try:
+            page = self.get_stats_data(config, **kwargs)
+
+            while True:
+                next_key = self._next_key(page)
+
+                next_page = None
+                if next_key is not None and executor is not None:
+                    next_page = executor.submit(
+                        self.get_stats_data, config, **self._continuation(kwargs, next_key)
+                    )
+
+                yield page
+
+                if next_key is None:
+                    return
+
+                if next_page is not None:
+                    page = next_page.result()
+                else:
+                    page = self.get_stats_data(config, **self._continuation(kwargs, next_key))
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def iter_values(
+        self,
+        config: StatConfig,
+        prefetch: bool = True,
+        **kwargs
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the VALUE rows of a statistical table across all pages.
+
+        Rows are yielded one at a time so that callers can aggregate or write
+        them out without materializing the whole table.
+
+        Args:
+            config: Configuration object specifying which data to retrieve
+            prefetch: Whether to prefetch the next page (see iter_stats_pages)
+            **kwargs: Additional query parameters for the API
+
+        Yields:
+            VALUE entries (dicts with keys like ``@cat01``, ``@time``, ``$``)
+        """
+        for page in self.iter_stats_pages(config, prefetch=prefetch, **kwargs):
+            yield from self._extract_values(page)
+
+    @staticmethod
+    def _continuation(kwargs: Dict[str, Any], next_key: str) -> Dict[str, Any]:
+        """
+        Query parameters for the page starting at ``next_key``.
+
+        CLASS_INF is identical on every page, so continuation pages are
+        requested without metadata (``metaGetFlg=N``).
+        """
+        return {"metaGetFlg": "N", **kwargs, "startPosition": next_key}
+
+    @staticmethod
+    def _next_key(json_response: Dict[str, Any]) -> Optional[str]:
+        """Return RESULT_INF.NEXT_KEY of a getStatsData response, if any."""
+        result_inf = (
+            json_response.get("GET_STATS_DATA", {})
+            .get("STATISTICAL_DATA", {})
+            .get("RESULT_INF", {})
+        )
+        next_key = result_inf.get("NEXT_KEY")
+        return str(next_key) if next_key else None
+
+    @staticmethod
+    def _extract_values(json_response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the DATA_INF.VALUE list of a getStatsData response."""
+        result = json_response.get("GET_STATS_DATA", {}).get("STATISTICAL_DATA", {})
+        data_inf = result.get("DATA_INF", {})
+        values = data_inf.get("VALUE", [])
+
+        # A single value is returned as an object rather than a list
+        if isinstance(values, dict):
+            values = [values]
+
+        return values
+
     def get_stats_list(
         self,
         search_word: Optional[str] = None,
         stats_code: Optional[str] = None,
-        limit: int = 100
+        limit: int = 100,
+        **kwargs
     ) -> Dict[str, Any]:
         """
         Search for available statistical datasets.
@@ -112,11 +494,93 @@ class EStatAPIClient:
             search_word: Keyword to search for
             stats_code: Statistical survey code
             limit: Maximum number of results
+            **kwargs: Additional query parameters for the API
+                (e.g. ``updatedDate``, ``startPosition``)
 
         Returns:
             JSON response containing list of available datasets
         """
         endpoint = f"{self.BASE_URL}/getStatsList"
+        params = stats_list_params(self.api_key, search_word, stats_code, limit, **kwargs)
+
+        def fetch():
+            response = self.transport.get(endpoint, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        if self.metadata_cache is None:
+            return fetch()
+        # Error payloads (HTTP 200 with a non-zero RESULT.STATUS) are not cached
+        return self.metadata_cache.get_or_fetch(make_key(endpoint, params), fetch, is_cacheable_response)
+
+    def get_class_inf(self, stats_data_id: str) -> Dict[str, Any]:
+        """
+        Fetch the dimension definitions (CLASS_INF) of a statistical table.
+
+        Served from the metadata cache when possible. The cache is also filled
+        by unfiltered get_stats_data() calls, whose responses embed CLASS_INF.
+
+        Args:
+            stats_data_id: Statistical table ID
+
+        Returns:
+            CLASS_INF section (``{"CLASS_OBJ": [...]}``), or ``{}`` if the API
+            returned an error or no metadata (not cached, so the next call retries)
+        """
+        endpoint = f"{self.BASE_URL}/getMetaInfo"
+        params = {"appId": self.api_key, "statsDataId": stats_data_id}
+
+        def fetch():
+            response = self.transport.get(endpoint, params=params)
+            response.raise_for_status()
+            return class_inf_from_meta_info(response.json())
+
+        if self.metadata_cache is None:
+            return fetch()
+        return self.metadata_cache.get_or_fetch(class_inf_key(stats_data_id), fetch)
+
+    def get_dimension_index(self, stats_data_id: str) -> DimensionIndex:
+        """
+        Build the dimension index (code -> name, level, parent) of a statistical table.
+
+        Args:
+            stats_data_id: Statistical table ID
+
+        Returns:
+            DimensionIndex decoded from the (cached) CLASS_INF
+        """
+        return DimensionIndex.from_class_inf(self.get_class_inf(stats_data_id))
+
+    def get_data_catalog(
+        self,
+        search_word: Optional[str] = None,
+        stats_code: Optional[str] = None,
+        updated_date: Optional[str] = None,
+        limit: int = 100,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Search the data catalog of downloadable files (Excel/CSV/PDF).
+
+        Unlike getStatsList, which only covers database tables, the catalog
+        lists the statistical table files served by the e-Stat file-download
+        URL together with their statInfId.
+
+        Args:
+            search_word: Keyword to search for
+            stats_code: Statistical survey code
+            updated_date: Only return entries updated in this period
+                (``YYYY``, ``YYYYMM``, ``YYYYMMDD`` or ``YYYYMMDD-YYYYMMDD``)
+            limit: Maximum number of results per page
+            **kwargs: Additional query parameters for the API
+
+        Returns:
+            JSON response containing the catalog entries
+
+        Raises:
+            EStatAPIError: If the API reports an error in RESULT.STATUS
+        """
+        endpoint = f"{self.BASE_URL}/getDataCatalog"
 
         params = {
             "appId": self.api_key,
@@ -127,18 +591,61 @@ class EStatAPIClient:
             params["searchWord"] = search_word
         if stats_code:
             params["statsCode"] = stats_code
+        if updated_date:
+            params["updatedDate"] = updated_date
+
+        params.update(kwargs)
 
-        response = self.session.get(endpoint, params=params)
+        response = self.transport.get(endpoint, params=params)
         response.raise_for_status()
 
-        return response.json()
+        # An error payload would otherwise read as an empty catalog
+        json_response = response.json()
+        raise_for_result(json_response)
+        return json_response
+
+    def iter_data_catalog(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over every page of a data catalog search.
+
+        Args:
+            **kwargs: Arguments for get_data_catalog()
 
-    def json_to_dataframe(self, json_response: Dict[str, Any]) -> pd.DataFrame:
+        Yields:
+            DATA_CATALOG_INF entries (dicts with ``DATASET`` and ``RESOURCES``)
+        """
+        params = dict(kwargs)
+
+        while True:
+            page = self.get_data_catalog(**params)
+            list_inf = page.get("GET_DATA_CATALOG", {}).get("DATA_CATALOG_LIST_INF", {})
+
+            entries = list_inf.get("DATA_CATALOG_INF", [])
+            if isinstance(entries, dict):
+                entries = [entries]
+            yield from entries
+
+            next_key = list_inf.get("RESULT_INF", {}).get("NEXT_KEY")
+            if not next_key:
+                return
+            params["startPosition"] = next_key
+
+    def json_to_dataframe(
+        self,
+        json_response: Dict[str, Any],
+        typed: bool = False,
+        labels: bool = False
+    ) -> pd.DataFrame:
         """
         Convert e-Stat API JSON response to pandas DataFrame.
 
         Args:
             json_response: JSON response from get_stats_data()
+            typed: If True, use values_to_dataframe() to build categorical
+                dimension columns, a numeric ``$`` column and a ``period``
+                column. If False, every cell is kept as returned by the API.
+            labels: If True, add a categorical ``<column>_name`` column for each
+                dimension column, decoded from the CLASS_INF of the response
 
         Returns:
             DataFrame containing the statistical data
@@ -148,30 +655,54 @@ class EStatAPIClient:
             ValueError: If data cannot be converted to DataFrame
         """
         # Extract the data section from the response
-        result = json_response.get("GET_STATS_DATA", {}).get("STATISTICAL_DATA", {})
-        data_inf = result.get("DATA_INF", {})
-        values = data_inf.get("VALUE", [])
+        values = self._extract_values(json_response)
 
-        if not values:
+        if typed:
+            df = values_to_dataframe(values)
+        elif not values:
             return pd.DataFrame()
+        else:
+            # Convert to DataFrame
+            df = pd.DataFrame(values)
 
-        # Convert to DataFrame
-        df = pd.DataFrame(values)
+        if labels:
+            class_inf = json_response.get("GET_STATS_DATA", {}).get("STATISTICAL_DATA", {}).get("CLASS_INF")
+            df = DimensionIndex.from_class_inf(class_inf).label(df)
 
         return df
 
-    def fetch_and_transform(self, config: StatConfig) -> pd.DataFrame:
+    def fetch_and_transform(
+        self,
+        config: StatConfig,
+        typed: bool = False,
+        labels: bool = False
+    ) -> pd.DataFrame:
         """
         Fetch data from API and transform to DataFrame in one call.
 
+        All pages are fetched, so tables larger than ``config.limit`` are
+        returned in full.
+
         Args:
             config: Configuration for data retrieval
+            typed: Whether to build typed columns (see json_to_dataframe)
+            labels: Whether to add name columns decoded from CLASS_INF
+                (see get_dimension_index)
 
         Returns:
             DataFrame containing the fetched and transformed data
         """
-        json_data = self.get_stats_data(config)
-        df = self.json_to_dataframe(json_data)
+        values = list(self.iter_values(config))
+
+        if typed:
+            df = values_to_dataframe(values)
+        elif not values:
+            return pd.DataFrame()
+        else:
+            df = pd.DataFrame(values)
+
+        if labels and not df.empty:
+            df = self.get_dimension_index(config.stats_data_id).label(df)
 
         return df
 
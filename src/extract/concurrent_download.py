@@ -0,0 +1,58 @@
+"""
+e-Statからのファイルダウンロードの並列実行設定とレート制限。
+
+ダウンロードはExtractionEngine（extraction.py）がスレッドプールで並列に行い、
+各スレッドはRateLimiterでホスト単位のレート制限
+（1秒あたりのリクエスト数）を守る。
+固定のsleepで待機する代わりに、直前のリクエストからの経過時間に応じて
+必要な分だけ待機する。
+"""
+
+import threading
+import time
+from typing import Dict
+
+
+# デフォルトの同時ダウンロード数
+DEFAULT_MAX_WORKERS = 4
+
+# デフォルトのレート制限（1ホストあたり1秒間のリクエスト数）
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+
+
+class RateLimiter:
+    """
+    ホスト単位のレート制限
+
+    同じホストへのリクエスト開始時刻が最低でも 1/requests_per_second 秒
+    離れるように、呼び出し元スレッドを待機させる。
+
+    Attributes:
+        min_interval: 同一ホストへのリクエスト間隔の最小値（秒）
+    """
+
+    def __init__(self, requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND):
+        """
+        Args:
+            requests_per_second: 1ホストあたり1秒間に許可するリクエスト数（0以下で無制限）
+        """
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_allowed: Dict[str, float] = {}
+
+    def acquire(self, host: str):
+        """
+        指定ホストへのリクエスト枠を確保する（必要なら待機する）
+
+        Args:
+            host: リクエスト先のホスト名
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = slot + self.min_interval
+
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+
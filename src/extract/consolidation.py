@@ -0,0 +1,176 @@
+"""
+月ごとのデータを年月順に統合ファイルへ書き出すストリーミング統合。
+
+並列取得では月の読み込みが完了する順序は年月順にならないため、
+StreamingConsolidatorが順序待ちのバッファを持ち、次に書き出すべき月が
+揃った時点でその月から順に書き出す。書き出した月はすぐに手放すため、
+メモリに載るのは順序待ちの数ヶ月分だけで、取得期間の長さには依存しない。
+
+TableMergerは既存の統合ファイル（年月順）を少しずつ読みながら、
+新たに取得した月を正しい位置に差し込んだ（改訂月は置き換えた）ファイルを書き出す。
+"""
+
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from storage import CSV, TableWriter, append_table, get_output_format, iter_groups, table_path
+
+
+class StreamingConsolidator:
+    """
+    年月順が保証されない月ごとのデータを、年月順に書き出す
+
+    Attributes:
+        max_buffered: 順序待ちで同時にバッファに保持した月数の最大値
+    """
+
+    def __init__(
+        self,
+        months: List[str],
+        write: Callable[[str, pd.DataFrame], None],
+        skip: Optional[Callable[[str], None]] = None
+    ):
+        """
+        Args:
+            months: 到着する予定の年月（順不同）
+            write: 年月順に呼ばれる書き出し関数（年月, データ）
+            skip: 取得に失敗した月について年月順に呼ばれる関数（年月）
+        """
+        self._order = sorted(months)
+        self._next = 0
+        self._buffer: Dict[str, Optional[pd.DataFrame]] = {}
+        self._write = write
+        self._skip = skip
+        self.max_buffered = 0
+
+    def add(self, month: str, df: pd.DataFrame):
+        """取得した月のデータを渡す（書き出せる月があれば書き出す）"""
+        self._buffer[month] = df
+        self.max_buffered = max(self.max_buffered, sum(v is not None for v in self._buffer.values()))
+        self._flush()
+
+    def fail(self, month: str):
+        """取得に失敗した月を通知する（後続の月の書き出しを止めないため）"""
+        self._buffer[month] = None
+        self._flush()
+
+    def _flush(self):
+        """次に書き出すべき月から順に、到着済みの月を書き出す"""
+        while self._next < len(self._order) and self._order[self._next] in self._buffer:
+            month = self._order[self._next]
+            df = self._buffer.pop(month)
+            if df is not None:
+                self._write(month, df)
+            elif self._skip is not None:
+                self._skip(month)
+            self._next += 1
+
+    def close(self):
+        """
+        全ての月が書き出されたことを確認する
+
+        Raises:
+            RuntimeError: 到着していない月が残っている場合
+        """
+        if self._next < len(self._order):
+            missing = self._order[self._next:]
+            raise RuntimeError(f"未到着の月があります: {', '.join(missing)}")
+
+
+class TableMerger:
+    """
+    既存の統合ファイルに、年月順に届く月を差し込みながら書き出す
+
+    既存ファイルは年月順に保存されている前提で、iter_groups()で少しずつ読み込む。
+    新しい月が全て既存の最新月より後（append_only）でCSV形式の場合は、
+    ファイルを書き直さずに末尾へ追記する。
+
+    Attributes:
+        rows: 今回書き込んだ新しい月の行数
+        columns: 書き込んだデータの列数
+    """
+
+    def __init__(
+        self,
+        output_path: Path,
+        fmt: Optional[str] = None,
+        column: str = '年月',
+        dtype: Optional[Dict[str, str]] = None,
+        replace: bool = False,
+        append_only: bool = False
+    ):
+        """
+        Args:
+            output_path: 統合ファイルのパス
+            fmt: 出力形式（csv / parquet）
+            column: 年月列の名前
+            dtype: 既存のCSVを読み込む際に指定する列の型（省略時はスキーマの型）
+            replace: Trueの場合は既存ファイルを読まずに置き換える（全件取得時）
+            append_only: 新しい月が全て既存の最新月より後かどうか
+        """
+        self.fmt = get_output_format(fmt)
+        self.output_path = table_path(output_path, self.fmt)
+        self.rows = 0
+        self.columns = 0
+
+        exists = self.output_path.exists() and not replace
+        self._append = exists and append_only and self.fmt == CSV
+
+        self._existing: Optional[Iterator[Tuple[str, pd.DataFrame]]] = None
+        self._head: Optional[Tuple[str, pd.DataFrame]] = None
+        self._writer: Optional[TableWriter] = None
+
+        if not self._append:
+            self._writer = TableWriter(self.output_path, self.fmt)
+            if exists:
+                self._existing = iter_groups(self.output_path, column, dtype)
+                self._head = next(self._existing, None)
+
+    def _copy_existing(self, month: str, inclusive: bool):
+        """既存ファイルの month より前（inclusiveなら month を含む）の行を書き出す"""
+        while self._head is not None and (self._head[0] < month or (inclusive and self._head[0] == month)):
+            self._writer.write(self._head[1])
+            self._head = next(self._existing, None)
+
+    def write(self, month: str, df: pd.DataFrame):
+        """新たに取得した月を書き出す（既存ファイルの同じ月は置き換える）"""
+        if self._append:
+            append_table(df, self.output_path, self.fmt)
+        else:
+            self._copy_existing(month, inclusive=False)
+            while self._head is not None and self._head[0] == month:
+                self._head = next(self._existing, None)
+            self._writer.write(df)
+
+        self.rows += len(df)
+        self.columns = len(df.columns)
+
+    def skip(self, month: str):
+        """取得に失敗した月は既存ファイルの内容をそのまま残す"""
+        if not self._append:
+            self._copy_existing(month, inclusive=True)
+
+    def close(self) -> Optional[Path]:
+        """
+        残りの既存データを書き出して統合ファイルを置き換える
+
+        Returns:
+            統合ファイルのパス（何も書き込まなかった場合はNone）
+        """
+        if self._append:
+            return self.output_path if self.rows else None
+
+        if self._head is not None:
+            self._copy_existing(self._head[0], inclusive=True)
+            for _, group in self._existing:
+                self._writer.write(group)
+            self._head = None
+
+        return self._writer.close()
+
+    def abort(self):
+        """書き出しを中止する（既存ファイルはそのまま）"""
+        if self._writer is not None:
+            self._writer.abort()
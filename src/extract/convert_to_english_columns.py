@@ -1,48 +1,50 @@
 """
 データファイルのカラム名を英文字化する。
+
+ダウンロードスクリプトは取得時にメモリ上で同じ整形（cleaning.py）を行い
+data/cleaned/ に保存するため、このスクリプトは保存済みファイルから
+整形済みデータを作り直す場合（整形処理の変更時等）に使う。
 """
 
 import pandas as pd
 from pathlib import Path
-
-
-def convert_actual_wages_columns(input_file: Path, output_file: Path):
+from typing import Optional
+
+from cleaning import (
+    ACTUAL_WAGES_COLUMN_MAPPING,
+    clean_actual_wages,
+    clean_index_sheet,
+)
+from index_store import load_index_store, write_index_store
+from storage import (
+    list_partitions,
+    read_partitioned,
+    read_table,
+    resolve_table,
+    write_partitioned,
+    write_table,
+)
+
+
+def convert_actual_wages_columns(input_file: Path, output_file: Path, fmt: Optional[str] = None):
     """
     実数データのカラム名を英文字化
+
+    入力はCSV / Parquetのどちらでもよい（存在する方を読み込む）。
+    出力形式はfmt（省略時は環境変数 JMACRO_OUTPUT_FORMAT）に従う。
     """
+    input_file = resolve_table(input_file, fmt)
     print(f"処理中: {input_file.name}")
 
-    # カラム名マッピング
-    column_mapping = {
-        '年月': 'year_month',
-        '産業コード': 'industry_code',
-        '性別': 'gender',
-        '就業形態': 'employment_type',
-        '常用労働者数_前調査期間末': 'regular_workers_prev',
-        '常用労働者数_本月増加': 'regular_workers_increase',
-        '常用労働者数_本月減少': 'regular_workers_decrease',
-        '常用労働者数_本調査期間末': 'regular_workers_current',
-        'パートタイム労働者数': 'parttime_workers',
-        '出勤日数': 'working_days',
-        '実労働時間_総数': 'total_working_hours',
-        '実労働時間_所定内': 'scheduled_working_hours',
-        '実労働時間_所定外': 'overtime_hours',
-        '現金給与_総額': 'total_cash_earnings',
-        '現金給与_きまって支給': 'scheduled_cash_earnings',
-        '現金給与_所定内給与': 'contractual_cash_earnings',
-        '現金給与_超過労働給与': 'overtime_pay',
-        '現金給与_特別給与': 'special_cash_earnings'
-    }
-
-    # データ読み込み
-    df = pd.read_csv(input_file)
+    # データ読み込み（列の型はスキーマに従うため型推論を行わない）
+    df = read_table(input_file)
     print(f"  元データ: {len(df):,}行 x {len(df.columns)}列")
 
     # カラム名を英文字化
-    df = df.rename(columns=column_mapping)
+    df = clean_actual_wages(df)
 
     # 保存
-    df.to_csv(output_file, index=False, encoding='utf-8-sig')
+    output_file = write_table(df, output_file, fmt)
     print(f"  ✓ 英文字化完了: {output_file.name}")
     print(f"  保存データ: {len(df):,}行 x {len(df.columns)}列")
     print()
@@ -50,12 +52,41 @@ def convert_actual_wages_columns(input_file: Path, output_file: Path):
     return df
 
 
-def convert_index_columns(input_file: Path, output_file: Path, index_type: str):
+def convert_actual_wages_partitioned(input_root: Path, output_root: Path, fmt: Optional[str] = None):
+    """
+    パーティション分割された実数データのカラム名を英文字化
+
+    年月パーティションごとに読み込み・変換・保存するため、
+    メモリ使用量は1ヶ月分に収まる。
+    """
+    print(f"処理中: {input_root.name}/（パーティション分割）")
+
+    partitions = list_partitions(input_root)
+    total_rows = 0
+
+    for value in partitions:
+        df = read_partitioned(input_root, column='年月', values=[value])
+        df = clean_actual_wages(df)
+        write_partitioned(df, output_root, column=ACTUAL_WAGES_COLUMN_MAPPING['年月'], fmt=fmt)
+        total_rows += len(df)
+
+    print(f"  ✓ 英文字化完了: {output_root.name}/（{len(partitions)}パーティション）")
+    print(f"  保存データ: {total_rows:,}行")
+    print()
+
+
+def convert_index_columns(
+    input_file: Path,
+    output_file: Path,
+    index_type: str,
+    fmt: Optional[str] = None
+):
     """
     指数データのカラム名を英文字化
 
     指数データは特殊なヘッダー構造を持っているため、
     データ行のみを抽出して整形する
+    （入力はシートをそのまま保存したCSV、出力形式はfmtに従う）
     """
     print(f"処理中: {input_file.name} ({index_type})")
 
@@ -63,33 +94,11 @@ def convert_index_columns(input_file: Path, output_file: Path, index_type: str):
     df = pd.read_csv(input_file, header=None)
     print(f"  元データ: {len(df):,}行 x {len(df.columns)}列")
 
-    # データ行を抽出（10行目以降がデータ）
-    df_data = df.iloc[10:].copy()
-
-    # カラム名を設定
-    column_names = ['year', 'jan', 'feb', 'mar', 'apr', 'may', 'jun',
-                    'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-
-    # 必要な列数分のみカラム名を適用
-    df_data = df_data.iloc[:, :len(column_names)]
-    df_data.columns = column_names
-
-    # 年列を整数型に変換（エラーは除外）
-    df_data['year'] = pd.to_numeric(df_data['year'], errors='coerce')
-    df_data = df_data.dropna(subset=['year'])
-    df_data['year'] = df_data['year'].astype(int)
-
-    # 月のデータを数値型に変換
-    month_columns = ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
-                     'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
-    for col in month_columns:
-        df_data[col] = pd.to_numeric(df_data[col], errors='coerce')
-
-    # インデックスをリセット
-    df_data = df_data.reset_index(drop=True)
+    # データ行を抽出して整形
+    df_data = clean_index_sheet(df)
 
     # 保存
-    df_data.to_csv(output_file, index=False, encoding='utf-8-sig')
+    output_file = write_table(df_data, output_file, fmt)
     print(f"  ✓ 英文字化完了: {output_file.name}")
     print(f"  保存データ: {len(df_data):,}行 x {len(df_data.columns)}列")
     print(f"  期間: {df_data['year'].min()}年 ～ {df_data['year'].max()}年")
@@ -98,7 +107,12 @@ def convert_index_columns(input_file: Path, output_file: Path, index_type: str):
     return df_data
 
 
-def main():
+def main(partitioned: bool = False):
+    """
+    Args:
+        partitioned: Trueの場合、実数データ（過去分）をパーティション分割データセット
+            （data/actual_wages_historical/）から読み込み、同じレイアウトで保存する
+    """
     print("=" * 100)
     print("データファイルのカラム名英文字化")
     print("=" * 100)
@@ -111,10 +125,16 @@ def main():
     # 1. 実数データ（過去23ヶ月統合版）
     print("1. 実数データ（過去23ヶ月統合版）")
     print("-" * 100)
-    convert_actual_wages_columns(
-        data_dir / "actual_wages_historical.csv",
-        output_dir / "actual_wages_historical.csv"
-    )
+    if partitioned:
+        convert_actual_wages_partitioned(
+            data_dir / "actual_wages_historical",
+            output_dir / "actual_wages_historical"
+        )
+    else:
+        convert_actual_wages_columns(
+            data_dir / "actual_wages_historical.csv",
+            output_dir / "actual_wages_historical.csv"
+        )
 
     # 2. 実数データ（最新月）
     print("2. 実数データ（最新月）")
@@ -151,6 +171,15 @@ def main():
         "hours"
     )
 
+    # 6. 指数データの月次ストア
+    print("6. 指数データの月次ストア（3系列・縦長形式）")
+    print("-" * 100)
+    store = load_index_store(output_dir)
+    store_path = write_index_store(store, output_dir)
+    print(f"  ✓ 保存完了: {store_path.name}")
+    print(f"  保存データ: {len(store.frame):,}ヶ月 x {len(store.frame.columns)}系列")
+    print()
+
     print("=" * 100)
     print("✓ 全データファイルの英文字化が完了しました")
     print("=" * 100)
@@ -161,8 +190,16 @@ def main():
     print("  - wage_index.csv               : 給与指数（1952～2025）")
     print("  - employment_index.csv         : 雇用指数（1952～2025）")
     print("  - hours_index.csv              : 労働時間指数（1952～2025）")
+    print("  - index_monthly.csv            : 指数3系列の月次データ（縦長形式）")
     print()
 
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--partitioned', action='store_true',
+                        help='実数データ（過去分）をパーティション分割レイアウトで変換する')
+    args = parser.parse_args()
+
+    main(partitioned=args.partitioned)
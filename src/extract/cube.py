@@ -0,0 +1,319 @@
+"""
+実数データ（毎勤原表）のキューブ表現。
+
+整形済みの実数データ（1行 = 年月 × 産業 × 性別 × 就業形態）を、
+次元ごとのコード表と、測定値ごとの4次元NumPy配列
+（年月, 産業, 性別, 就業形態）に変換して保持する。
+
+- 次元のコードは小さな整数の位置に対応付け、コード → 位置の変換は
+  pd.Indexのハッシュ検索（O(1)）で行う
+- 測定値はスキーマの型に合わせ、人数・金額（INTEGER）はint32、
+  日数・時間（DECIMAL）はfloat64の配列で保持する。DECIMALの列は整形済みデータでは
+  float32のため、カラム定義の小数点以下の桁数で丸めて元データの値（151.7 等）に戻す
+  （float32のまま保持すると、派生指標に 151.6999969… のような誤差が出る）。
+  値の有無は測定値ごとの真偽値配列で表す（int32はNaNを持てないため）
+- 次元のコードが空の行（産業コード・性別がNULLの小計行、data/DATA_STRUCTURE.md参照）は
+  配列の位置を持たないため、キューブには含めない（行形式の整形済みデータには残る）
+- 同じ（年月, 産業, 性別, 就業形態）の行が複数ある場合は、後にある行を使う
+  （統合ファイルでは後から差し込んだ月・改訂後の値が後に来るため）
+
+ダッシュボードの切り出し・集計は、オブジェクト型の列に対する
+真偽値マスクの代わりに配列の添字指定で済む：
+
+    cube = load_cube()
+    cube.series('total_cash_earnings', industry='T', gender='F')
+    cube.get('total_cash_earnings', month='2025-11', gender='T', employment_type='T')
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from cleaning import ACTUAL_WAGES_COLUMN_MAPPING, CLEANED_DIRNAME
+from schema import table_dtypes, table_scales
+from storage import read_partitioned, read_table, resolve_table
+
+
+# キューブの次元（整形済みデータの列名、配列の軸の順）
+DIMENSIONS = ('year_month', 'industry_code', 'gender', 'employment_type')
+
+# get()・series()で次元を指定する際の名前 → 軸の位置
+AXES = {'month': 0, 'industry': 1, 'gender': 2, 'employment_type': 3}
+
+# 整形済みの実数データ（過去分）
+DEFAULT_PATH = Path("data") / CLEANED_DIRNAME / "actual_wages_historical.csv"
+
+# 次元の指定（コード1つ、またはNoneで全て）
+Selector = Optional[Union[str, slice]]
+
+
+def _measure_dtype(dtype: str) -> np.dtype:
+    """スキーマの型から測定値の配列の型を決める"""
+    return np.dtype(np.int32) if dtype == 'Int32' else np.dtype(np.float64)
+
+
+@dataclass
+class WageCube:
+    """
+    実数データのキューブ
+
+    Attributes:
+        dimensions: 次元名 → コードのIndex（配列の各軸の位置に対応）
+        values: 測定値名 → 4次元配列（年月, 産業, 性別, 就業形態）
+        valid: 測定値名 → 値の有無を表す4次元の真偽値配列
+    """
+    dimensions: Dict[str, pd.Index]
+    values: Dict[str, np.ndarray]
+    valid: Dict[str, np.ndarray]
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "WageCube":
+        """
+        整形済みの実数データからキューブを作成する
+
+        各次元のカテゴリのコード（整数）をそのまま配列の添字として使い、
+        測定値ごとに1回の添字代入で配列に格納する。
+        次元のコードが空の行（小計行）は除き、同じセルの行が複数ある場合は後の行を使う。
+
+        Args:
+            df: 実数データ（英文字・日本語カラム名のどちらでもよい）
+
+        Returns:
+            WageCube
+        """
+        df = df.rename(columns=ACTUAL_WAGES_COLUMN_MAPPING)
+
+        # 次元のコードが空の行（小計行）は配列の位置を持たないため除く
+        keys = pd.DataFrame({name: df[name].astype('string') for name in DIMENSIONS})
+        coded = keys.notna().all(axis=1).to_numpy()
+        df = df[coded]
+        keys = keys[coded]
+
+        dimensions = {}
+        positions = []
+        for name in DIMENSIONS:
+            codes = pd.Categorical(keys[name])
+            dimensions[name] = pd.Index(codes.categories.astype(str), name=name)
+            positions.append(codes.codes.astype(np.intp))
+
+        shape = tuple(len(dimensions[name]) for name in DIMENSIONS)
+        cells = np.ravel_multi_index(positions, shape)
+
+        # 同じセルの行が複数ある場合は後の行だけを残す（逆順で最初に現れる行）
+        _, last = np.unique(cells[::-1], return_index=True)
+        if len(last) != len(cells):
+            keep = np.sort(len(cells) - 1 - last)
+            df = df.iloc[keep]
+            positions = [axis[keep] for axis in positions]
+
+        schema = table_dtypes('actual_wages')
+        scales = table_scales('actual_wages')
+        values = {}
+        valid = {}
+        for name in df.columns:
+            if name in DIMENSIONS or name not in schema or schema[name] == 'category':
+                continue
+
+            column = pd.to_numeric(df[name], errors='coerce')
+            present = column.notna().to_numpy()
+            dtype = _measure_dtype(schema[name])
+
+            array = np.zeros(shape, dtype=dtype) if dtype.kind == 'i' else np.full(shape, np.nan, dtype=dtype)
+            mask = np.zeros(shape, dtype=bool)
+
+            index = tuple(axis[present] for axis in positions)
+            column_values = column.to_numpy(dtype=np.float64, na_value=np.nan)[present]
+            if name in scales:
+                column_values = np.round(column_values, scales[name])
+            array[index] = column_values.astype(dtype, copy=False)
+            mask[index] = True
+
+            values[name] = array
+            valid[name] = mask
+
+        return cls(dimensions, values, valid)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """配列の形（年月数, 産業数, 性別数, 就業形態数）"""
+        return tuple(len(self.dimensions[name]) for name in DIMENSIONS)
+
+    @property
+    def months(self) -> pd.Index:
+        """年月のコード（昇順）"""
+        return self.dimensions['year_month']
+
+    @property
+    def nbytes(self) -> int:
+        """測定値と有無の配列が使うメモリ（バイト）"""
+        arrays = list(self.values.values()) + list(self.valid.values())
+        return sum(array.nbytes for array in arrays)
+
+    def position(self, axis: str, code: str) -> int:
+        """
+        次元のコードを配列の位置に変換する
+
+        Args:
+            axis: month / industry / gender / employment_type
+            code: コード（例: 2025-11、T）
+
+        Returns:
+            配列の軸上の位置
+
+        Raises:
+            KeyError: キューブに無いコードの場合
+        """
+        return self.dimensions[DIMENSIONS[AXES[axis]]].get_loc(str(code))
+
+    def _index(self, selectors: Dict[str, Selector]) -> Tuple:
+        """次元の指定を配列の添字に変換する"""
+        index = [slice(None)] * len(DIMENSIONS)
+        for axis, selector in selectors.items():
+            if selector is None:
+                continue
+            if isinstance(selector, slice):
+                # 年月等のコードの範囲（両端を含む）
+                codes = self.dimensions[DIMENSIONS[AXES[axis]]]
+                start, stop = codes.slice_locs(selector.start, selector.stop)
+                index[AXES[axis]] = slice(start, stop)
+            else:
+                index[AXES[axis]] = self.position(axis, selector)
+        return tuple(index)
+
+    def get(
+        self,
+        measure: str,
+        month: Selector = None,
+        industry: Selector = None,
+        gender: Selector = None,
+        employment_type: Selector = None,
+        fill_value: float = np.nan
+    ) -> Union[np.ndarray, float]:
+        """
+        測定値を切り出す（配列の添字指定のみで、行の走査は行わない）
+
+        Args:
+            measure: 測定値の列名（例: total_cash_earnings）
+            month: 年月（例: '2025-11'、slice('2024-01', '2024-12')で範囲）
+            industry: 産業コード
+            gender: 性別
+            employment_type: 就業形態
+            fill_value: 値が無いセルに入れる値
+
+        Returns:
+            全ての次元を指定した場合は値1つ、それ以外は残りの次元の配列
+            （値が無いセルを含む場合はfloat64）
+        """
+        index = self._index({
+            'month': month,
+            'industry': industry,
+            'gender': gender,
+            'employment_type': employment_type,
+        })
+        values = self.values[measure][index]
+        mask = self.valid[measure][index]
+
+        if np.all(mask):
+            return values
+        return np.where(mask, values, fill_value)
+
+    def series(
+        self,
+        measure: str,
+        industry: str = 'T',
+        gender: str = 'T',
+        employment_type: str = 'T'
+    ) -> pd.Series:
+        """
+        1つの組み合わせの月次系列を返す
+
+        Args:
+            measure: 測定値の列名
+            industry: 産業コード（デフォルトは調査産業計）
+            gender: 性別（デフォルトは男女計）
+            employment_type: 就業形態（デフォルトは就業形態計）
+
+        Returns:
+            月次のPeriodIndexを持つSeries（値が無い月はNaN）
+        """
+        values = self.get(measure, industry=industry, gender=gender, employment_type=employment_type)
+        return pd.Series(
+            values,
+            index=pd.PeriodIndex(self.months, freq='M', name='year_month'),
+            name=measure
+        )
+
+    def aggregate(self, measure: str, over: Tuple[str, ...], how: str = 'sum') -> np.ndarray:
+        """
+        指定した次元について測定値を集計する（値が無いセルは除く）
+
+        合計・計の行（T）が用意されている場合はそちらをget()で使う方がよい。
+        これはT行の無い組み合わせ（例: 特定の産業群の合計）用。
+
+        Args:
+            measure: 測定値の列名
+            over: 集計する次元（例: ('industry',)）
+            how: sum / mean
+
+        Returns:
+            集計後の配列（集計した次元が除かれる。sumはint64 / float64、meanはfloat64）
+        """
+        axes = tuple(AXES[axis] for axis in over)
+        values = self.values[measure]
+        mask = self.valid[measure]
+
+        accumulator = np.int64 if values.dtype.kind == 'i' else np.float64
+        total = np.sum(values, axis=axes, where=mask, dtype=accumulator)
+
+        if how == 'sum':
+            return total
+        if how == 'mean':
+            count = np.sum(mask, axis=axes)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                return np.where(count > 0, total / count, np.nan)
+        raise ValueError(f"未対応の集計方法です: {how}")
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        キューブを行形式の整形済みデータに戻す（いずれかの測定値があるセルのみ）
+
+        Returns:
+            DataFrame（次元の列はカテゴリ型、測定値はスキーマの型）
+        """
+        present = np.logical_or.reduce(list(self.valid.values())) if self.valid else np.zeros(self.shape, bool)
+        positions = np.nonzero(present)
+
+        schema = table_dtypes('actual_wages')
+        scales = table_scales('actual_wages')
+        columns = {}
+        for name, axis in zip(DIMENSIONS, positions):
+            codes = self.dimensions[name]
+            columns[name] = pd.Categorical.from_codes(axis, categories=codes)
+        for name, array in self.values.items():
+            column = pd.Series(array[positions])
+            column[~self.valid[name][positions]] = None
+            columns[name] = column.astype(schema[name]).array
+
+        return pd.DataFrame(columns)
+
+
+def load_cube(path: Path = DEFAULT_PATH) -> WageCube:
+    """
+    整形済みの実数データを読み込んでキューブを作成する
+
+    Args:
+        path: 統合ファイル（CSV / Parquet）またはパーティション分割データセットのディレクトリ
+
+    Returns:
+        WageCube
+    """
+    path = Path(path)
+    if path.is_dir():
+        df = read_partitioned(path, column=DIMENSIONS[0])
+    else:
+        df = read_table(resolve_table(path))
+
+    return WageCube.from_frame(df)
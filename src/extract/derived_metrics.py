@@ -0,0 +1,613 @@
+"""
+整形済みデータから派生指標を計算し、ダッシュボード用の小さな表として保存する。
+
+SPEC.mdの問い（実質賃金・男女間賃金格差・パートタイムの賃金動向・残業時間の
+トレンド）に答える指標を、クエリのたびに実数データ全体から計算し直す代わりに、
+英文字化の後に1回だけ計算して data/derived/ に保存する。
+
+- wage_trends: 主要な測定値の前年同月比（%）・3ヶ月 / 12ヶ月移動平均
+  （年月 × 産業 × 性別 × 就業形態）
+- gender_gap: 男女間賃金格差（女性 / 男性の比率、産業 × 就業形態）
+- parttime_gap: パートタイム / 一般労働者の賃金比率（月額・時間当たり、産業 × 性別）
+- real_wage_index: 現金給与総額指数を消費者物価指数で割った実質賃金指数
+  （消費者物価指数のファイルを用意した場合のみ）
+
+計算はキューブ（cube.py）の4次元配列に対する配列演算で行う。
+
+月次の差分更新（年月の追加・改訂）では、全期間を計算し直さずに、
+変わった年月の影響を受ける出力の年月だけを計算し直す（update_derived()）。
+年月 m の値は、前年同月比では m と m + 12、k ヶ月移動平均では m ～ m + k - 1 の
+出力に影響する。そこで出力ごとに参照する過去の月数（LOOKBACK）を定め、
+影響を受ける年月と、その計算に必要な入力の年月だけを使って計算し直す。
+整形済みデータがパーティション分割データセットの場合は必要な年月の
+パーティションだけを開くため、履歴が長くなっても更新の費用は変わらない。
+統合ファイル（CSV等）の場合は、ファイル全体を年月ごとに読み進めて必要な年月だけを
+残すため、メモリ使用量と計算量は影響を受ける年月分で済むが、読み込みは履歴の長さに比例する。
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from cleaning import CLEANED_DIRNAME, INDEX_COLUMNS
+from cube import DIMENSIONS, WageCube, load_cube
+from index_store import IndexStore, load_index_store
+from schema import table_scales
+from storage import (
+    PARTITION_KEY,
+    partition_dir,
+    read_months,
+    read_table,
+    resolve_table,
+    write_partitioned,
+    write_table,
+)
+
+
+# 派生指標の保存先ディレクトリ名（data/ からの相対パス）
+DERIVED_DIRNAME = 'derived'
+
+# 前年同月比・移動平均を計算する測定値
+TREND_MEASURES = (
+    'total_cash_earnings',
+    'scheduled_cash_earnings',
+    'contractual_cash_earnings',
+    'total_working_hours',
+    'overtime_hours',
+)
+
+# 移動平均の月数
+MOVING_AVERAGE_WINDOWS = (3, 12)
+
+# 格差の計算に使う測定値
+GAP_MEASURE = 'total_cash_earnings'
+
+# 消費者物価指数（年月, 指数値）のファイル名（data/cleaned/ 配下、任意）
+CPI_FILENAME = 'cpi_index.csv'
+
+# 実質賃金指数の表の列
+REAL_WAGE_COLUMNS = ['year_month', 'nominal_wage_index', 'cpi', 'real_wage_index', 'real_wage_yoy']
+
+# 計算し直せなかった年月の記録（data/derived/ 配下、次回の更新で計算し直す）
+PENDING_FILENAME = '_pending.json'
+
+# 出力の年月ごとに参照する過去の月数（前年同月比は12ヶ月前、k ヶ月移動平均は k - 1 ヶ月前まで）
+TREND_LOOKBACK = max(12, max(MOVING_AVERAGE_WINDOWS) - 1)
+
+# 性別・就業形態のコード（data/master/ 参照）
+MALE, FEMALE = 'M', 'F'
+GENERAL, PARTTIME = 'N', 'P'
+
+
+def monthly_array(cube: WageCube, measure: str):
+    """
+    測定値を年月が連続する配列（欠けた月・値の無いセルはNaN）に変換する
+
+    Args:
+        cube: 実数データのキューブ
+        measure: 測定値の列名
+
+    Returns:
+        (配列（年月, 産業, 性別, 就業形態）float64, 連続した月次PeriodIndex)
+
+    前年同月比・比率はこの配列（キューブが元データの桁数で保持したfloat64の値）から
+    float64で計算するため、float32の丸め誤差は出力に含まれない。
+    """
+    periods = pd.PeriodIndex(cube.months, freq='M')
+    offsets = periods.asi8 - periods.asi8[0]
+    months = pd.period_range(periods[0], periods[-1], freq='M', name='year_month')
+
+    array = np.full((len(months),) + cube.shape[1:], np.nan)
+    array[offsets] = np.where(cube.valid[measure], cube.values[measure], np.nan)
+
+    return array, months
+
+
+def shift_ratio(array: np.ndarray, periods: int) -> np.ndarray:
+    """periods ヶ月前との変化率（%）を年月の軸に沿って計算する（先頭はNaN）"""
+    result = np.full(array.shape, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result[periods:] = (array[periods:] / array[:-periods] - 1) * 100
+    return result
+
+
+def moving_average(array: np.ndarray, window: int) -> np.ndarray:
+    """window ヶ月の後方移動平均（window ヶ月分の値がそろわない月はNaN）"""
+    result = np.full(array.shape, np.nan)
+    if len(array) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(array, window, axis=0)
+        result[window - 1:] = windows.mean(axis=-1)
+    return result
+
+
+def _to_frame(arrays: Dict[str, np.ndarray], axes: List[pd.Index]) -> pd.DataFrame:
+    """
+    同じ形の配列を、軸の組み合わせごとに1行の表に変換する（全ての値がNaNの行は除く）
+
+    MultiIndex.from_productの行の順序は配列を行優先で並べた順序と一致するため、
+    各配列をravel()するだけで列になる。
+    """
+    index = pd.MultiIndex.from_product(axes)
+    df = pd.DataFrame({name: array.ravel() for name, array in arrays.items()}, index=index)
+    df = df.dropna(how='all').reset_index()
+
+    df['year_month'] = df['year_month'].astype(str)
+    for name in [axis.name for axis in axes]:
+        df[name] = df[name].astype('category')
+    return df
+
+
+def _axes(cube: WageCube, months: pd.PeriodIndex, drop: Sequence[str] = ()) -> List[pd.Index]:
+    """_to_frame()に渡す軸（年月は連続した月次、dropした次元は除く）"""
+    axes = [months]
+    for name in DIMENSIONS[1:]:
+        if name not in drop:
+            axes.append(cube.dimensions[name])
+    return axes
+
+
+def wage_trends(cube: WageCube, measures: Sequence[str] = TREND_MEASURES) -> pd.DataFrame:
+    """
+    主要な測定値の前年同月比・移動平均
+
+    Args:
+        cube: 実数データのキューブ
+        measures: 計算する測定値
+
+    Returns:
+        year_month, industry_code, gender, employment_type と、測定値ごとの
+        値・<測定値>_yoy・<測定値>_ma3・<測定値>_ma12 列のDataFrame
+    """
+    arrays = {}
+    months = None
+    for measure in measures:
+        if measure not in cube.values:
+            continue
+        array, months = monthly_array(cube, measure)
+        arrays[measure] = array
+        arrays[f"{measure}_yoy"] = shift_ratio(array, 12)
+        for window in MOVING_AVERAGE_WINDOWS:
+            arrays[f"{measure}_ma{window}"] = moving_average(array, window)
+
+    if months is None:
+        return pd.DataFrame()
+    return _to_frame(arrays, _axes(cube, months))
+
+
+def gender_gap(cube: WageCube, measure: str = GAP_MEASURE) -> pd.DataFrame:
+    """
+    男女間賃金格差（産業 × 就業形態）
+
+    Args:
+        cube: 実数データのキューブ
+        measure: 比較する測定値
+
+    Returns:
+        year_month, industry_code, employment_type, male, female,
+        female_to_male_ratio（女性 / 男性）, gap_pct（(1 - 比率) × 100）列のDataFrame
+    """
+    array, months = monthly_array(cube, measure)
+    genders = cube.dimensions['gender']
+    male = array[:, :, genders.get_loc(MALE), :]
+    female = array[:, :, genders.get_loc(FEMALE), :]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = female / male
+
+    return _to_frame(
+        {'male': male, 'female': female, 'female_to_male_ratio': ratio, 'gap_pct': (1 - ratio) * 100},
+        _axes(cube, months, drop=('gender',))
+    )
+
+
+def parttime_gap(cube: WageCube, measure: str = GAP_MEASURE) -> pd.DataFrame:
+    """
+    パートタイム労働者と一般労働者の賃金比率（産業 × 性別）
+
+    時間当たりの比率は、測定値を総実労働時間で割った値どうしで比較する。
+
+    Args:
+        cube: 実数データのキューブ
+        measure: 比較する測定値
+
+    Returns:
+        year_month, industry_code, gender, general, parttime,
+        parttime_to_general_ratio, hourly_ratio 列のDataFrame
+    """
+    array, months = monthly_array(cube, measure)
+    hours, _ = monthly_array(cube, 'total_working_hours')
+    types = cube.dimensions['employment_type']
+    general_pos, parttime_pos = types.get_loc(GENERAL), types.get_loc(PARTTIME)
+
+    general = array[..., general_pos]
+    parttime = array[..., parttime_pos]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        ratio = parttime / general
+        hourly_ratio = (parttime / hours[..., parttime_pos]) / (general / hours[..., general_pos])
+
+    return _to_frame(
+        {
+            'general': general,
+            'parttime': parttime,
+            'parttime_to_general_ratio': ratio,
+            'hourly_ratio': hourly_ratio,
+        },
+        _axes(cube, months, drop=('employment_type',))
+    )
+
+
+def real_wage(store: IndexStore, cpi: pd.Series) -> pd.DataFrame:
+    """
+    現金給与総額指数を消費者物価指数で割った実質賃金指数
+
+    消費者物価指数は賃金指数と同じ基準年（例: 2020年=100）のものを使う。
+
+    Args:
+        store: 指数データの月次ストア（wage系列を使う）
+        cpi: 消費者物価指数（月次PeriodIndex）
+
+    Returns:
+        year_month, nominal_wage_index, cpi, real_wage_index, real_wage_yoy 列のDataFrame
+        （両方の値がそろう月のみ）
+    """
+    if 'wage' not in store.frame.columns:
+        return pd.DataFrame(columns=REAL_WAGE_COLUMNS)
+
+    # 指数はfloat32で保持しているため、カラム定義の桁数で丸めて元データの値に戻してから計算する
+    scale = table_scales('wage_index')[INDEX_COLUMNS[1]]
+    nominal = store.monthly()['wage'].astype('float64').round(scale)
+    frame = pd.DataFrame({'nominal_wage_index': nominal, 'cpi': cpi}).dropna()
+    if frame.empty:
+        return pd.DataFrame(columns=REAL_WAGE_COLUMNS)
+    months = pd.period_range(frame.index.min(), frame.index.max(), freq='M', name='year_month')
+    frame = frame.reindex(months)
+
+    frame['real_wage_index'] = frame['nominal_wage_index'] / frame['cpi'] * 100
+    frame['real_wage_yoy'] = shift_ratio(frame['real_wage_index'].to_numpy(), 12)
+
+    frame = frame.dropna(subset=['real_wage_index']).reset_index()
+    frame['year_month'] = frame['year_month'].astype(str)
+    return frame
+
+
+def load_cpi(path: Path) -> Optional[pd.Series]:
+    """
+    消費者物価指数のファイル（year_month, value）を読み込む
+
+    Args:
+        path: ファイルのパス
+
+    Returns:
+        月次PeriodIndexのSeries（ファイルが無ければNone）
+    """
+    path = resolve_table(path)
+    if not path.exists():
+        return None
+    df = read_table(path)
+    return pd.Series(
+        pd.to_numeric(df['value'], errors='coerce').to_numpy(),
+        index=pd.PeriodIndex(df['year_month'].astype(str), freq='M', name='year_month')
+    )
+
+
+# キューブから計算する表 → (計算する関数, 参照する過去の月数)
+CUBE_TABLES = {
+    'wage_trends': (wage_trends, TREND_LOOKBACK),
+    'gender_gap': (gender_gap, 0),
+    'parttime_gap': (parttime_gap, 0),
+}
+
+
+def _month_ordinals(months: Iterable[str]) -> np.ndarray:
+    """YYYY-MM形式の年月を月の通し番号の配列に変換する"""
+    return pd.PeriodIndex(list(months), freq='M').asi8
+
+
+def _months_from_ordinals(ordinals: np.ndarray) -> List[str]:
+    """月の通し番号を重複の無い昇順のYYYY-MM形式の年月に変換する"""
+    return [str(pd.Period(ordinal=int(ordinal), freq='M')) for ordinal in np.unique(ordinals)]
+
+
+def affected_months(changed: Iterable[str], lookback: int) -> List[str]:
+    """
+    年月の追加・改訂の影響を受ける出力の年月を返す
+
+    Args:
+        changed: 追加・改訂された年月（YYYY-MM形式）
+        lookback: 出力が参照する過去の月数
+
+    Returns:
+        changed の各年月 m について m ～ m + lookback の年月（昇順、重複なし）
+    """
+    ordinals = _month_ordinals(changed)
+    return _months_from_ordinals((ordinals[:, None] + np.arange(lookback + 1)).ravel())
+
+
+def required_months(affected: Iterable[str], lookback: int) -> List[str]:
+    """
+    出力の年月を計算するのに必要な入力の年月を返す
+
+    Args:
+        affected: 計算する出力の年月
+        lookback: 出力が参照する過去の月数
+
+    Returns:
+        affected の各年月 a について a - lookback ～ a の年月（昇順、重複なし）
+    """
+    ordinals = _month_ordinals(affected)
+    return _months_from_ordinals((ordinals[:, None] - np.arange(lookback + 1)).ravel())
+
+
+def _historical_path(cleaned_dir: Path) -> Path:
+    """整形済みの実数データ（パーティション分割データセットがあればそのディレクトリ）"""
+    partitioned = cleaned_dir / 'actual_wages_historical'
+    if partitioned.is_dir():
+        return partitioned
+    return resolve_table(cleaned_dir / 'actual_wages_historical.csv')
+
+
+def _write(
+    df: pd.DataFrame,
+    output_dir: Path,
+    name: str,
+    fmt: Optional[str],
+    partitioned: bool,
+    months: Optional[List[str]] = None
+) -> Path:
+    """
+    派生指標の表を保存する
+
+    months を指定した場合は、その年月の行だけを置き換える
+    （パーティション分割レイアウトでは対象の年月のパーティションだけを書き込み、
+    計算し直した結果に行が無い年月のパーティションは削除する）。
+    """
+    if partitioned:
+        root = output_dir / name
+        written = set(write_partitioned(df, root, column=PARTITION_KEY, fmt=fmt))
+        for month in months or []:
+            if month not in written:
+                shutil.rmtree(partition_dir(root, month), ignore_errors=True)
+        return root
+
+    path = output_dir / f"{name}.csv"
+    existing_path = resolve_table(path, fmt)
+    if months is not None and existing_path.exists():
+        existing = read_table(existing_path)
+        existing = existing[~existing[PARTITION_KEY].astype(str).isin(months)]
+        df = pd.concat([existing, df], ignore_index=True)
+        df[PARTITION_KEY] = df[PARTITION_KEY].astype(str)
+        df = df.sort_values(PARTITION_KEY, kind='stable', ignore_index=True)
+    return write_table(df, path, fmt)
+
+
+def _real_wage_table(cleaned_dir: Path) -> Optional[pd.DataFrame]:
+    """消費者物価指数のファイルがあれば実質賃金指数を計算する（無ければNone）"""
+    cpi = load_cpi(cleaned_dir / CPI_FILENAME)
+    if cpi is None:
+        print(f"  消費者物価指数（{CPI_FILENAME}）が無いため、実質賃金指数は計算しません")
+        return None
+    return real_wage(load_index_store(cleaned_dir), cpi)
+
+
+def materialize(
+    data_dir: Path = Path("data"),
+    fmt: Optional[str] = None
+) -> Dict[str, Path]:
+    """
+    全ての派生指標を全期間について計算して data/derived/ に保存する
+
+    整形済みの実数データがパーティション分割データセットの場合は、
+    派生指標も年月ごとのパーティション（data/derived/<表>/year_month=…/）として保存する。
+
+    Args:
+        data_dir: データディレクトリ（cleaned/ を読み込み、derived/ に保存）
+        fmt: 出力形式（csv / parquet）
+
+    Returns:
+        表の名前 → 保存したファイル（ディレクトリ）のパス
+    """
+    cleaned_dir = Path(data_dir) / CLEANED_DIRNAME
+    output_dir = Path(data_dir) / DERIVED_DIRNAME
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    historical = _historical_path(cleaned_dir)
+    partitioned = historical.is_dir()
+    cube = load_cube(historical)
+
+    tables = {name: compute(cube) for name, (compute, _) in CUBE_TABLES.items()}
+
+    real_wage_df = _real_wage_table(cleaned_dir)
+    if real_wage_df is not None:
+        tables['real_wage_index'] = real_wage_df
+
+    outputs = {}
+    for name, df in tables.items():
+        outputs[name] = _write(df, output_dir, name, fmt, partitioned and name in CUBE_TABLES)
+        print(f"  ✓ {name}: {len(df):,}行 → {outputs[name]}")
+
+    return outputs
+
+
+def update_derived(
+    changed: Iterable[str],
+    data_dir: Path = Path("data"),
+    fmt: Optional[str] = None
+) -> Dict[str, Path]:
+    """
+    追加・改訂された年月の影響を受ける出力の年月だけを計算し直す
+
+    表ごとに、影響を受ける年月（affected_months()、入力の最新月まで）と、その計算に必要な
+    入力の年月（required_months()）を求め、入力はその年月の分だけを使って
+    キューブを作成する。計算結果のうち影響を受ける年月の行だけで保存済みの
+    表を置き換える。入力の読み込み（storage.read_months()）は、パーティション分割
+    データセットでは対象の年月のパーティションだけを開くが、統合ファイルでは
+    ファイル全体を年月ごとに読み進める。
+
+    実質賃金指数は指数データ（全期間で数百ヶ月）から作るため、毎回全体を計算し直す。
+
+    Args:
+        changed: 追加・改訂された年月（YYYY-MM形式）
+        data_dir: データディレクトリ（cleaned/ を読み込み、derived/ に保存）
+        fmt: 出力形式（csv / parquet）
+
+    Returns:
+        表の名前 → 保存したファイル（ディレクトリ）のパス
+    """
+    changed = sorted(set(changed))
+    if not changed:
+        return {}
+
+    cleaned_dir = Path(data_dir) / CLEANED_DIRNAME
+    output_dir = Path(data_dir) / DERIVED_DIRNAME
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    historical = _historical_path(cleaned_dir)
+    partitioned = historical.is_dir()
+
+    # 参照する月数が最も長い表に必要な年月を1回だけ読み込み、他の表はその一部を使う
+    max_lookback = max(lookback for _, lookback in CUBE_TABLES.values())
+    inputs = read_months(historical, required_months(affected_months(changed, max_lookback), max_lookback))
+    if inputs.empty:
+        return {}
+    inputs[PARTITION_KEY] = inputs[PARTITION_KEY].astype(str)
+    # 入力の最新月より後の年月には出力の行が無いため、影響を受ける年月は最新月までにする
+    latest = inputs[PARTITION_KEY].max()
+
+    outputs = {}
+    for name, (compute, lookback) in CUBE_TABLES.items():
+        affected = [month for month in affected_months(changed, lookback) if month <= latest]
+        if not affected:
+            continue
+        needed = required_months(affected, lookback)
+        cube = WageCube.from_frame(inputs[inputs[PARTITION_KEY].isin(needed)])
+
+        df = compute(cube)
+        df = df[df[PARTITION_KEY].astype(str).isin(affected)].reset_index(drop=True)
+
+        outputs[name] = _write(df, output_dir, name, fmt, partitioned, months=affected)
+        print(f"  ✓ {name}: {affected[0]} ～ {affected[-1]}（{len(df):,}行）→ {outputs[name]}")
+
+    real_wage_df = _real_wage_table(cleaned_dir)
+    if real_wage_df is not None:
+        outputs['real_wage_index'] = _write(real_wage_df, output_dir, 'real_wage_index', fmt, False)
+
+    return outputs
+
+
+def load_pending(data_dir: Path = Path("data")) -> Dict:
+    """
+    前回計算し直せなかった年月を読み込む
+
+    Args:
+        data_dir: データディレクトリ
+
+    Returns:
+        {'full': 全期間の計算が必要か, 'months': 年月のリスト}
+    """
+    path = Path(data_dir) / DERIVED_DIRNAME / PENDING_FILENAME
+    if not path.exists():
+        return {'full': False, 'months': []}
+    with open(path, 'r', encoding='utf-8') as f:
+        pending = json.load(f)
+    return {'full': bool(pending.get('full')), 'months': list(pending.get('months', []))}
+
+
+def save_pending(pending: Dict, data_dir: Path = Path("data")):
+    """
+    計算し直せなかった年月を記録する（無ければ記録を削除する）
+
+    Args:
+        pending: {'full': 全期間の計算が必要か, 'months': 年月のリスト}
+        data_dir: データディレクトリ
+    """
+    path = Path(data_dir) / DERIVED_DIRNAME / PENDING_FILENAME
+    if not pending['full'] and not pending['months']:
+        path.unlink(missing_ok=True)
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'full': pending['full'], 'months': sorted(set(pending['months']))}, f, ensure_ascii=False, indent=2)
+
+
+def refresh_derived(
+    changed: Iterable[str],
+    data_dir: Path = Path("data"),
+    fmt: Optional[str] = None,
+    full: bool = False
+) -> bool:
+    """
+    派生指標を更新する（取得処理から呼び出す、失敗しても例外を送出しない）
+
+    前回計算し直せなかった年月（PENDING_FILENAME）も合わせて計算し直す。
+    失敗した場合は対象の年月を記録し、次回の更新（取得する月が無い場合も含む）で計算し直す。
+
+    Args:
+        changed: 追加・改訂された年月
+        data_dir: データディレクトリ
+        fmt: 出力形式（csv / parquet）
+        full: Trueの場合は全期間を計算し直す
+
+    Returns:
+        成功した場合（更新する年月が無い場合を含む）はTrue
+    """
+    pending = load_pending(data_dir)
+    pending = {
+        'full': full or pending['full'],
+        'months': sorted(set(changed) | set(pending['months'])),
+    }
+    if not pending['full'] and not pending['months']:
+        return True
+
+    try:
+        if pending['full']:
+            materialize(data_dir, fmt)
+        else:
+            update_derived(pending['months'], data_dir, fmt)
+    except Exception as e:
+        save_pending(pending, data_dir)
+        print(f"  ✗ 派生指標の更新に失敗しました（次回の更新で計算し直します）: {e}")
+        return False
+
+    save_pending({'full': False, 'months': []}, data_dir)
+    return True
+
+
+def main(changed: Optional[List[str]] = None):
+    """
+    Args:
+        changed: 追加・改訂された年月（省略時は全期間を計算し直す）
+    """
+    print("=" * 100)
+    print("派生指標の計算（前年同月比・移動平均・格差・実質賃金）")
+    print("=" * 100)
+    print()
+
+    if changed:
+        print(f"モード: 差分更新（{', '.join(sorted(changed))}、前回計算し直せなかった年月を含む）")
+    else:
+        print("モード: 全期間")
+
+    if not refresh_derived(changed or [], full=not changed):
+        return 1
+
+    print()
+    print("保存先: data/derived/")
+    return 0
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--months', nargs='+', metavar='YYYY-MM',
+                        help='追加・改訂された年月（影響を受ける年月だけを計算し直す）')
+    args = parser.parse_args()
+
+    sys.exit(main(args.months))
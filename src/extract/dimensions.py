@@ -0,0 +1,208 @@
+"""
+Dimension index decoded from e-Stat CLASS_INF.
+
+getStatsData rows carry only codes (``@cat01``, ``@area``, ``@time``, ...);
+their names, hierarchy levels and parent codes are described once per
+table in CLASS_INF. DimensionIndex decodes that section into per-dimension
+lookup arrays so that a frame can be labelled without extra API calls or
+hand-written code maps.
+
+Labelling works on categorical columns: each distinct code is resolved
+once (an Index.get_indexer over the categories), and the per-row result is
+a single take() of the category codes, so the cost does not grow with
+Python-level work per row.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class Dimension:
+    """
+    One classification (CLASS_OBJ) of a statistical table.
+
+    Attributes:
+        id: Dimension ID as used in VALUE keys without ``@`` (e.g. ``cat01``)
+        name: Name of the classification
+        codes: Codes of the classification items
+        names: Item names, aligned with ``codes``
+        levels: Hierarchy levels (1 = top), aligned with ``codes``; 0 if absent
+        parents: Parent codes, aligned with ``codes``; None for top-level items
+        units: Units, aligned with ``codes``; None if absent
+    """
+    id: str
+    name: str
+    codes: pd.Index
+    names: np.ndarray
+    levels: np.ndarray
+    parents: np.ndarray
+    units: np.ndarray
+
+    @classmethod
+    def from_class_obj(cls, class_obj: Dict[str, Any]) -> "Dimension":
+        """
+        Decode a CLASS_OBJ entry.
+
+        Args:
+            class_obj: Entry with ``@id``, ``@name`` and ``CLASS``
+
+        Returns:
+            Dimension
+        """
+        items = class_obj.get("CLASS", [])
+        # A single item is returned as an object rather than a list
+        if isinstance(items, dict):
+            items = [items]
+
+        return cls(
+            id=class_obj["@id"],
+            name=class_obj.get("@name", ""),
+            codes=pd.Index([str(item["@code"]) for item in items], dtype=object),
+            names=np.array([item.get("@name", "") for item in items], dtype=object),
+            levels=np.array([int(item.get("@level") or 0) for item in items], dtype=np.int16),
+            parents=np.array([item.get("@parentCode") for item in items], dtype=object),
+            units=np.array([item.get("@unit") for item in items], dtype=object),
+        )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def positions(self, codes: Any) -> np.ndarray:
+        """
+        Positions of codes in this dimension (-1 for unknown codes).
+
+        Args:
+            codes: Codes to look up
+
+        Returns:
+            int array aligned with ``codes``
+        """
+        return self.codes.get_indexer(pd.Index(codes).astype(str))
+
+    def label(self, values: Any, attribute: str = "names") -> pd.Categorical:
+        """
+        Map codes to names (or another attribute) as a categorical.
+
+        Distinct codes are resolved once; rows are expanded with a single
+        take() over the category codes. Unknown codes keep the code itself
+        as their label.
+
+        Args:
+            values: Codes (categorical, Series or array-like)
+            attribute: ``names``, ``levels``, ``parents`` or ``units``
+
+        Returns:
+            Categorical aligned with ``values`` (missing codes stay missing)
+        """
+        if isinstance(values, pd.Series):
+            values = values.array
+        categorical = values if isinstance(values, pd.Categorical) else pd.Categorical(values)
+
+        categories = categorical.categories.astype(str)
+        positions = self.positions(categories)
+        found = positions >= 0
+
+        lookup = getattr(self, attribute)
+        labels = np.where(found, lookup.take(np.where(found, positions, 0)), categories.to_numpy(dtype=object))
+
+        # Several codes can share a label; factorize so categories stay unique
+        label_codes, label_categories = pd.factorize(labels)
+        codes = categorical.codes
+        row_codes = np.where(codes >= 0, label_codes.take(codes), -1)
+
+        return pd.Categorical.from_codes(row_codes, categories=label_categories)
+
+    def children(self, code: str) -> List[str]:
+        """Codes whose parent is ``code``."""
+        return list(self.codes[self.parents == code])
+
+    def ancestors(self, code: str) -> List[str]:
+        """Parent chain of ``code`` from its parent up to the top level."""
+        chain = []
+        position = self.codes.get_indexer([code])[0]
+        while position >= 0 and self.parents[position] is not None:
+            code = self.parents[position]
+            chain.append(code)
+            position = self.codes.get_indexer([code])[0]
+        return chain
+
+    def frame(self) -> pd.DataFrame:
+        """Items as a DataFrame with code, name, level, parent_code and unit columns."""
+        return pd.DataFrame({
+            "code": self.codes.to_numpy(),
+            "name": self.names,
+            "level": self.levels,
+            "parent_code": self.parents,
+            "unit": self.units,
+        })
+
+
+class DimensionIndex:
+    """
+    All dimensions of a statistical table, keyed by dimension ID.
+
+    Attributes:
+        dimensions: Dimension ID (``cat01``, ``area``, ``time``, ...) to Dimension
+    """
+
+    def __init__(self, dimensions: Optional[Dict[str, Dimension]] = None):
+        self.dimensions: Dict[str, Dimension] = dimensions or {}
+
+    @classmethod
+    def from_class_inf(cls, class_inf: Optional[Dict[str, Any]]) -> "DimensionIndex":
+        """
+        Decode a CLASS_INF section.
+
+        Args:
+            class_inf: CLASS_INF from getStatsData or getMetaInfo
+
+        Returns:
+            DimensionIndex (empty if class_inf is missing)
+        """
+        class_objs = (class_inf or {}).get("CLASS_OBJ", [])
+        if isinstance(class_objs, dict):
+            class_objs = [class_objs]
+
+        dimensions = [Dimension.from_class_obj(class_obj) for class_obj in class_objs]
+        return cls({dimension.id: dimension for dimension in dimensions})
+
+    def __getitem__(self, dimension_id: str) -> Dimension:
+        return self.dimensions[dimension_id.lstrip("@")]
+
+    def __contains__(self, dimension_id: str) -> bool:
+        return dimension_id.lstrip("@") in self.dimensions
+
+    def __iter__(self) -> Iterator[Dimension]:
+        return iter(self.dimensions.values())
+
+    def label(
+        self,
+        df: pd.DataFrame,
+        columns: Optional[List[str]] = None,
+        suffix: str = "_name"
+    ) -> pd.DataFrame:
+        """
+        Add a name column next to each code column of a frame.
+
+        Args:
+            df: Frame with ``@<dimension id>`` code columns
+            columns: Code columns to label. Defaults to every ``@`` column
+                that has a dimension in this index.
+            suffix: Suffix of the added columns (``@cat01`` -> ``@cat01_name``)
+
+        Returns:
+            New DataFrame with categorical name columns
+        """
+        if columns is None:
+            columns = [col for col in df.columns if str(col).startswith("@") and col in self]
+
+        df = df.copy()
+        for col in columns:
+            labelled = self[col].label(df[col])
+            df.insert(df.columns.get_loc(col) + 1, f"{col}{suffix}", labelled)
+
+        return df
@@ -1,240 +1,279 @@
 """
 e-Statから過去の毎勤原表（実数データ）を一括ダウンロードして統合する。
 
-取得期間：2024年1月～2025年11月（23ヶ月分）
+取得期間：2024年1月～最新月
+（statInfIdはstat_inf_index.pyの索引から解決し、実行時にe-Statのデータカタログで差分更新する）
+
+デフォルトでは差分更新を行う。統合ファイルのマニフェストに記録された
+年月と比較し、未取得の月・statInfIdが変わった月だけを取得して統合する。
+全件を取得し直す場合は --full を指定する。
+
+--partitioned を指定すると、1つの統合ファイルの代わりに年月ごとの
+パーティション分割データセット（data/actual_wages_historical/year_month=2025-11/…）
+として保存する。
+
+英文字カラム名の整形済みデータ（data/cleaned/ 配下、同じレイアウト）も
+読み込んだDataFrameから同時に書き出す（統合ファイルを読み直さない）。
+派生指標（data/derived/）は、取得した月の影響を受ける年月だけを計算し直す。
+
+ダウンロードしたExcelファイルの読み込みはプロセスプールで並列に行う
+（--parse-workers で並列数を指定、0でこのプロセスのみ）。
 """
 
-import requests
-import pandas as pd
+import os
 from pathlib import Path
 from datetime import datetime
-import time
+from typing import List, Optional
 
+from cleaning import (
+    ACTUAL_WAGES_COLUMN_MAPPING,
+    clean_actual_wages,
+)
+from convert_to_english_columns import convert_actual_wages_columns, convert_actual_wages_partitioned
+from extraction import (
+    DatasetSpec,
+    ExtractionEngine,
+    process_actual_wages_excel,
+    write_metadata,
+)
+from consolidation import StreamingConsolidator, TableMerger
+from derived_metrics import refresh_derived
+from manifest import Manifest
+from stat_inf_index import StatInfIndex, load_index
+from storage import table_path, write_partitioned
 
-def download_estat_excel(stat_inf_id: str, year_month: str, output_dir: Path) -> Path:
-    """
-    e-Statから統計表Excelファイルをダウンロードする
 
-    Args:
-        stat_inf_id: 統計表ID
-        year_month: 年月（例: 2024-01）
-        output_dir: 保存先ディレクトリ
+# 同時ダウンロード数の上限
+MAX_WORKERS = 4
 
-    Returns:
-        ダウンロードしたファイルのパス
-    """
-    base_url = "https://www.e-stat.go.jp/stat-search/file-download"
+# e-Statへのリクエストレート上限（1秒あたり）
+REQUESTS_PER_SECOND = 2.0
 
-    params = {
-        "statInfId": stat_inf_id,
-        "fileKind": 4  # Excel形式
-    }
+# Excel読み込みの並列プロセス数（0ならダウンロードと同じプロセスで順に読み込む）
+PARSE_WORKERS = min(4, os.cpu_count() or 1)
+
+# 作業ディレクトリ（ダウンロードしたExcelファイルの保存先）
+TEMP_DIR = Path("data/temp_historical")
 
-    print(f"  ダウンロード中: {year_month}")
+# 統合ファイル名
+OUTPUT_FILENAME = 'actual_wages_historical.csv'
 
-    response = requests.get(base_url, params=params, timeout=60)
-    response.raise_for_status()
+# パーティション分割レイアウトのルートディレクトリ名
+PARTITIONED_DIRNAME = 'actual_wages_historical'
 
-    # ファイル保存
-    output_path = output_dir / f"{year_month}_{stat_inf_id}.xls"
-    with open(output_path, 'wb') as f:
-        f.write(response.content)
+# 取得期間の開始年月（終了はstatInfId索引に登録された最新月）
+START_MONTH = '2024-01'
 
-    print(f"  ✓ ダウンロード完了: {output_path.name} ({len(response.content):,} bytes)")
 
-    return output_path
+def _month(year_month: str, stat_inf_id: str, name: str) -> DatasetSpec:
+    """毎勤原表1ヶ月分のデータセット定義を作成する"""
+    return DatasetSpec(
+        stat_inf_id=stat_inf_id,
+        name=name,
+        parser=process_actual_wages_excel,
+        year_month=year_month
+    )
 
 
-def process_excel_to_dataframe(excel_path: Path, year_month: str) -> pd.DataFrame:
+def build_datasets(index: StatInfIndex) -> List[DatasetSpec]:
     """
-    ダウンロードした毎勤原表Excelファイルを読み込んでDataFrameに変換する
+    statInfId索引から取得対象（START_MONTH以降の全月）のデータセット定義を作成する
 
     Args:
-        excel_path: Excelファイルのパス
-        year_month: 年月（例: 2024-01）
+        index: 調査年月 → statInfId の索引
 
     Returns:
-        処理済みDataFrame
+        データセット定義のリスト（新しい月から順）
     """
-    try:
-        # Excelファイルを読み込み（xlrdエンジン使用 - 古い.xls形式に対応）
-        df = pd.read_excel(excel_path, sheet_name=0, engine='xlrd', header=None)
-
-        # 列名を設定（データ構造に基づく）
-        column_names = [
-            '産業コード',
-            '性別',
-            '就業形態',
-            '常用労働者数_前調査期間末',
-            '常用労働者数_本月増加',
-            '常用労働者数_本月減少',
-            '常用労働者数_本調査期間末',
-            'パートタイム労働者数',
-            '出勤日数',
-            '実労働時間_総数',
-            '実労働時間_所定内',
-            '実労働時間_所定外',
-            '現金給与_総額',
-            '現金給与_きまって支給',
-            '現金給与_所定内給与',
-            '現金給与_超過労働給与',
-            '現金給与_特別給与'
-        ]
-
-        # 最初の6行はヘッダー情報なのでスキップして、列名を設定
-        df_data = df.iloc[6:].copy()  # 7行目からデータ開始
-        df_data.columns = column_names
-
-        # インデックスをリセット
-        df_data = df_data.reset_index(drop=True)
-
-        # 1行目の単位行（「円」など）を削除
-        df_data = df_data.iloc[1:].copy()
-        df_data = df_data.reset_index(drop=True)
-
-        # 数値列を数値型に変換
-        numeric_columns = [
-            '常用労働者数_前調査期間末',
-            '常用労働者数_本月増加',
-            '常用労働者数_本月減少',
-            '常用労働者数_本調査期間末',
-            'パートタイム労働者数',
-            '出勤日数',
-            '実労働時間_総数',
-            '実労働時間_所定内',
-            '実労働時間_所定外',
-            '現金給与_総額',
-            '現金給与_きまって支給',
-            '現金給与_所定内給与',
-            '現金給与_超過労働給与',
-            '現金給与_特別給与'
-        ]
-
-        for col in numeric_columns:
-            # 数値に変換（エラーはNaNに）
-            df_data[col] = pd.to_numeric(df_data[col], errors='coerce')
-
-        # 全ての値がNaNの行を削除
-        df_data = df_data.dropna(how='all', subset=numeric_columns)
-
-        # 年月列を追加
-        df_data.insert(0, '年月', year_month)
-
-        return df_data
-
-    except Exception as e:
-        print(f"  ✗ エラー: {e}")
-        raise
+    return [
+        _month(year_month, entry['stat_inf_id'], entry['name'])
+        for year_month, entry in index.entries(start=START_MONTH)
+    ]
 
 
-def main():
+def main(
+    engine: Optional[ExtractionEngine] = None,
+    full: bool = False,
+    partitioned: bool = False,
+    parse_workers: int = PARSE_WORKERS,
+    refresh_index: bool = True
+):
+    """
+    Args:
+        engine: 共有する取得エンジン（省略時はこの実行専用に作成）
+        full: Trueの場合は差分更新せず全月を取得し直す
+        partitioned: Trueの場合は年月ごとのパーティション分割データセットとして保存する
+        parse_workers: Excel読み込みの並列プロセス数（engine省略時のみ使用）
+        refresh_index: Falseの場合はstatInfId索引を更新せず保存済みの索引を使う
+    """
     print("=" * 100)
     print("毎月勤労統計調査 - 過去実数データ（毎勤原表）の一括取得")
     print("=" * 100)
     print(f"実行日時: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print()
 
-    # 取得する統計表の定義（2024年1月～2025年11月）
-    datasets = [
-        {'year_month': '2025-11', 'stat_inf_id': '000040397563', 'name': '令和7年11月確報'},
-        {'year_month': '2025-10', 'stat_inf_id': '000040388924', 'name': '令和7年10月確報'},
-        {'year_month': '2025-09', 'stat_inf_id': '000040370407', 'name': '令和7年9月確報'},
-        {'year_month': '2025-08', 'stat_inf_id': '000040360166', 'name': '令和7年8月確報'},
-        {'year_month': '2025-07', 'stat_inf_id': '000040323699', 'name': '令和7年7月確報'},
-        {'year_month': '2025-06', 'stat_inf_id': '000040307886', 'name': '令和7年6月確報'},
-        {'year_month': '2025-05', 'stat_inf_id': '000040298090', 'name': '令和7年5月確報'},
-        {'year_month': '2025-04', 'stat_inf_id': '000040286506', 'name': '令和7年4月確報'},
-        {'year_month': '2025-03', 'stat_inf_id': '000040279686', 'name': '令和7年3月確報'},
-        {'year_month': '2025-02', 'stat_inf_id': '000040271186', 'name': '令和7年2月確報'},
-        {'year_month': '2025-01', 'stat_inf_id': '000040269547', 'name': '令和7年1月確報'},
-        {'year_month': '2024-12', 'stat_inf_id': '000040250081', 'name': '2024年12月確報'},
-        {'year_month': '2024-11', 'stat_inf_id': '000040241981', 'name': '2024年11月確報'},
-        {'year_month': '2024-10', 'stat_inf_id': '000040235081', 'name': '2024年10月確報'},
-        {'year_month': '2024-09', 'stat_inf_id': '000040225606', 'name': '2024年9月確報'},
-        {'year_month': '2024-08', 'stat_inf_id': '000040217309', 'name': '2024年8月確報'},
-        {'year_month': '2024-07', 'stat_inf_id': '000040211461', 'name': '2024年7月確報'},
-        {'year_month': '2024-06', 'stat_inf_id': '000040200080', 'name': '2024年6月確報'},
-        {'year_month': '2024-05', 'stat_inf_id': '000040193700', 'name': '2024年5月確報'},
-        {'year_month': '2024-04', 'stat_inf_id': '000040187736', 'name': '2024年4月確報'},
-        {'year_month': '2024-03', 'stat_inf_id': '000040182381', 'name': '2024年3月確報'},
-        {'year_month': '2024-02', 'stat_inf_id': '000040176301', 'name': '2024年2月確報'},
-        {'year_month': '2024-01', 'stat_inf_id': '000040173518', 'name': '2024年1月確報'},
-    ]
+    if engine is None:
+        with ExtractionEngine(
+            temp_dir=TEMP_DIR,
+            max_workers=MAX_WORKERS,
+            requests_per_second=REQUESTS_PER_SECOND,
+            parse_workers=parse_workers
+        ) as own_engine:
+            return main(own_engine, full, partitioned, refresh_index=refresh_index)
+
+    all_datasets = build_datasets(load_index(refresh=refresh_index))
+    if not all_datasets:
+        print("✗ statInfId索引に取得対象の月がありません")
+        return 1
 
-    print(f"取得期間: 2024年1月～2025年11月（{len(datasets)}ヶ月分）")
+    print()
+    print(f"取得期間: {all_datasets[-1].year_month} ～ {all_datasets[0].year_month}（{len(all_datasets)}ヶ月分）")
     print()
 
-    # 作業ディレクトリの作成
-    temp_dir = Path("data/temp_historical")
-    temp_dir.mkdir(parents=True, exist_ok=True)
+    output_dir = engine.output_dir
+    if partitioned:
+        output_path = output_dir / PARTITIONED_DIRNAME
+        cleaned_path = engine.cleaned_dir / PARTITIONED_DIRNAME
+    else:
+        output_path = table_path(output_dir / OUTPUT_FILENAME, engine.output_format)
+        cleaned_path = table_path(engine.cleaned_dir / OUTPUT_FILENAME, engine.output_format)
+
+    # 差分更新: 統合ファイルに無い月・改訂された月だけを取得
+    manifest = Manifest.load(output_path)
+    if full or not output_path.exists():
+        manifest.clear()
+        datasets = all_datasets
+        print("モード: 全件取得")
+    else:
+        datasets = manifest.pending(all_datasets)
+        print(f"モード: 差分更新（取得済み {len(manifest.months)}ヶ月、取得対象 {len(datasets)}ヶ月）")
+    print()
 
-    output_dir = Path("data")
-    output_dir.mkdir(exist_ok=True)
+    # 整形済みデータが無い場合は、差し込む前に既存の統合ファイルから一度だけ作成する
+    if not full and output_path.exists() and not cleaned_path.exists():
+        print("整形済みデータが無いため、既存の統合ファイルから作成します")
+        if partitioned:
+            convert_actual_wages_partitioned(output_path, cleaned_path, engine.output_format)
+        else:
+            convert_actual_wages_columns(output_path, cleaned_path, engine.output_format)
 
-    # 各データセットを処理
-    all_dataframes = []
+    # 全月を並列ダウンロード・読み込みし、読み込みが完了した月から年月順に書き出す
+    print(f"ダウンロード中...（同時実行数: {engine.max_workers}）")
     results = []
-
-    for i, dataset in enumerate(datasets, 1):
-        print(f"\n{i}/{len(datasets)}: {dataset['name']} ({dataset['year_month']})")
-        print("-" * 100)
-
-        try:
-            # ダウンロード
-            excel_path = download_estat_excel(
-                dataset['stat_inf_id'],
-                dataset['year_month'],
-                temp_dir
+    months = [dataset.year_month for dataset in datasets]
+
+    if partitioned:
+        # 取得した月のパーティションだけを置き換える（書き出し順は問わない）
+        mergers = []
+
+        def write_month(month, df):
+            write_partitioned(df, output_path, column='年月', fmt=engine.output_format)
+            write_partitioned(
+                clean_actual_wages(df),
+                cleaned_path,
+                column=ACTUAL_WAGES_COLUMN_MAPPING['年月'],
+                fmt=engine.output_format
             )
 
-            # 少し待機（サーバー負荷軽減）
-            time.sleep(0.5)
-
-            # Excel読み込み
-            df = process_excel_to_dataframe(excel_path, dataset['year_month'])
-            print(f"  ✓ データ整形完了: {len(df)}行")
-
-            all_dataframes.append(df)
+        consolidator = StreamingConsolidator(months, write_month)
+    else:
+        # 既存の統合ファイルを少しずつ読みながら、取得した月を差し込む（全件取得時は置き換え）
+        append_only = manifest.is_append_only(months)
+        merger = TableMerger(
+            output_path,
+            fmt=engine.output_format,
+            replace=full,
+            append_only=append_only
+        )
+        cleaned_merger = TableMerger(
+            cleaned_path,
+            fmt=engine.output_format,
+            column=ACTUAL_WAGES_COLUMN_MAPPING['年月'],
+            replace=full,
+            append_only=append_only
+        )
+        mergers = [merger, cleaned_merger]
+
+        def write_month(month, df):
+            merger.write(month, df)
+            cleaned_merger.write(month, clean_actual_wages(df))
+
+        def skip_month(month):
+            merger.skip(month)
+            cleaned_merger.skip(month)
+
+        consolidator = StreamingConsolidator(months, write_month, skip_month)
+
+    fetched_rows = 0
+    column_count = 0
 
-            results.append({
-                'year_month': dataset['year_month'],
-                'name': dataset['name'],
-                'status': 'success',
-                'rows': len(df)
-            })
+    try:
+        for dataset, df, error in engine.extract(datasets, ordered=False):
+            if error is None:
+                results.append({
+                    'year_month': dataset.year_month,
+                    'name': dataset.name,
+                    'status': 'success',
+                    'rows': len(df)
+                })
+                fetched_rows += len(df)
+                column_count = len(df.columns)
+                consolidator.add(dataset.year_month, df)
+            else:
+                results.append({
+                    'year_month': dataset.year_month,
+                    'name': dataset.name,
+                    'status': 'failed',
+                    'error': str(error)
+                })
+                consolidator.fail(dataset.year_month)
+
+        consolidator.close()
+        for table_merger in mergers:
+            table_merger.close()
+    except BaseException:
+        for table_merger in mergers:
+            table_merger.abort()
+        raise
 
-        except Exception as e:
-            print(f"  ✗ エラー: {e}")
-            results.append({
-                'year_month': dataset['year_month'],
-                'name': dataset['name'],
-                'status': 'failed',
-                'error': str(e)
-            })
+    # 結果は年月順で表示する
+    results.sort(key=lambda r: r['year_month'])
 
-    # 全データを統合
     print()
     print("=" * 100)
-    print("データ統合中...")
+    print("データ統合")
     print("=" * 100)
     print()
 
-    if all_dataframes:
-        # 全DataFrameを結合
-        combined_df = pd.concat(all_dataframes, ignore_index=True)
-
-        # 年月でソート（古い順）
-        combined_df = combined_df.sort_values('年月').reset_index(drop=True)
-
-        # CSV保存
-        output_path = output_dir / 'actual_wages_historical.csv'
-        combined_df.to_csv(output_path, index=False, encoding='utf-8-sig')
+    if fetched_rows:
+        for result in results:
+            if result['status'] == 'success':
+                stat_inf_id = next(d.stat_inf_id for d in datasets if d.year_month == result['year_month'])
+                manifest.record(result['year_month'], stat_inf_id, result['rows'])
+        manifest.save()
 
         print(f"✓ 統合データ保存完了: {output_path}")
-        print(f"  総行数: {len(combined_df):,}")
-        print(f"  総列数: {len(combined_df.columns)}")
-        print(f"  期間: {combined_df['年月'].min()} ～ {combined_df['年月'].max()}")
+        print(f"  整形済みデータ: {cleaned_path}")
+        print(f"  今回取得: {fetched_rows:,}行")
+        print(f"  総行数: {manifest.total_rows:,}")
+        print(f"  総列数: {column_count}")
+        print(f"  期間: {manifest.period.replace(' to ', ' ～ ')}")
+        print(f"  順序待ちバッファ: 最大{consolidator.max_buffered}ヶ月")
         print()
+    elif not datasets:
+        print("✓ 新しい月・改訂された月はありません（統合ファイルは最新です）")
+        print()
+
+    # 派生指標は取得した月（と前回計算し直せなかった月）の影響を受ける年月だけを計算し直す
+    # （全件取得時は全期間）。失敗しても取得結果・メタデータの保存は続ける
+    print("派生指標の更新:")
+    derived_ok = refresh_derived(
+        [r['year_month'] for r in results if r['status'] == 'success'],
+        output_dir,
+        engine.output_format,
+        full=full and fetched_rows > 0
+    )
+    print()
 
     # サマリー
     print("=" * 100)
@@ -264,23 +303,23 @@ def main():
     metadata = {
         'last_updated': datetime.now().isoformat(),
         'data_type': 'actual_amounts_historical',
-        'period': '2024-01 to 2025-11',
-        'total_months': len(datasets),
+        'period': manifest.period,
+        'total_months': len(manifest.months),
+        'fetched_months': len(datasets),
         'success_count': success_count,
         'failed_count': failed_count,
-        'total_rows': len(combined_df) if all_dataframes else 0,
-        'output_file': 'actual_wages_historical.csv'
+        'total_rows': manifest.total_rows,
+        'output_file': output_path.name
     }
 
-    import json
-    metadata_path = output_dir / 'metadata_actual_historical.json'
-    with open(metadata_path, 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, indent=2, ensure_ascii=False)
-
     print()
-    print(f"メタデータ保存: {metadata_path}")
+    write_metadata(metadata, output_dir / 'metadata_actual_historical.json')
     print()
 
+    if not derived_ok:
+        print("⚠ 派生指標の更新に失敗しました（対象の年月を記録し、次回の実行で計算し直します）")
+        return 1
+
     if success_count == len(results):
         print("✓ 全データの取得に成功しました")
         return 0
@@ -293,5 +332,22 @@ def main():
 
 
 if __name__ == "__main__":
+    import argparse
     import sys
-    sys.exit(main())
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--full', action='store_true', help='差分更新せず全月を取得し直す')
+    parser.add_argument('--partitioned', action='store_true',
+                        help='年月ごとのパーティション分割データセットとして保存する')
+    parser.add_argument('--no-refresh', action='store_true',
+                        help='statInfId索引を更新せず保存済みの索引を使う')
+    parser.add_argument('--parse-workers', type=int, default=PARSE_WORKERS,
+                        help=f'Excel読み込みの並列プロセス数（0で並列化しない、デフォルト: {PARSE_WORKERS}）')
+    args = parser.parse_args()
+
+    sys.exit(main(
+        full=args.full,
+        partitioned=args.partitioned,
+        parse_workers=args.parse_workers,
+        refresh_index=not args.no_refresh
+    ))
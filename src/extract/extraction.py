@@ -0,0 +1,574 @@
+"""
+e-Statの統計表Excelファイルを取得・整形・保存する共通エンジン。
+
+取得対象はDatasetSpec（statInfId・パーサー・出力ファイル名）で宣言的に定義し、
+ExtractionEngineが1つのHTTPセッション（keep-alive・コネクションプール）を
+共有してダウンロード・読み込み・保存を行う。
+
+各ダウンロードスクリプト（download_latest_indices.py 等）はこのモジュールの
+データセット定義とエンジンを使う薄いエントリポイントになっている。
+"""
+
+import json
+import multiprocessing
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from concurrent_download import (
+    DEFAULT_MAX_WORKERS,
+    DEFAULT_REQUESTS_PER_SECOND,
+    RateLimiter,
+)
+from cleaning import CLEANED_DIRNAME
+from http_cache import HTTPCache, estat_file_key
+from resumable_download import (
+    RESUMABLE_ERRORS,
+    read_sidecar,
+    stream_to_file,
+    verify_checksum,
+    write_sidecar,
+)
+from schema import apply_schema, table_dtypes
+from storage import get_output_format, write_table
+from transport import Transport
+from xls_parser import read_actual_wages_sheet
+
+
+# e-Statの直接ダウンロードURL
+ESTAT_FILE_DOWNLOAD_URL = "https://www.e-stat.go.jp/stat-search/file-download"
+
+# 毎勤原表の列名（データ構造に基づく）
+ACTUAL_WAGES_COLUMNS = [
+    '産業コード',
+    '性別',
+    '就業形態',
+    '常用労働者数_前調査期間末',
+    '常用労働者数_本月増加',
+    '常用労働者数_本月減少',
+    '常用労働者数_本調査期間末',
+    'パートタイム労働者数',
+    '出勤日数',
+    '実労働時間_総数',
+    '実労働時間_所定内',
+    '実労働時間_所定外',
+    '現金給与_総額',
+    '現金給与_きまって支給',
+    '現金給与_所定内給与',
+    '現金給与_超過労働給与',
+    '現金給与_特別給与'
+]
+
+# 毎勤原表の数値列
+ACTUAL_WAGES_NUMERIC_COLUMNS = ACTUAL_WAGES_COLUMNS[3:]
+
+# 読み込みプロセスの起動方式（ダウンロードスレッドが動いているプロセスをforkすると、
+# 他スレッドが保持していたロックがコピーされてデッドロックし得るため、forkは使わない）
+PARSE_START_METHODS = ('forkserver', 'spawn')
+
+
+@dataclass
+class DatasetSpec:
+    """
+    取得する統計表の定義
+
+    Attributes:
+        stat_inf_id: 統計表ID
+        name: データセット名（ログ・メタデータ用）
+        parser: ダウンロードしたExcelファイルをDataFrameに変換する関数
+        output_filename: 出力ファイル名（統合する場合はNone）
+        year_month: 調査年月（例: 2024-01）。指定すると先頭に「年月」列を追加する
+        file_kind: ファイル種別（4=Excel）
+        output_format: 出力形式（省略時はエンジンの設定に従う）
+        cleaner: 読み込んだDataFrameを英文字カラム名・型に整形する関数（cleaning.py）
+        cleaned_filename: 整形済みデータの出力ファイル名（data/cleaned/ 配下）
+    """
+    stat_inf_id: str
+    name: str
+    parser: Callable[[Path], pd.DataFrame]
+    output_filename: Optional[str] = None
+    year_month: Optional[str] = None
+    file_kind: int = 4
+    output_format: Optional[str] = None
+    cleaner: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None
+    cleaned_filename: Optional[str] = None
+
+
+def process_index_excel(excel_path: Path) -> pd.DataFrame:
+    """
+    指数データのExcelファイルを読み込んでDataFrameに変換する
+
+    指数データはヘッダー構造が特殊なため、シートをそのまま読み込み、
+    整形はcleaning.clean_index_sheet()で行う。
+
+    Args:
+        excel_path: Excelファイルのパス
+
+    Returns:
+        読み込んだDataFrame
+    """
+    # Excelファイルを読み込み（xlrdエンジン使用 - 古い.xls形式に対応）
+    df = pd.read_excel(excel_path, sheet_name=0, engine='xlrd')
+
+    print(f"  ✓ 読み込み完了: {len(df)}行 x {len(df.columns)}列")
+
+    return df
+
+
+def process_actual_wages_excel(excel_path: Path) -> pd.DataFrame:
+    """
+    毎勤原表Excelファイルを読み込んでDataFrameに変換する
+
+    xls_parser.read_actual_wages_sheet()でxlrdのセル配列から
+    型付きの列を直接作成し（中間のオブジェクト型DataFrameを作らない）、
+    スキーマ（schema.py）の型にそろえる。
+
+    Args:
+        excel_path: Excelファイルのパス
+
+    Returns:
+        処理済みDataFrame
+    """
+    return apply_schema(read_actual_wages_sheet(excel_path, ACTUAL_WAGES_COLUMNS), table_dtypes('actual_wages'))
+
+
+def parse_dataset(spec: DatasetSpec, excel_path: Path) -> pd.DataFrame:
+    """
+    ダウンロードしたファイルをspec.parserでDataFrameに変換する
+
+    プロセスプールのワーカーからも呼ばれるため、モジュールの関数として定義している
+    （ワーカーはforkserver / spawnで起動するため、specのparserもpickle可能なモジュールの関数にする）。
+
+    Args:
+        spec: データセット定義
+        excel_path: Excelファイルのパス
+
+    Returns:
+        処理済みDataFrame（year_month指定時は先頭に「年月」列を追加）
+    """
+    print(f"  Excelファイルを読み込み中: {excel_path.name}")
+
+    df = spec.parser(excel_path)
+
+    if spec.year_month:
+        df.insert(0, '年月', pd.Series(spec.year_month, index=df.index, dtype='category'))
+
+    return df
+
+
+def parse_pool_context() -> multiprocessing.context.BaseContext:
+    """
+    読み込み用プロセスプールのmultiprocessingコンテキストを返す
+
+    forkserverが使える環境（Linux・macOS）ではforkserver、それ以外（Windows）ではspawnを使う。
+    どちらもワーカーは親プロセスのスレッドを引き継がないため、
+    ダウンロードスレッドの起動後にプールを作っても安全。
+
+    Returns:
+        multiprocessingのコンテキスト
+    """
+    available = multiprocessing.get_all_start_methods()
+    method = next(m for m in PARSE_START_METHODS if m in available)
+    return multiprocessing.get_context(method)
+
+
+def _submit_parse(parse_pool: ProcessPoolExecutor, spec: DatasetSpec, outcome: Future, download: Future):
+    """ダウンロード完了時に読み込みをプロセスプールへ投入し、結果をoutcomeに渡す"""
+    try:
+        parse_future = parse_pool.submit(parse_dataset, spec, download.result())
+    except Exception as e:
+        outcome.set_exception(e)
+        return
+
+    def on_parsed(future: Future):
+        try:
+            outcome.set_result(future.result())
+        except Exception as e:
+            outcome.set_exception(e)
+
+    parse_future.add_done_callback(on_parsed)
+
+
+def save_processed_data(df: pd.DataFrame, output_path: Path, fmt: Optional[str] = None) -> Path:
+    """
+    処理済みデータを保存する
+
+    Args:
+        df: DataFrame
+        output_path: 出力ファイルパス（拡張子は出力形式に合わせて置き換えられる）
+        fmt: 出力形式（csv / parquet、省略時は環境変数 JMACRO_OUTPUT_FORMAT に従う）
+
+    Returns:
+        保存したファイルのパス
+    """
+    output_path = write_table(df, output_path, fmt)
+    print(f"  ✓ 保存完了: {output_path}")
+    print(f"    行数: {len(df):,}, 列数: {len(df.columns)}")
+
+    return output_path
+
+
+def write_metadata(metadata: Dict[str, Any], metadata_path: Path):
+    """
+    メタデータをJSONファイルに保存する
+
+    Args:
+        metadata: メタデータ
+        metadata_path: 保存先パス
+    """
+    with open(metadata_path, 'w', encoding='utf-8') as f:
+        json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    print(f"メタデータ保存: {metadata_path}")
+
+
+def create_session(pool_size: int = DEFAULT_MAX_WORKERS) -> requests.Session:
+    """
+    コネクションプール付きのHTTPセッションを作成する
+
+    同一ホストへの接続をkeep-aliveで使い回すため、
+    TLSハンドシェイクは最初の接続（並列数分）だけで済む。
+
+    Args:
+        pool_size: ホストあたりの最大接続数
+
+    Returns:
+        HTTPセッション
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class ExtractionEngine:
+    """
+    DatasetSpecに従ってe-Statのファイルを取得・整形・保存するエンジン
+
+    1つのHTTPセッション・ダウンロードキャッシュ・レート制限を
+    全データセットで共有する。
+
+    Attributes:
+        temp_dir: ダウンロードしたExcelファイルの保存先
+        output_dir: 整形済みデータの保存先
+        session: 共有HTTPセッション
+        cache: ダウンロードキャッシュ（Noneなら毎回ダウンロード）
+        rate_limiter: ホスト単位のレート制限
+        transport: 再試行・サーキットブレーカー付きの通信層（session・rate_limiterを使用）
+        max_workers: 同時ダウンロード数の上限
+        parse_workers: Excel読み込みに使うプロセス数（0なら読み込みはこのプロセスで行う）
+        output_format: 整形済みデータの出力形式（csv / parquet）
+        cleaned_dir: 英文字カラム名のデータの保存先（output_dir/cleaned）
+    """
+
+    def __init__(
+        self,
+        temp_dir: Path = Path("data/temp"),
+        output_dir: Path = Path("data"),
+        cache: Optional[HTTPCache] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        use_cache: bool = True,
+        output_format: Optional[str] = None,
+        parse_workers: int = 0
+    ):
+        """
+        Args:
+            temp_dir: ダウンロードしたExcelファイルの保存先
+            output_dir: 整形済みデータの保存先
+            cache: ダウンロードキャッシュ（省略時はデフォルト設定で作成）
+            max_workers: 同時ダウンロード数の上限
+            requests_per_second: e-Statへのリクエストレート上限（1秒あたり）
+            use_cache: Falseの場合はキャッシュを使わず毎回ダウンロードする
+            output_format: 出力形式（省略時は環境変数 JMACRO_OUTPUT_FORMAT、未設定ならcsv）
+            parse_workers: Excel読み込みに使うプロセス数（0なら読み込みはこのプロセスで行う）
+        """
+        self.temp_dir = Path(temp_dir)
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.cleaned_dir = self.output_dir / CLEANED_DIRNAME
+        self.cleaned_dir.mkdir(parents=True, exist_ok=True)
+
+        self.session = create_session(max_workers)
+        self.cache = (cache or HTTPCache()) if use_cache else None
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.transport = Transport(
+            self.session,
+            rate_limiter=self.rate_limiter,
+            max_connections_per_host=max(1, max_workers)
+        )
+        self.max_workers = max_workers
+        self.output_format = get_output_format(output_format)
+        self.parse_workers = parse_workers
+
+    def download(self, spec: DatasetSpec) -> Path:
+        """
+        統計表Excelファイルをダウンロードする
+
+        Args:
+            spec: データセット定義
+
+        Returns:
+            ダウンロードしたファイルのパス
+        """
+        params = {
+            "statInfId": spec.stat_inf_id,
+            "fileKind": spec.file_kind
+        }
+
+        prefix = f"{spec.year_month}_" if spec.year_month else ""
+        output_path = self.temp_dir / f"{prefix}{spec.stat_inf_id}.xls"
+
+        print(f"  ダウンロード中: {spec.name} (statInfId={spec.stat_inf_id})")
+
+        # キャッシュがあれば条件付きリクエストで再検証（未更新なら304のみ）
+        if self.cache is not None:
+            cached_path, not_modified = self.transport.call(
+                self.cache.fetch,
+                ESTAT_FILE_DOWNLOAD_URL,
+                params,
+                estat_file_key(spec.stat_inf_id, spec.file_kind),
+                session=self.transport,
+                retry_on=RESUMABLE_ERRORS
+            )
+
+            # キャッシュのファイル名は内容のSHA-256なので、作業ファイルがそれと一致すればコピーしない
+            sha256 = cached_path.name
+            if read_sidecar(output_path) != sha256 or not verify_checksum(output_path, sha256):
+                shutil.copyfile(cached_path, output_path)
+                write_sidecar(output_path, sha256)
+
+            if not_modified:
+                print(f"  ✓ 更新なし（キャッシュを使用）: {output_path.name}")
+            else:
+                print(f"  ✓ ダウンロード完了: {output_path.name} ({output_path.stat().st_size:,} bytes)")
+
+            return output_path
+
+        # チャンクごとに保存（中断した場合は次回続きから取得）し、チェックサムを記録
+        result = self.transport.call(
+            stream_to_file,
+            self.transport,
+            ESTAT_FILE_DOWNLOAD_URL,
+            output_path,
+            params=params,
+            retry_on=RESUMABLE_ERRORS
+        )
+
+        resumed = "（中断したダウンロードを再開）" if result.resumed else ""
+        print(f"  ✓ ダウンロード完了{resumed}: {output_path.name} ({result.size:,} bytes)")
+
+        return output_path
+
+    def parse(self, spec: DatasetSpec, excel_path: Path) -> pd.DataFrame:
+        """
+        ダウンロードしたファイルをspec.parserでDataFrameに変換する
+
+        Args:
+            spec: データセット定義
+            excel_path: Excelファイルのパス
+
+        Returns:
+            処理済みDataFrame（year_month指定時は先頭に「年月」列を追加）
+        """
+        df = parse_dataset(spec, excel_path)
+
+        print(f"  ✓ データ整形完了: {len(df)}行")
+
+        return df
+
+    def extract(
+        self,
+        specs: List[DatasetSpec],
+        ordered: bool = True
+    ) -> Iterator[Tuple[DatasetSpec, Optional[pd.DataFrame], Optional[Exception]]]:
+        """
+        全データセットを並列ダウンロード・読み込みして返す
+
+        ダウンロードはスレッドプールで行い、完了したファイルから順に読み込む。
+        parse_workers > 0 の場合、読み込みはプロセスプールで並列に行い
+        （ダウンロードと読み込みがパイプライン化される）、
+        親プロセスには整形済みのDataFrame（数値列はNumPy配列のまま転送される）だけが返る。
+
+        Args:
+            specs: データセット定義のリスト
+            ordered: Trueなら定義順、Falseなら処理が完了した順に返す
+
+        Yields:
+            (データセット定義, DataFrame, エラー) のタプル
+            （成功時はエラーがNone、失敗時はDataFrameがNone）
+        """
+        parse_pool = (
+            ProcessPoolExecutor(self.parse_workers, mp_context=parse_pool_context())
+            if self.parse_workers > 0 else None
+        )
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, self.max_workers)) as download_pool:
+                downloads = [download_pool.submit(self.download, spec) for spec in specs]
+
+                if parse_pool is None:
+                    # ダウンロード結果（ファイルパス）を受け取り、このプロセスで読み込む
+                    outcomes = downloads
+                else:
+                    # ダウンロードが完了したものから順にプロセスプールへ読み込みを投入
+                    outcomes = [Future() for _ in specs]
+                    for spec, download, outcome in zip(specs, downloads, outcomes):
+                        download.add_done_callback(
+                            partial(_submit_parse, parse_pool, spec, outcome)
+                        )
+
+                positions = {id(outcome): i for i, outcome in enumerate(outcomes)}
+                pending = outcomes if ordered else as_completed(outcomes)
+
+                for count, outcome in enumerate(pending, 1):
+                    spec = specs[positions[id(outcome)]]
+                    label = f"{spec.name} ({spec.year_month})" if spec.year_month else spec.name
+                    print(f"\n{count}/{len(specs)}: {label}")
+                    print("-" * 100)
+
+                    try:
+                        # ダウンロード・読み込みの失敗はここで再送出してデータセット単位の失敗として記録
+                        result = outcome.result()
+
+                        if parse_pool is None:
+                            df = self.parse(spec, result)
+                        else:
+                            df = result
+                            print(f"  ✓ データ整形完了: {len(df)}行")
+
+                        yield spec, df, None
+
+                    except Exception as e:
+                        print(f"  ✗ エラー: {e}")
+                        yield spec, None, e
+        finally:
+            if parse_pool is not None:
+                parse_pool.shutdown(wait=True)
+
+    def run(self, specs: List[DatasetSpec]) -> List[Dict[str, Any]]:
+        """
+        全データセットを取得し、それぞれspec.output_filenameに保存する
+
+        spec.cleanerが指定されている場合は、読み込んだDataFrameをそのまま整形して
+        data/cleaned/ にも保存する（保存したファイルを読み直さない）。
+
+        Args:
+            specs: データセット定義のリスト
+
+        Returns:
+            データセットごとの結果（name, status, output, cleaned_output または error）
+        """
+        results = []
+
+        for spec, df, error in self.extract(specs):
+            cleaned_path = None
+            if error is None:
+                try:
+                    output_path = save_processed_data(
+                        df,
+                        self.output_dir / spec.output_filename,
+                        spec.output_format or self.output_format
+                    )
+                    if spec.cleaner is not None:
+                        cleaned_path = save_processed_data(
+                            spec.cleaner(df),
+                            self.cleaned_dir / spec.cleaned_filename,
+                            self.output_format
+                        )
+                except Exception as e:
+                    print(f"  ✗ エラー: {e}")
+                    error = e
+
+            if error is None:
+                results.append({
+                    'name': spec.name,
+                    'status': 'success',
+                    'output': output_path,
+                    'cleaned_output': cleaned_path,
+                    'rows': len(df)
+                })
+            else:
+                results.append({
+                    'name': spec.name,
+                    'status': 'failed',
+                    'error': str(error)
+                })
+
+        return results
+
+    def close(self):
+        """HTTPセッションを閉じる"""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def print_summary(results: List[Dict[str, Any]]) -> int:
+    """
+    取得結果のサマリーを表示する
+
+    Args:
+        results: ExtractionEngine.run()の結果
+
+    Returns:
+        成功件数
+    """
+    print("=" * 100)
+    print("完了サマリー")
+    print("=" * 100)
+    print()
+
+    success_count = sum(1 for r in results if r['status'] == 'success')
+    print(f"取得成功: {success_count}/{len(results)}件")
+    print()
+
+    for result in results:
+        status_icon = "✓" if result['status'] == 'success' else "✗"
+        print(f"{status_icon} {result['name']}")
+
+        if result['status'] == 'success':
+            print(f"   保存先: {result['output']}")
+            if result.get('cleaned_output'):
+                print(f"   整形済み: {result['cleaned_output']}")
+        else:
+            print(f"   エラー: {result['error']}")
+
+    print()
+
+    return success_count
+
+
+def results_to_metadata(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    取得結果をメタデータ用の形式に変換する（Pathオブジェクトを文字列に変換）
+
+    Args:
+        results: ExtractionEngine.run()の結果
+
+    Returns:
+        メタデータの datasets 項目
+    """
+    return [
+        {
+            'name': r['name'],
+            'status': r['status'],
+            'output': str(r.get('output', '')),
+            'cleaned_output': str(r.get('cleaned_output') or ''),
+            'error': r.get('error', '')
+        }
+        for r in results
+    ]
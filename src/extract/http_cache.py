@@ -0,0 +1,230 @@
+"""
+e-Statからダウンロードしたファイルのディスクキャッシュ。
+
+ファイル本体はSHA-256をキーにした内容アドレス方式で保存し、
+statInfId + fileKind ごとにETag / Last-Modifiedを記録する。
+次回以降はIf-None-Match / If-Modified-Sinceを付けて再検証するため、
+e-Stat側で更新されていないファイルは304応答1回で済む。
+
+ファイルはチャンクごとにストリーミングで保存し（転送が中断した場合は次回
+HTTP Rangeで続きから取得する）、304応答で保存済みのファイルを使う際は
+SHA-256で内容を検証する。
+
+キャッシュはサイズ上限と最終利用からの経過日数で削除（eviction）する。
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+from resumable_download import stream_to_file, verify_checksum
+
+
+# デフォルトのキャッシュディレクトリ
+DEFAULT_CACHE_DIR = Path("data/temp/http_cache")
+
+# キャッシュ全体のサイズ上限（バイト）
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+# 最終利用からこの日数を過ぎたエントリは削除する
+DEFAULT_MAX_AGE_DAYS = 90
+
+
+def estat_file_key(stat_inf_id: str, file_kind: int) -> str:
+    """
+    e-Statファイルのキャッシュキーを作成する
+
+    Args:
+        stat_inf_id: 統計表ID
+        file_kind: ファイル種別（4=Excel）
+
+    Returns:
+        キャッシュキー
+    """
+    return f"{stat_inf_id}_{file_kind}"
+
+
+class HTTPCache:
+    """
+    条件付きリクエストで再検証するHTTPレスポンスのディスクキャッシュ
+
+    複数スレッドから同時に利用できる（インデックスの更新はロックで保護）。
+
+    Attributes:
+        cache_dir: キャッシュディレクトリ
+        max_bytes: キャッシュ全体のサイズ上限（バイト）
+        max_age: 最終利用からの保持期間
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_days: int = DEFAULT_MAX_AGE_DAYS
+    ):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリ
+            max_bytes: キャッシュ全体のサイズ上限（バイト）
+            max_age_days: 最終利用からの保持日数
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_age = timedelta(days=max_age_days)
+
+        self.objects_dir = self.cache_dir / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.cache_dir / "index.json"
+
+        self._lock = threading.Lock()
+        self._index: Dict[str, Dict[str, Any]] = self._load_index()
+
+    def fetch(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        key: str,
+        session: Optional[requests.Session] = None,
+        timeout: int = 60
+    ) -> Tuple[Path, bool]:
+        """
+        URLの内容を取得する（キャッシュがあれば条件付きリクエストで再検証）
+
+        Args:
+            url: リクエストURL
+            params: クエリパラメータ
+            key: キャッシュキー（estat_file_key()で作成）
+            session: 使用するHTTPセッション（省略時はrequests.get）
+            timeout: タイムアウト（秒）
+
+        Returns:
+            (キャッシュ内のファイルパス, キャッシュをそのまま使ったかどうか)
+
+        Raises:
+            requests.exceptions.RequestException: リクエストが失敗した場合
+            requests.exceptions.HTTPError: 条件を付けていないリクエストに304が返された場合
+        """
+        with self._lock:
+            entry = self._index.get(key)
+
+        headers = {}
+        if entry and self._object_path(entry["sha256"]).exists():
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        # 内容ハッシュが決まるまではキー単位の一時ファイルに保存する（中断時は次回続きから取得）
+        download_path = self.objects_dir / f"{key}.download"
+        result = stream_to_file(
+            session or requests,
+            url,
+            download_path,
+            params=params,
+            headers=headers,
+            timeout=timeout,
+            sidecar=False
+        )
+
+        if result.status_code == 304:
+            # 条件を付けていない（保存済みのファイルが無い）のに304が返った場合は、使える内容が無い
+            if not headers:
+                raise requests.exceptions.HTTPError(
+                    f"条件付きでないリクエストに304応答が返されました: {url}（キー: {key}）"
+                )
+
+            object_path = self._object_path(entry["sha256"])
+
+            # 保存済みのファイルが壊れていれば、条件を付けずに取得し直す
+            if not verify_checksum(object_path, entry["sha256"]):
+                with self._lock:
+                    self._index.pop(key, None)
+                    object_path.unlink(missing_ok=True)
+                    self._save_index()
+                return self.fetch(url, params, key, session, timeout)
+
+            with self._lock:
+                entry["last_used"] = datetime.now().isoformat()
+                self._save_index()
+            return object_path, True
+
+        object_path = self._object_path(result.sha256)
+
+        now = datetime.now().isoformat()
+        with self._lock:
+            # 同じ内容のファイルは1つだけ保存する
+            # （登録前に他スレッドの削除処理で消されないようロック内で移動する）
+            if object_path.exists():
+                download_path.unlink(missing_ok=True)
+            else:
+                os.replace(download_path, object_path)
+
+            self._index[key] = {
+                "sha256": result.sha256,
+                "size": result.size,
+                "etag": result.headers.get("ETag"),
+                "last_modified": result.headers.get("Last-Modified"),
+                "fetched_at": now,
+                "last_used": now,
+            }
+            self._evict(keep=key)
+            self._save_index()
+
+        return object_path, False
+
+    def _object_path(self, sha256: str) -> Path:
+        """内容ハッシュに対応するファイルパスを返す"""
+        return self.objects_dir / sha256
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        """インデックスファイルを読み込む（壊れている場合は空にする）"""
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_index(self):
+        """インデックスファイルを書き出す（呼び出し元でロック取得済みであること）"""
+        tmp_path = self.index_path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+
+    def _evict(self, keep: Optional[str] = None):
+        """
+        保持期間切れ・サイズ超過のエントリを削除する（呼び出し元でロック取得済みであること）
+
+        期限切れのエントリを削除した後、サイズ上限を超えていれば
+        最終利用が古い順に削除し、参照されなくなったファイルを消す。
+
+        Args:
+            keep: 削除対象から除外するキー（取得直後のエントリ）
+        """
+        cutoff = (datetime.now() - self.max_age).isoformat()
+        for key in [k for k, e in self._index.items() if e["last_used"] < cutoff]:
+            del self._index[key]
+
+        # 同じ内容を複数キーが共有している場合はサイズを1回だけ数える
+        def total_size():
+            return sum({e["sha256"]: e["size"] for e in self._index.values()}.values())
+
+        for key in sorted(self._index, key=lambda k: self._index[k]["last_used"]):
+            if key == keep:
+                continue
+            if total_size() <= self.max_bytes:
+                break
+            del self._index[key]
+
+        # 拡張子のあるファイル（取得途中の一時ファイル）は削除しない
+        referenced = {e["sha256"] for e in self._index.values()}
+        for path in self.objects_dir.iterdir():
+            if path.name not in referenced and "." not in path.name:
+                path.unlink(missing_ok=True)
@@ -0,0 +1,232 @@
+"""
+指数データ（現金給与総額・常用雇用・総実労働時間）の月次ストア。
+
+整形済みの指数データは年 × 12ヶ月の横長の表（year, jan～dec）なので、
+時系列として使うたびに縦長への変換が必要になる。IndexStoreは3系列を
+1つの月次PeriodIndexにそろえた表（列 = 系列）として保持し、
+前年同月比・移動平均・基準年の変更を配列全体への1回の演算で求める。
+
+横長の表から月次への変換は、表全体の値を1つの配列として並べ替えるだけで
+行い（列ごと・行ごとの処理をしない）、年月は年と月の配列から一括で作成する。
+
+指数のシートには、年が先頭に戻る位置で別の表（前年比等）が続く場合がある。
+その場合は最初の表（指数）のみを使う。
+"""
+
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from cleaning import CLEANED_DIRNAME, INDEX_COLUMNS
+from storage import read_table, resolve_table, write_table
+
+
+# 系列名 → 整形済みデータのファイル名
+INDEX_SERIES = {
+    'wage': 'wage_index.csv',
+    'employment': 'employment_index.csv',
+    'hours': 'hours_index.csv',
+}
+
+# 月次ストアの出力ファイル名（縦長形式: year_month, series, value）
+OUTPUT_FILENAME = 'index_monthly.csv'
+
+# 整形済みデータのディレクトリ
+DEFAULT_DIR = Path("data") / CLEANED_DIRNAME
+
+
+def first_block(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    指数の表の最初のブロック（年が昇順に続く部分）だけを返す
+
+    Args:
+        df: year, jan～dec 列の整形済み指数データ
+
+    Returns:
+        年が先頭に戻る手前までの行
+    """
+    years = df['year'].to_numpy(dtype=np.float64)
+    restarts = np.flatnonzero(np.diff(years) <= 0)
+    if len(restarts):
+        return df.iloc[:restarts[0] + 1]
+    return df
+
+
+def to_monthly(df: pd.DataFrame) -> pd.Series:
+    """
+    横長の指数データ（year, jan～dec）を月次の系列に変換する
+
+    Args:
+        df: 整形済み指数データ
+
+    Returns:
+        月次PeriodIndexのSeries（float32、値の無い月は除く）
+    """
+    df = first_block(df)
+    months = INDEX_COLUMNS[1:]
+
+    # 年 × 月の値を行優先で並べると、そのまま年月順の系列になる
+    values = df[months].to_numpy(dtype=np.float32, na_value=np.nan).ravel()
+    years = np.repeat(df['year'].to_numpy(dtype=np.int64), len(months))
+    month_numbers = np.tile(np.arange(1, len(months) + 1), len(df))
+
+    periods = pd.PeriodIndex(
+        pd.to_datetime(pd.DataFrame({'year': years, 'month': month_numbers, 'day': 1})).dt.to_period('M'),
+        name='year_month'
+    )
+
+    series = pd.Series(values, index=periods)
+    return series[~np.isnan(values)]
+
+
+class IndexStore:
+    """
+    指数データ3系列の月次ストア
+
+    Attributes:
+        frame: 月次PeriodIndex × 系列（wage / employment / hours）のDataFrame（float32）
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+
+    @classmethod
+    def from_tables(cls, tables: Dict[str, pd.DataFrame]) -> "IndexStore":
+        """
+        系列ごとの横長の指数データから作成する
+
+        Args:
+            tables: 系列名 → 整形済み指数データ（year, jan～dec）
+
+        Returns:
+            IndexStore（全系列の年月の和集合を昇順のPeriodIndexとして持つ）
+        """
+        if not tables:
+            return cls(pd.DataFrame(index=pd.PeriodIndex([], freq='M', name='year_month'), dtype=np.float32))
+
+        frame = pd.concat(
+            {name: to_monthly(df) for name, df in tables.items()},
+            axis=1
+        ).sort_index()
+        frame.index.name = 'year_month'
+        return cls(frame.astype(np.float32))
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame) -> "IndexStore":
+        """
+        縦長形式（year_month, series, value）から作成する
+
+        Args:
+            df: to_long()の結果、または保存した月次ストア
+
+        Returns:
+            IndexStore
+        """
+        frame = df.pivot(index='year_month', columns='series', values='value')
+        frame.index = pd.PeriodIndex(frame.index.astype(str), freq='M', name='year_month')
+        frame.columns = frame.columns.astype(str)
+        frame.columns.name = None
+        return cls(frame.sort_index().astype(np.float32))
+
+    def to_long(self) -> pd.DataFrame:
+        """
+        縦長形式（year_month, series, value）に変換する（値の無い月は除く）
+
+        Returns:
+            DataFrame（year_month はYYYY-MM形式の文字列）
+        """
+        long = self.frame.reset_index().melt(id_vars='year_month', var_name='series', value_name='value')
+        long = long.dropna(subset=['value']).reset_index(drop=True)
+        long['year_month'] = long['year_month'].astype(str)
+        return long
+
+    def monthly(self) -> pd.DataFrame:
+        """
+        欠けた年月をNaNで埋め、月が連続する表を返す（月数でずらす計算用）
+
+        Returns:
+            最初の月から最後の月まで連続した月次PeriodIndexのDataFrame
+        """
+        if self.frame.empty:
+            return self.frame
+        months = pd.period_range(self.frame.index.min(), self.frame.index.max(), freq='M', name='year_month')
+        return self.frame.reindex(months)
+
+    def yoy(self, periods: int = 12) -> pd.DataFrame:
+        """
+        前年同月比（%）
+
+        Args:
+            periods: 比較する月数（12で前年同月）
+
+        Returns:
+            月次PeriodIndex × 系列のDataFrame
+        """
+        # 年月が欠けていても正しい月と比較するよう、連続した月次の索引上でずらす
+        frame = self.monthly()
+        return (frame / frame.shift(periods) - 1) * 100
+
+    def moving_average(self, window: int) -> pd.DataFrame:
+        """
+        後方移動平均（window ヶ月分の値がそろう月のみ）
+
+        Args:
+            window: 平均する月数（例: 3、12）
+
+        Returns:
+            月次PeriodIndex × 系列のDataFrame
+        """
+        return self.monthly().rolling(window, min_periods=window).mean()
+
+    def rebase(self, base_year: int) -> pd.DataFrame:
+        """
+        基準年の平均を100とする指数に変換する
+
+        Args:
+            base_year: 基準年（例: 2015）
+
+        Returns:
+            月次PeriodIndex × 系列のDataFrame
+
+        Raises:
+            KeyError: 基準年のデータが無い場合
+        """
+        base = self.frame[self.frame.index.year == base_year]
+        if base.empty:
+            raise KeyError(f"基準年のデータがありません: {base_year}")
+        return self.frame / base.mean() * 100
+
+
+def load_index_store(directory: Path = DEFAULT_DIR) -> IndexStore:
+    """
+    整形済みの指数データ3系列を読み込んで月次ストアを作成する
+
+    Args:
+        directory: 整形済みデータのディレクトリ
+
+    Returns:
+        IndexStore（ファイルが無い系列は含まない）
+    """
+    tables = {}
+    for name, filename in INDEX_SERIES.items():
+        path = resolve_table(Path(directory) / filename)
+        if path.exists():
+            tables[name] = read_table(path)
+    return IndexStore.from_tables(tables)
+
+
+def write_index_store(store: IndexStore, directory: Path = DEFAULT_DIR, fmt: Optional[str] = None) -> Path:
+    """
+    月次ストアを縦長形式で保存する
+
+    Args:
+        store: IndexStore
+        directory: 保存先ディレクトリ
+        fmt: 出力形式（csv / parquet）
+
+    Returns:
+        保存したファイルのパス
+    """
+    return write_table(store.to_long(), Path(directory) / OUTPUT_FILENAME, fmt)
@@ -0,0 +1,137 @@
+"""
+統合ファイル（actual_wages_historical.csv等）に含まれる年月の管理。
+
+統合ファイルと同じディレクトリ（パーティション分割レイアウトの場合は
+データセットのルートディレクトリ内）にJSON形式のマニフェストを置き、
+年月ごとの取得元statInfIdと行数を記録する。
+差分更新時はマニフェストと取得対象の定義を比較し、
+未取得の月・statInfIdが変わった（改訂された）月だけを取得する。
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from storage import partition_row_counts, read_table
+
+
+class Manifest:
+    """
+    統合ファイルに含まれる年月の一覧
+
+    Attributes:
+        path: マニフェストファイルのパス
+        months: 年月 → {'stat_inf_id', 'rows', 'updated_at'} の辞書
+    """
+
+    def __init__(self, path: Path, months: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.path = Path(path)
+        self.months: Dict[str, Dict[str, Any]] = months or {}
+
+    @staticmethod
+    def for_output(output_path: Path) -> Path:
+        """統合ファイル（またはパーティション分割データセット）のマニフェストのパスを返す"""
+        output_path = Path(output_path)
+        if not output_path.suffix:
+            return output_path / "_manifest.json"
+        return output_path.with_name(f"{output_path.stem}.manifest.json")
+
+    @classmethod
+    def load(cls, output_path: Path, year_month_column: str = '年月') -> "Manifest":
+        """
+        統合ファイルのマニフェストを読み込む
+
+        マニフェストが無く統合ファイルだけがある場合（差分更新導入前に
+        作成したファイル等）は、統合ファイルの年月列だけを読んで作成する。
+        この場合statInfIdは不明のため、改訂の判定対象にはならない。
+
+        Args:
+            output_path: 統合ファイルのパス（拡張子なしの場合はパーティション分割データセットのルート）
+            year_month_column: 年月列の名前
+
+        Returns:
+            マニフェスト
+        """
+        output_path = Path(output_path)
+        path = cls.for_output(output_path)
+
+        if not output_path.exists():
+            return cls(path)
+
+        if path.exists():
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(path, json.load(f).get('months', {}))
+
+        if output_path.is_dir():
+            counts = partition_row_counts(output_path)
+        else:
+            counts = read_table(output_path, columns=[year_month_column])[year_month_column].value_counts()
+
+        months = {
+            str(year_month): {'stat_inf_id': None, 'rows': int(rows), 'updated_at': None}
+            for year_month, rows in counts.items()
+        }
+        return cls(path, months)
+
+    def pending(self, datasets: List[Any]) -> List[Any]:
+        """
+        取得が必要なデータセットを返す
+
+        Args:
+            datasets: year_month・stat_inf_id属性を持つデータセット定義のリスト
+
+        Returns:
+            未取得の月、またはstatInfIdが記録と異なる（改訂された）月の定義
+        """
+        pending = []
+        for dataset in datasets:
+            entry = self.months.get(dataset.year_month)
+            if entry is None:
+                pending.append(dataset)
+            elif entry['stat_inf_id'] is not None and entry['stat_inf_id'] != dataset.stat_inf_id:
+                pending.append(dataset)
+        return pending
+
+    def is_append_only(self, year_months: List[str]) -> bool:
+        """
+        指定した年月が全て既存の最新月より新しいかどうか
+
+        Trueの場合、統合ファイルの末尾に追記するだけで年月順が保たれる。
+        """
+        if not self.months:
+            return True
+        latest = max(self.months)
+        return all(year_month > latest for year_month in year_months)
+
+    def record(self, year_month: str, stat_inf_id: str, rows: int):
+        """取得した月を記録する"""
+        self.months[year_month] = {
+            'stat_inf_id': stat_inf_id,
+            'rows': rows,
+            'updated_at': datetime.now().isoformat()
+        }
+
+    def clear(self):
+        """全ての記録を削除する（全件再作成時）"""
+        self.months = {}
+
+    @property
+    def total_rows(self) -> int:
+        """統合ファイルの総行数"""
+        return sum(entry['rows'] for entry in self.months.values())
+
+    @property
+    def period(self) -> str:
+        """統合ファイルの期間（例: 2024-01 to 2025-11）"""
+        if not self.months:
+            return ''
+        return f"{min(self.months)} to {max(self.months)}"
+
+    def save(self):
+        """マニフェストをファイルに保存する"""
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'months': dict(sorted(self.months.items()))}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,258 @@
+"""
+Memoizing cache for e-Stat metadata responses.
+
+Table lists (getStatsList) and dimension definitions (CLASS_INF) rarely
+change, yet dashboard refreshes and discovery passes request them again on
+every run. MetadataCache keeps decoded responses in an in-memory LRU with a
+time-to-live, optionally backed by a JSON file per entry on disk so that
+separate processes can share them.
+
+Keys are built from the endpoint and its query parameters, normalized so
+that parameter order, value types (``100`` vs ``"100"``) and the API key do
+not produce distinct entries.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Default time-to-live of an entry in seconds
+DEFAULT_TTL = 6 * 60 * 60
+
+# Default number of entries kept in memory
+DEFAULT_MAX_ENTRIES = 256
+
+# Query parameters that do not affect the response
+IGNORED_PARAMS = ("appId",)
+
+
+def make_key(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build a normalized cache key for a request.
+
+    Args:
+        endpoint: Endpoint name or URL (e.g. ``getStatsList``)
+        params: Query parameters
+
+    Returns:
+        Key such as ``getStatsList?limit=100&statsCode=00450071``
+    """
+    items = sorted(
+        (str(name), str(value))
+        for name, value in (params or {}).items()
+        if name not in IGNORED_PARAMS and value is not None
+    )
+    query = "&".join(f"{name}={value}" for name, value in items)
+    return f"{endpoint.rsplit('/', 1)[-1]}?{query}"
+
+
+class MetadataCache:
+    """
+    TTL + LRU cache for decoded API responses with an optional disk tier.
+
+    Thread-safe. Cached values are shared between callers and must not be
+    mutated.
+
+    Attributes:
+        ttl: Time-to-live of an entry in seconds
+        max_entries: Maximum number of entries kept in memory
+        disk_dir: Directory of the disk tier, or None for memory only
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups that had to be fetched
+        disk_hits: Number of hits answered from the disk tier
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        disk_dir: Optional[Path] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            ttl: Time-to-live of an entry in seconds
+            max_entries: Maximum number of entries kept in memory
+            disk_dir: Directory for the disk tier (created if missing).
+                If None, entries live in memory only.
+            clock: Function returning the current time (for tests)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a key.
+
+        Args:
+            key: Cache key (see make_key)
+
+        Returns:
+            Cached value, or None if absent or expired
+        """
+        now = self._clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        entry = self._read_disk(key)
+        with self._lock:
+            if entry is not None and entry[0] > now:
+                self._store(key, entry)
+                self.hits += 1
+                self.disk_hits += 1
+                return entry[1]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: Any):
+        """
+        Store a value.
+
+        Args:
+            key: Cache key (see make_key)
+            value: JSON-serializable value
+        """
+        entry = (self._clock() + self.ttl, value)
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+
+    def get_or_fetch(
+        self,
+        key: str,
+        fetch: Callable[[], Any],
+        cacheable: Callable[[Any], bool] = bool
+    ) -> Any:
+        """
+        Return the cached value for a key, calling ``fetch`` on a miss.
+
+        Args:
+            key: Cache key (see make_key)
+            fetch: Function returning the value when it is not cached
+            cacheable: Predicate deciding whether a fetched value may be
+                stored. Defaults to truthiness, so empty results are
+                returned but not cached.
+
+        Returns:
+            Cached or freshly fetched value
+        """
+        value = self.get(key)
+        if value is None:
+            value = fetch()
+            if cacheable(value):
+                self.set(key, value)
+        return value
+
+    def invalidate(self, key: Optional[str] = None, prefix: Optional[str] = None) -> int:
+        """
+        Remove entries from both tiers.
+
+        Args:
+            key: Remove only this key
+            prefix: Remove every key starting with this prefix
+                (e.g. ``getStatsList?``). If neither is given, clear everything.
+
+        Returns:
+            Number of entries removed from memory
+        """
+        with self._lock:
+            if key is not None:
+                keys = [key] if key in self._entries else []
+            elif prefix is not None:
+                keys = [k for k in self._entries if k.startswith(prefix)]
+            else:
+                keys = list(self._entries)
+
+            for k in keys:
+                del self._entries[k]
+
+        if self.disk_dir is not None:
+            if key is not None:
+                self._disk_path(key).unlink(missing_ok=True)
+            else:
+                for path in self.disk_dir.glob("*.json"):
+                    if prefix is None or self._disk_key(path).startswith(prefix):
+                        path.unlink(missing_ok=True)
+
+        return len(keys)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "entries": len(self._entries),
+            }
+
+    def _store(self, key: str, entry: Tuple[float, Any]):
+        """Insert into the memory tier, evicting least recently used entries (lock held)."""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_path(self, key: str) -> Path:
+        """File of a key in the disk tier."""
+        return self.disk_dir / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()}.json"
+
+    @staticmethod
+    def _disk_key(path: Path) -> str:
+        """Key stored in a disk tier file ('' if unreadable)."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f).get("key", "")
+        except (OSError, ValueError):
+            return ""
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Any]]:
+        """Read an entry from the disk tier."""
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("key") != key:
+            return None
+        return data["expires_at"], data["value"]
+
+    def _write_disk(self, key: str, entry: Tuple[float, Any]):
+        """Write an entry to the disk tier atomically."""
+        if self.disk_dir is None:
+            return
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "expires_at": entry[0], "value": entry[1]}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
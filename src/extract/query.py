@@ -0,0 +1,277 @@
+"""
+整形済みデータに対するローカルSQLクエリ（DuckDB）。
+
+data/cleaned/ の実数データ・指数データ、data/derived/ の派生指標、
+data/master/ のマスターテーブルを、ファイルを読み込むビューとしてDuckDBに登録する。
+データをメモリに読み込んだりデータベースにコピーしたりせず、クエリの実行時に
+CSV / Parquetを直接（Parquetは必要な列・行グループだけ）読むため、
+data/cleaned/README.md のSQL例をBigQueryに読み込まずにそのまま実行できる：
+
+    from query import QueryEngine
+
+    with QueryEngine() as engine:
+        engine.sql("SELECT industry_code, AVG(total_cash_earnings) FROM actual_wages_historical GROUP BY 1")
+
+CSVの列の型はカラム定義マスター（schema.py）のSQLの型をそのまま指定するため、
+産業コードの T と 0 のような混在も文字列として読まれる。
+パーティション分割データセット（year_month=…/）は1つのビューとして登録する。
+
+DuckDBは任意の依存パッケージ（pip install duckdb）。
+"""
+
+import csv
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from cleaning import CLEANED_DIRNAME
+from derived_metrics import DERIVED_DIRNAME
+from schema import table_sql_types
+from storage import CSV, OUTPUT_FORMATS, PARQUET, PARTITION_FILE_STEM, PARTITION_KEY, resolve_table
+
+
+# データディレクトリ
+DATA_DIR = Path("data")
+
+# マスターテーブルのディレクトリ名（data/ からの相対パス）
+MASTER_DIRNAME = 'master'
+
+# ビュー名 → データファイル（data/ からの相対パス、CSV名で指定し、Parquetは拡張子を置き換えて探す）
+VIEWS = {
+    'actual_wages_historical': f"{CLEANED_DIRNAME}/actual_wages_historical.csv",
+    'actual_wages_latest': f"{CLEANED_DIRNAME}/actual_wages_latest.csv",
+    'wage_index': f"{CLEANED_DIRNAME}/wage_index.csv",
+    'employment_index': f"{CLEANED_DIRNAME}/employment_index.csv",
+    'hours_index': f"{CLEANED_DIRNAME}/hours_index.csv",
+    'index_monthly': f"{CLEANED_DIRNAME}/index_monthly.csv",
+    'wage_trends': f"{DERIVED_DIRNAME}/wage_trends.csv",
+    'gender_gap': f"{DERIVED_DIRNAME}/gender_gap.csv",
+    'parttime_gap': f"{DERIVED_DIRNAME}/parttime_gap.csv",
+    'real_wage_index': f"{DERIVED_DIRNAME}/real_wage_index.csv",
+    'industry_master': f"{MASTER_DIRNAME}/industry_master.csv",
+    'gender_master': f"{MASTER_DIRNAME}/gender_master.csv",
+    'employment_type_master': f"{MASTER_DIRNAME}/employment_type_master.csv",
+    'column_dictionary': f"{MASTER_DIRNAME}/column_dictionary.csv",
+}
+
+# カラム定義マスターでの列の型の定義元（ビュー名 → テーブル名）
+SCHEMA_TABLES = {
+    'actual_wages_historical': 'actual_wages',
+    'actual_wages_latest': 'actual_wages',
+    'wage_index': 'wage_index',
+    'employment_index': 'employment_index',
+    'hours_index': 'hours_index',
+}
+
+# カラム定義マスターに無いビューで文字列として読むコード列（T と 0 の混在・0 始まりのコード等）
+CODE_COLUMNS = (
+    'year_month', 'industry_code', 'gender', 'employment_type',
+    'gender_code', 'employment_type_code', 'series',
+)
+
+
+def _quote(value: str) -> str:
+    """SQLの文字列リテラルにする"""
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _struct(mapping: Dict[str, str]) -> str:
+    """辞書をDuckDBの構造体リテラル（{'列': '型', ...}）にする"""
+    return "{" + ", ".join(f"{_quote(k)}: {_quote(v)}" for k, v in mapping.items()) + "}"
+
+
+def _csv_header(path: Path) -> List[str]:
+    """CSVファイルの列名（1行目）を返す"""
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def _partition_format(root: Path) -> Optional[str]:
+    """パーティション分割データセットのファイル形式を返す（パーティションが無ければNone）"""
+    for fmt in OUTPUT_FORMATS:
+        if next(root.glob(f"{PARTITION_KEY}=*/{PARTITION_FILE_STEM}.{fmt}"), None) is not None:
+            return fmt
+    return None
+
+
+def _csv_options(view: str, columns: List[str]) -> str:
+    """
+    read_csvのオプション（型を明示する列の指定）を作成する
+
+    CSVに無い列を指定するとDuckDBがエラーにするため、1行目の列名にある列だけを指定する。
+    """
+    declared = table_sql_types(SCHEMA_TABLES[view]) if view in SCHEMA_TABLES else {}
+    types = {}
+    for column in columns:
+        if column in declared:
+            types[column] = declared[column]
+        elif column in CODE_COLUMNS:
+            types[column] = 'VARCHAR'
+
+    options = "header = true"
+    if types:
+        options += f", types = {_struct(types)}"
+    return options
+
+
+def view_source(view: str, path: Path) -> Optional[str]:
+    """
+    データファイルを読み込むテーブル関数（read_csv / read_parquet）のSQLを作成する
+
+    Args:
+        view: ビュー名（列の型の決定に使う）
+        path: データファイルのパス（CSV名）。同名のディレクトリがあれば
+              パーティション分割データセットとして読む
+
+    Returns:
+        FROM句に書くSQL（ファイルが無ければNone）。データベースファイルに保存した
+        ビューを別の作業ディレクトリから使えるよう、パスは絶対パスにする
+    """
+    root = path.with_suffix('')
+    if root.is_dir():
+        fmt = _partition_format(root)
+        if fmt is None:
+            return None
+        pattern = _quote((root.resolve() / f"{PARTITION_KEY}=*" / f"{PARTITION_FILE_STEM}.{fmt}").as_posix())
+        hive = f"hive_partitioning = true, hive_types = {_struct({PARTITION_KEY: 'VARCHAR'})}"
+
+        if fmt == PARQUET:
+            return f"read_parquet({pattern}, {hive})"
+
+        sample = next(root.glob(f"{PARTITION_KEY}=*/{PARTITION_FILE_STEM}.{CSV}"))
+        return f"read_csv({pattern}, {_csv_options(view, _csv_header(sample))}, {hive})"
+
+    path = resolve_table(path)
+    if not path.exists():
+        return None
+    location = _quote(path.resolve().as_posix())
+    if path.suffix == f".{PARQUET}":
+        return f"read_parquet({location})"
+
+    return f"read_csv({location}, {_csv_options(view, _csv_header(path))})"
+
+
+class QueryEngine:
+    """
+    整形済みデータをビューとして登録したDuckDBの接続
+
+    Attributes:
+        data_dir: データディレクトリ
+        connection: DuckDBの接続
+        views: 登録したビュー名 → データファイル（ディレクトリ）のパス
+    """
+
+    def __init__(self, data_dir: Path = DATA_DIR, database: str = ':memory:'):
+        """
+        Args:
+            data_dir: データディレクトリ（cleaned/・derived/・master/ を含む）
+            database: DuckDBのデータベースファイル（省略時はメモリ上。ビューの定義のみを持つ）
+
+        Raises:
+            ImportError: duckdbがインストールされていない場合
+        """
+        try:
+            import duckdb
+        except ImportError as e:
+            raise ImportError("SQLクエリを実行するには duckdb が必要です（pip install duckdb）") from e
+
+        self.data_dir = Path(data_dir)
+        self.connection = duckdb.connect(database)
+        self.views: Dict[str, Path] = {}
+        self.register()
+
+    def register(self) -> Dict[str, Path]:
+        """
+        存在するデータファイルをビューとして登録する（登録済みのビューは作り直す）
+
+        データを取得・更新した後に呼び出すと、新しいファイル・パーティションが反映される。
+
+        Returns:
+            登録したビュー名 → データファイル（ディレクトリ）のパス
+        """
+        self.views = {}
+        for view, relative_path in VIEWS.items():
+            path = self.data_dir / relative_path
+            source = view_source(view, path)
+            if source is None:
+                continue
+
+            root = path.with_suffix('')
+            if root.is_dir():
+                # パーティション列（ファイルには含まれない）を先頭の列にする
+                select = f"SELECT {PARTITION_KEY}, * EXCLUDE ({PARTITION_KEY}) FROM {source}"
+                self.views[view] = root
+            else:
+                select = f"SELECT * FROM {source}"
+                self.views[view] = resolve_table(path)
+
+            self.connection.execute(f'CREATE OR REPLACE VIEW "{view}" AS {select}')
+
+        return self.views
+
+    def sql(self, query: str, parameters: Optional[List] = None) -> pd.DataFrame:
+        """
+        SQLを実行して結果をDataFrameで返す
+
+        Args:
+            query: SQL（ビュー名をテーブル名として書ける）
+            parameters: プレースホルダ（?）に渡す値
+
+        Returns:
+            結果のDataFrame
+        """
+        return self.connection.execute(query, parameters or []).df()
+
+    def close(self):
+        """接続を閉じる"""
+        self.connection.close()
+
+    def __enter__(self) -> "QueryEngine":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def query(sql: str, data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    """
+    SQLを1回だけ実行する（接続の作成・ビューの登録・実行・切断）
+
+    Args:
+        sql: SQL
+        data_dir: データディレクトリ
+
+    Returns:
+        結果のDataFrame
+    """
+    with QueryEngine(data_dir) as engine:
+        return engine.sql(sql)
+
+
+def main(sql: Optional[str] = None, data_dir: Path = DATA_DIR):
+    """
+    Args:
+        sql: 実行するSQL（省略時は登録したビューの一覧を表示する）
+        data_dir: データディレクトリ
+    """
+    with QueryEngine(data_dir) as engine:
+        if sql is None:
+            print("登録したビュー:")
+            for view, path in engine.views.items():
+                print(f"  - {view}: {path}")
+            return
+
+        with pd.option_context('display.max_rows', 100, 'display.width', 200):
+            print(engine.sql(sql))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('sql', nargs='?', help='実行するSQL（省略時はビューの一覧を表示）')
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR, help='データディレクトリ')
+    args = parser.parse_args()
+
+    main(args.sql, args.data_dir)
@@ -0,0 +1,238 @@
+"""
+再開可能なストリーミングダウンロードとSHA-256チェックサム。
+
+レスポンス全体をメモリに読み込む代わりに、一定サイズのチャンクごとに
+一時ファイル（<保存先>.part）へ書き込みながらSHA-256を計算する。
+転送が途中で切れた場合は一時ファイルが残り、次回はHTTP Range
+（If-Rangeで同じファイルであることを確認）で続きから取得する。
+完了後に保存先へ原子的に置き換え（rename）、チェックサムを
+サイドカーファイル（<保存先>.sha256、sha256sum形式）に書き出す。
+"""
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import requests
+
+
+# 1回に読み書きするサイズ（バイト）
+CHUNK_SIZE = 1024 * 1024
+
+_CONTENT_RANGE_PATTERN = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+
+
+class IncompleteDownloadError(IOError):
+    """受信したサイズがContent-Length等と一致しない（転送が途中で終わった）"""
+
+
+# 転送途中の失敗（再試行すると中断した位置から再開される）
+RESUMABLE_ERRORS = (requests.exceptions.ChunkedEncodingError, IncompleteDownloadError)
+
+
+@dataclass
+class DownloadResult:
+    """
+    ストリーミングダウンロードの結果
+
+    Attributes:
+        status_code: HTTPステータスコード（304の場合はファイルを書き込んでいない）
+        sha256: ファイル全体のSHA-256（16進数、304の場合はNone）
+        size: ファイルサイズ（バイト）
+        headers: レスポンスヘッダー（大文字・小文字を区別しない）
+        resumed: 途中まで取得済みの一時ファイルから再開したかどうか
+    """
+    status_code: int
+    sha256: Optional[str]
+    size: int
+    headers: Dict[str, Any]
+    resumed: bool = False
+
+
+def sha256_file(path: Path, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    ファイルのSHA-256を計算する（チャンクごとに読み込む）
+
+    Args:
+        path: ファイルのパス
+        chunk_size: 1回に読み込むサイズ
+
+    Returns:
+        SHA-256（16進数）
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sidecar_path(path: Path) -> Path:
+    """チェックサムのサイドカーファイルのパスを返す（<ファイル名>.sha256）"""
+    path = Path(path)
+    return path.with_name(f"{path.name}.sha256")
+
+
+def write_sidecar(path: Path, sha256: str):
+    """チェックサムをサイドカーファイルに書き出す（sha256sum -c で検証できる形式）"""
+    path = Path(path)
+    sidecar_path(path).write_text(f"{sha256}  {path.name}\n", encoding='utf-8')
+
+
+def read_sidecar(path: Path) -> Optional[str]:
+    """サイドカーファイルのチェックサムを返す（無ければNone）"""
+    sidecar = sidecar_path(path)
+    if not sidecar.exists():
+        return None
+    content = sidecar.read_text(encoding='utf-8').split()
+    return content[0] if content else None
+
+
+def verify_checksum(path: Path, expected: Optional[str] = None) -> bool:
+    """
+    ファイルの内容がチェックサムと一致するかを確認する
+
+    Args:
+        path: ファイルのパス
+        expected: 期待するSHA-256（省略時はサイドカーファイルの値）
+
+    Returns:
+        ファイルとチェックサムが存在し、一致すればTrue
+    """
+    path = Path(path)
+    expected = expected or read_sidecar(path)
+    if expected is None or not path.exists():
+        return False
+    return sha256_file(path) == expected
+
+
+def _partial_paths(dest: Path):
+    """一時ファイルと、その取得元を記録するファイルのパスを返す"""
+    part_path = dest.with_name(f"{dest.name}.part")
+    return part_path, dest.with_name(f"{dest.name}.part.json")
+
+
+def _validator(headers: Dict[str, Any]) -> Optional[str]:
+    """If-Rangeに使うレスポンスの識別子（ETag、無ければLast-Modified）"""
+    return headers.get('ETag') or headers.get('Last-Modified')
+
+
+def stream_to_file(
+    session: Any,
+    url: str,
+    dest: Path,
+    params: Optional[Dict[str, Any]] = None,
+    headers: Optional[Dict[str, str]] = None,
+    timeout: int = 60,
+    chunk_size: int = CHUNK_SIZE,
+    sidecar: bool = True
+) -> DownloadResult:
+    """
+    URLの内容をチャンクごとにファイルへ保存する（中断したダウンロードは続きから再開）
+
+    前回の一時ファイルが残っていて取得元の識別子（ETag / Last-Modified）が
+    記録されている場合は、Range・If-Rangeを付けて続きだけを要求する。
+    サーバーが206以外（ファイルが更新された等）で応答した場合は最初から取得し直す。
+
+    Args:
+        session: HTTPセッション（requests.Session または requests）
+        url: リクエストURL
+        dest: 保存先のパス
+        params: クエリパラメータ
+        headers: 追加のリクエストヘッダー（If-None-Match等）
+        timeout: タイムアウト（秒）
+        chunk_size: 1回に書き込むサイズ
+        sidecar: Trueの場合はチェックサムをサイドカーファイルに書き出す
+
+    Returns:
+        ダウンロード結果（304の場合は保存先を変更しない）
+
+    Raises:
+        requests.exceptions.RequestException: リクエストが失敗した場合
+            （転送途中の失敗では一時ファイルを残し、次回再開する）
+        IncompleteDownloadError: 受信したサイズがContent-Length等と一致しない場合
+    """
+    dest = Path(dest)
+    part_path, meta_path = _partial_paths(dest)
+    request_headers = dict(headers or {})
+
+    # 前回の途中までのファイルがあれば続きから要求する
+    offset = 0
+    if part_path.exists() and meta_path.exists():
+        try:
+            validator = json.loads(meta_path.read_text(encoding='utf-8')).get('validator')
+        except ValueError:
+            validator = None
+        if validator:
+            offset = part_path.stat().st_size
+            request_headers['Range'] = f"bytes={offset}-"
+            request_headers['If-Range'] = validator
+
+    response = session.get(url, params=params, headers=request_headers, timeout=timeout, stream=True)
+
+    try:
+        if response.status_code == 304:
+            return DownloadResult(304, None, 0, response.headers)
+
+        if response.status_code == 416:
+            # 要求した範囲が不正（一時ファイルが壊れている等）なので最初から取得し直す
+            response.close()
+            part_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+            return stream_to_file(session, url, dest, params, headers, timeout, chunk_size, sidecar)
+
+        response.raise_for_status()
+
+        digest = hashlib.sha256()
+        resumed = response.status_code == 206 and offset > 0
+        expected_size = None
+
+        if resumed:
+            match = _CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+            if not match or int(match.group(1)) != offset:
+                raise IOError(f"想定外のContent-Rangeです: {response.headers.get('Content-Range')}")
+            if match.group(3) != '*':
+                expected_size = int(match.group(3))
+
+            # 取得済みの部分もチェックサムに含める
+            with open(part_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    digest.update(chunk)
+            mode = 'ab'
+        else:
+            offset = 0
+            if response.headers.get('Content-Length') and 'Content-Encoding' not in response.headers:
+                expected_size = int(response.headers['Content-Length'])
+            mode = 'wb'
+
+            # 再開に使う取得元の識別子を記録
+            validator = _validator(response.headers)
+            if validator:
+                meta_path.write_text(json.dumps({'url': response.url, 'validator': validator}), encoding='utf-8')
+            else:
+                meta_path.unlink(missing_ok=True)
+
+        size = offset
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    f.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+
+        if expected_size is not None and size != expected_size:
+            raise IncompleteDownloadError(f"受信サイズが一致しません: {size:,} bytes（想定: {expected_size:,} bytes）")
+
+        sha256 = digest.hexdigest()
+        os.replace(part_path, dest)
+        meta_path.unlink(missing_ok=True)
+        if sidecar:
+            write_sidecar(dest, sha256)
+
+        return DownloadResult(response.status_code, sha256, size, response.headers, resumed)
+    finally:
+        response.close()
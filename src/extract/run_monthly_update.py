@@ -0,0 +1,37 @@
+"""
+月次更新で取得する全データセットを1プロセスで取得する。
+
+指数データ（download_latest_indices.py）と最新実数データ
+（download_latest_actual_data.py）を、1つのExtractionEngine
+（HTTPセッション・ダウンロードキャッシュ・レート制限）を共有して取得する。
+続けて過去実数データ（download_historical_actual_data.py）を差分更新し、
+最新月（と改訂された月）を統合データに差し込んで、その月の影響を受ける
+派生指標（data/derived/）の年月だけを計算し直す。
+GitHub Actionsの月次ワークフローから実行される。
+"""
+
+import download_historical_actual_data
+import download_latest_actual_data
+import download_latest_indices
+from extraction import ExtractionEngine
+
+
+def main():
+    with ExtractionEngine() as engine:
+        exit_codes = [
+            download_latest_indices.main(engine),
+            download_latest_actual_data.main(engine),
+            # 索引は最新実数データの取得で更新済み。最新月はダウンロードキャッシュから読み込まれる
+            download_historical_actual_data.main(
+                engine,
+                partitioned=(engine.output_dir / download_historical_actual_data.PARTITIONED_DIRNAME).is_dir(),
+                refresh_index=False
+            ),
+        ]
+
+    return max(exit_codes)
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+列の型スキーマ（カラム定義マスターから生成）。
+
+create_master_tables.create_column_dictionary()が定義する各列のdata_typeを
+pandasの型に対応付け、読み込み・保存の全処理で同じ型を明示的に指定する。
+
+- VARCHAR  → category（産業コードの T と 0 のような混在を文字列に揃える）
+- INTEGER  → Int32（欠損を表せる整数型）
+- DECIMAL  → float32
+
+CSVを読み込むたびの型推論が不要になり、月によって整数・小数・文字列と
+型が変わること（型のずれ）も無くなる。メモリ使用量は64ビット型・
+オブジェクト型で保持する場合のおよそ半分になる。
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional
+
+import pandas as pd
+
+from create_master_tables import create_column_dictionary
+
+
+# カラム定義のdata_type（括弧より前の部分）→ pandasの型
+SQL_TYPE_DTYPES = {
+    'VARCHAR': 'category',
+    'INTEGER': 'Int32',
+    'DECIMAL': 'float32',
+}
+
+# 同じ列構成を持つテーブル（カラム定義マスターには代表のテーブルのみ登録）
+TABLE_ALIASES = {
+    'employment_index': 'wage_index',
+    'hours_index': 'wage_index',
+}
+
+
+def to_pandas_dtype(data_type: str) -> Optional[str]:
+    """
+    カラム定義のdata_typeをpandasの型に変換する
+
+    Args:
+        data_type: カラム定義の型（例: VARCHAR(7)、DECIMAL(5,1)）
+
+    Returns:
+        pandasの型（対応する型が無ければNone）
+    """
+    return SQL_TYPE_DTYPES.get(data_type.split('(')[0].strip().upper())
+
+
+@lru_cache(maxsize=None)
+def load_schema() -> Dict[str, Dict[str, str]]:
+    """
+    テーブルごとの列の型を作成する（日本語・英語の両方のカラム名で引ける）
+
+    Returns:
+        テーブル名 → {カラム名: pandasの型}
+    """
+    schema: Dict[str, Dict[str, str]] = {}
+
+    for row in create_column_dictionary().itertuples(index=False):
+        dtype = to_pandas_dtype(row.data_type)
+        if dtype is None:
+            continue
+        columns = schema.setdefault(row.table_name, {})
+        columns[row.column_name_japanese] = dtype
+        columns[row.column_name_english] = dtype
+
+    return schema
+
+
+def table_dtypes(table_name: str) -> Dict[str, str]:
+    """
+    テーブルの列の型を返す
+
+    Args:
+        table_name: テーブル名（例: actual_wages、wage_index）
+
+    Returns:
+        {カラム名: pandasの型}（pd.read_csvのdtypeにそのまま渡せる）
+
+    Raises:
+        KeyError: カラム定義マスターに無いテーブルの場合
+    """
+    return dict(load_schema()[TABLE_ALIASES.get(table_name, table_name)])
+
+
+@lru_cache(maxsize=None)
+def column_dtypes() -> Dict[str, str]:
+    """
+    全テーブルの列の型を1つにまとめて返す（テーブル名が分からない読み込み・保存用）
+
+    Returns:
+        {カラム名: pandasの型}
+    """
+    merged: Dict[str, str] = {}
+    for columns in load_schema().values():
+        merged.update(columns)
+    return merged
+
+
+@lru_cache(maxsize=None)
+def load_sql_types() -> Dict[str, Dict[str, str]]:
+    """
+    テーブルごとの列のSQLの型（カラム定義のdata_typeそのまま、英語のカラム名で引ける）
+
+    Returns:
+        テーブル名 → {英語のカラム名: SQLの型（例: VARCHAR(7)）}
+    """
+    types: Dict[str, Dict[str, str]] = {}
+    for row in create_column_dictionary().itertuples(index=False):
+        types.setdefault(row.table_name, {})[row.column_name_english] = row.data_type
+    return types
+
+
+def table_sql_types(table_name: str) -> Dict[str, str]:
+    """
+    テーブルの列のSQLの型を返す（SQLエンジンにCSVを読ませる際の型指定用）
+
+    Args:
+        table_name: テーブル名（例: actual_wages、hours_index）
+
+    Returns:
+        {英語のカラム名: SQLの型}
+
+    Raises:
+        KeyError: カラム定義マスターに無いテーブルの場合
+    """
+    return dict(load_sql_types()[TABLE_ALIASES.get(table_name, table_name)])
+
+
+def decimal_scale(data_type: str) -> Optional[int]:
+    """
+    カラム定義のDECIMAL(p,s)の小数点以下の桁数 s を返す
+
+    Args:
+        data_type: カラム定義の型（例: DECIMAL(5,1)）
+
+    Returns:
+        小数点以下の桁数（DECIMAL以外、または桁数の指定が無ければNone）
+    """
+    name, _, args = data_type.partition('(')
+    if name.strip().upper() != 'DECIMAL' or ',' not in args:
+        return None
+    return int(args.rstrip(') ').split(',')[1])
+
+
+@lru_cache(maxsize=None)
+def load_scales() -> Dict[str, Dict[str, int]]:
+    """
+    テーブルごとのDECIMAL列の小数点以下の桁数（日本語・英語の両方のカラム名で引ける）
+
+    float32で保持した値を計算に使う前に、この桁数で丸めて元データの値に戻す
+    （例: float32の151.7は151.6999969…になる）。
+
+    Returns:
+        テーブル名 → {カラム名: 小数点以下の桁数}
+    """
+    scales: Dict[str, Dict[str, int]] = {}
+    for row in create_column_dictionary().itertuples(index=False):
+        scale = decimal_scale(row.data_type)
+        if scale is None:
+            continue
+        columns = scales.setdefault(row.table_name, {})
+        columns[row.column_name_japanese] = scale
+        columns[row.column_name_english] = scale
+    return scales
+
+
+def table_scales(table_name: str) -> Dict[str, int]:
+    """
+    テーブルのDECIMAL列の小数点以下の桁数を返す
+
+    Args:
+        table_name: テーブル名（例: actual_wages、wage_index）
+
+    Returns:
+        {カラム名: 小数点以下の桁数}
+
+    Raises:
+        KeyError: カラム定義マスターに無いテーブルの場合
+    """
+    return dict(load_scales().get(TABLE_ALIASES.get(table_name, table_name), {}))
+
+
+def apply_schema(df: pd.DataFrame, dtypes: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """
+    DataFrameの列をスキーマの型に変換する（スキーマに無い列はそのまま）
+
+    Args:
+        df: DataFrame
+        dtypes: {カラム名: pandasの型}（省略時は全テーブルの列の型）
+
+    Returns:
+        型を揃えたDataFrame（元のDataFrameは変更しない）
+    """
+    dtypes = column_dtypes() if dtypes is None else dtypes
+    df = df.copy()
+
+    for col in df.columns:
+        dtype = dtypes.get(col)
+        if dtype is None:
+            continue
+
+        if dtype == 'category':
+            current = df[col].dtype
+            if isinstance(current, pd.CategoricalDtype) and current.categories.inferred_type == 'string':
+                continue
+            # 数値として読み込まれたコード（0 等）も文字列のカテゴリに揃える
+            df[col] = df[col].astype('string').astype('category')
+        elif df[col].dtype == dtype:
+            continue
+        elif isinstance(df[col].dtype, pd.CategoricalDtype) or df[col].dtype == object:
+            df[col] = pd.to_numeric(df[col].astype(object), errors='coerce').astype(dtype)
+        else:
+            df[col] = df[col].astype(dtype)
+
+    return df
@@ -0,0 +1,309 @@
+"""
+毎勤原表（実数データ）の調査年月 → statInfId の索引。
+
+毎勤原表のstatInfIdは毎月新しく採番されるため、e-Stat APIのデータカタログ
+（getDataCatalog）から毎月勤労統計調査のファイルを検索し、調査年月ごとの
+statInfIdをJSONファイル（data/estat_file_index.json）に保存しておく。
+
+更新は差分で行う。前回更新日以降に更新されたカタログ項目だけを
+updatedDateで絞り込んで取得するため、毎月の更新は数件の取得で済み、
+最新月の特定はローカルの索引を引くだけになる。
+APIキー（ESTAT_API_KEY）が無い場合やAPIが失敗した場合は、保存済みの索引をそのまま使う。
+"""
+
+import json
+import os
+import re
+import unicodedata
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+
+# 索引ファイルのパス
+INDEX_PATH = Path("data/estat_file_index.json")
+
+# 毎月勤労統計調査の政府統計コード
+STATS_CODE = '00450071'
+
+# カタログ検索のキーワード
+SEARCH_WORD = '毎勤原表'
+
+# 索引に登録するファイルの条件（表題にすべて含まれること）
+TITLE_KEYWORDS = ('毎勤原表', '確報')
+
+# 元号の元年（西暦 = 元年 + 年 - 1）
+_ERA_FIRST_YEARS = {'令和': 2019, '平成': 1989}
+
+_ERA_PATTERN = re.compile(r'(令和|平成)\s*(元|\d+)\s*年\s*(\d{1,2})\s*月')
+_YEAR_PATTERN = re.compile(r'(\d{4})\s*年\s*(\d{1,2})\s*月')
+_YYYYMM_PATTERN = re.compile(r'^(\d{4})(\d{2})$')
+
+
+def parse_survey_month(text: Optional[str]) -> Optional[str]:
+    """
+    表題等から調査年月を読み取る
+
+    「令和7年11月」「2024年12月」「202511」の形式に対応する。
+
+    Args:
+        text: 表題・調査年月の文字列
+
+    Returns:
+        調査年月（例: 2025-11）、読み取れない場合はNone
+    """
+    if not text:
+        return None
+
+    text = unicodedata.normalize('NFKC', str(text))
+
+    match = _ERA_PATTERN.search(text)
+    if match:
+        era, year, month = match.groups()
+        year = _ERA_FIRST_YEARS[era] + (1 if year == '元' else int(year)) - 1
+    else:
+        match = _YEAR_PATTERN.search(text) or _YYYYMM_PATTERN.match(text.strip())
+        if not match:
+            return None
+        year, month = match.groups()
+
+    if not 1 <= int(month) <= 12:
+        return None
+    return f"{int(year):04d}-{int(month):02d}"
+
+
+def _text(value: Any) -> str:
+    """カタログの項目（文字列または {'$': ...} 形式）を文字列にする"""
+    if isinstance(value, dict):
+        value = value.get('$', '')
+    return str(value or '')
+
+
+def _as_list(value: Any) -> List[Any]:
+    """1件の場合にオブジェクトで返る項目をリストにする"""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _stat_inf_id(resource: Dict[str, Any]) -> Optional[str]:
+    """カタログのファイル項目からstatInfIdを取り出す（ダウンロードURLのクエリを優先）"""
+    query = parse_qs(urlparse(_text(resource.get('URL'))).query)
+    if query.get('statInfId'):
+        return query['statInfId'][0]
+    return _text(resource.get('@id')) or None
+
+
+class StatInfIndex:
+    """
+    調査年月 → statInfId の索引
+
+    Attributes:
+        path: 索引ファイルのパス
+        months: 年月 → {'stat_inf_id', 'name', 'released'} の辞書
+        refreshed_on: 前回カタログから更新した日（未更新ならNone）
+    """
+
+    def __init__(
+        self,
+        path: Path = INDEX_PATH,
+        months: Optional[Dict[str, Dict[str, Any]]] = None,
+        refreshed_on: Optional[str] = None
+    ):
+        self.path = Path(path)
+        self.months: Dict[str, Dict[str, Any]] = months or {}
+        self.refreshed_on = refreshed_on
+
+    @classmethod
+    def load(cls, path: Path = INDEX_PATH) -> "StatInfIndex":
+        """
+        索引ファイルを読み込む（無ければ空の索引を返す）
+
+        Args:
+            path: 索引ファイルのパス
+
+        Returns:
+            索引
+        """
+        path = Path(path)
+        if not path.exists():
+            return cls(path)
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(path, data.get('months', {}), data.get('refreshed_on'))
+
+    def add_catalog_entry(self, entry: Dict[str, Any]) -> List[str]:
+        """
+        データカタログの1項目（DATA_CATALOG_INF）に含まれる毎勤原表を索引に登録する
+
+        同じ年月に複数のファイルがある場合は、公開日が新しいもの（改訂版）を採用する。
+
+        Args:
+            entry: DATASET・RESOURCESを持つカタログ項目
+
+        Returns:
+            登録・更新した年月のリスト
+        """
+        dataset_title = entry.get('DATASET', {}).get('TITLE', {})
+        if isinstance(dataset_title, dict):
+            dataset_name = _text(dataset_title.get('NAME'))
+            survey_date = _text(dataset_title.get('SURVEY_DATE'))
+        else:
+            dataset_name, survey_date = _text(dataset_title), ''
+
+        changed = []
+        for resource in _as_list(entry.get('RESOURCES', {}).get('RESOURCE')):
+            title = resource.get('TITLE', {})
+            if isinstance(title, dict):
+                name = ' '.join(filter(None, (_text(title.get('NAME')), _text(title.get('TABLE_NAME')))))
+            else:
+                name = _text(title)
+
+            if not all(keyword in f"{dataset_name} {name}" for keyword in TITLE_KEYWORDS):
+                continue
+
+            stat_inf_id = _stat_inf_id(resource)
+            year_month = (
+                parse_survey_month(name)
+                or parse_survey_month(dataset_name)
+                or parse_survey_month(survey_date)
+            )
+            if not stat_inf_id or not year_month:
+                continue
+
+            released = _text(resource.get('LAST_MODIFIED_DATE') or resource.get('RELEASE_DATE'))
+            current = self.months.get(year_month)
+            if current is not None:
+                if current['stat_inf_id'] == stat_inf_id:
+                    continue
+                if current.get('released') and released and released < current['released']:
+                    continue
+
+            self.months[year_month] = {
+                'stat_inf_id': stat_inf_id,
+                'name': name or dataset_name,
+                'released': released or None,
+            }
+            changed.append(year_month)
+
+        return changed
+
+    def refresh(self, client=None, full: bool = False) -> List[str]:
+        """
+        e-Statのデータカタログから索引を更新する
+
+        前回更新日がある場合は、その日以降に更新されたカタログ項目だけを取得する。
+        前回更新日は、カタログの全ページを取得できた場合だけ進める
+        （エラー応答で途中までしか取得できなかった期間は、次回も取得対象に残る）。
+
+        Args:
+            client: EStatAPIClient（省略時は環境変数 ESTAT_API_KEY で作成）
+            full: Trueの場合は前回更新日によらずカタログ全体を取得する
+
+        Returns:
+            登録・更新した年月のリスト
+
+        Raises:
+            ValueError: APIキーが無い場合
+            client.EStatAPIError: APIがエラー（RESULT.STATUS）を返した場合（ValueErrorのサブクラス）
+            requests.exceptions.RequestException: APIリクエストが失敗した場合
+        """
+        if client is None:
+            from client import EStatAPIClient
+            client = EStatAPIClient()
+
+        today = date.today()
+        updated_date = None
+        if self.refreshed_on and not full:
+            since = date.fromisoformat(self.refreshed_on)
+            updated_date = f"{since:%Y%m%d}-{today:%Y%m%d}"
+
+        changed = []
+        for entry in client.iter_data_catalog(
+            stats_code=STATS_CODE,
+            search_word=SEARCH_WORD,
+            updated_date=updated_date
+        ):
+            changed.extend(self.add_catalog_entry(entry))
+
+        # 全ページを取得できた場合だけ前回更新日を進める（途中で例外が出た場合はここに来ない）
+        self.refreshed_on = today.isoformat()
+        return sorted(set(changed))
+
+    def latest(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """最新の調査年月とその項目を返す（索引が空ならNone）"""
+        if not self.months:
+            return None
+        year_month = max(self.months)
+        return year_month, self.months[year_month]
+
+    def entries(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        期間内の調査年月と項目を新しい順に返す
+
+        Args:
+            start: 開始年月（この値を含む）
+            end: 終了年月（この値を含む）
+
+        Returns:
+            (年月, 項目) のリスト
+        """
+        return [
+            (year_month, self.months[year_month])
+            for year_month in sorted(self.months, reverse=True)
+            if (start is None or year_month >= start) and (end is None or year_month <= end)
+        ]
+
+    def save(self):
+        """索引をファイルに保存する"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {'refreshed_on': self.refreshed_on, 'months': dict(sorted(self.months.items()))},
+                f,
+                indent=2,
+                ensure_ascii=False
+            )
+        os.replace(tmp_path, self.path)
+
+
+def load_index(path: Path = INDEX_PATH, refresh: bool = True) -> StatInfIndex:
+    """
+    索引を読み込み、可能であればe-Statのデータカタログから差分更新する
+
+    APIキーが無い・APIが失敗した場合は警告を表示し、保存済みの索引を使う。
+
+    Args:
+        path: 索引ファイルのパス
+        refresh: Falseの場合は更新せずに保存済みの索引を使う
+
+    Returns:
+        索引
+    """
+    index = StatInfIndex.load(path)
+    if not refresh:
+        return index
+
+    print("statInfId索引を更新中...")
+    try:
+        changed = index.refresh()
+    except (ValueError, requests.exceptions.RequestException) as e:
+        print(f"  ⚠ 索引を更新できませんでした（保存済みの索引を使用）: {e}")
+        return index
+
+    index.save()
+    if changed:
+        print(f"  ✓ 追加・更新: {', '.join(changed)}")
+    else:
+        print("  ✓ 新しい毎勤原表はありません")
+
+    return index
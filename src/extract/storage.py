@@ -0,0 +1,564 @@
+"""
+整形済みデータの保存・読み込み（CSV / Parquet）。
+
+出力形式は関数の引数、または環境変数 JMACRO_OUTPUT_FORMAT で選択する
+（デフォルトはCSV）。列の型はschema.py（カラム定義マスターから生成）に従い、
+CSVの読み込みでも型を明示するため型推論をやり直さない。Parquetでは
+産業コード・性別・就業形態等を辞書エンコード（カテゴリ型）で保存するため、
+ファイルサイズも小さくなる。
+
+ファイル名は呼び出し側ではCSV名（例: actual_wages_historical.csv）で扱い、
+Parquet形式の場合は拡張子を.parquetに置き換えて保存・読み込みする。
+
+TableWriter・iter_groups()は、統合ファイル全体をメモリに載せずに
+少しずつ書き出す・読み込むためのもの（consolidation.pyで使用）。
+"""
+
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from schema import apply_schema, column_dtypes
+
+
+# 出力形式
+CSV = 'csv'
+PARQUET = 'parquet'
+OUTPUT_FORMATS = (CSV, PARQUET)
+
+# 出力形式を指定する環境変数
+OUTPUT_FORMAT_ENV = 'JMACRO_OUTPUT_FORMAT'
+
+
+def get_output_format(fmt: Optional[str] = None) -> str:
+    """
+    出力形式を決定する
+
+    Args:
+        fmt: 出力形式（省略時は環境変数 JMACRO_OUTPUT_FORMAT、未設定ならcsv）
+
+    Returns:
+        'csv' または 'parquet'
+
+    Raises:
+        ValueError: 未対応の形式が指定された場合
+    """
+    fmt = (fmt or os.getenv(OUTPUT_FORMAT_ENV) or CSV).lower()
+    if fmt not in OUTPUT_FORMATS:
+        raise ValueError(f"未対応の出力形式です: {fmt}（{', '.join(OUTPUT_FORMATS)}のいずれか）")
+    return fmt
+
+
+def table_path(path: Path, fmt: Optional[str] = None) -> Path:
+    """
+    出力形式に応じた拡張子のパスを返す
+
+    Args:
+        path: 基準となるパス（拡張子は置き換えられる）
+        fmt: 出力形式
+
+    Returns:
+        .csv または .parquet のパス
+    """
+    return Path(path).with_suffix(f".{get_output_format(fmt)}")
+
+
+def resolve_table(path: Path, fmt: Optional[str] = None) -> Path:
+    """
+    既存のデータファイルを探す
+
+    指定した出力形式のファイルを優先し、無ければもう一方の形式を探す。
+
+    Args:
+        path: 基準となるパス
+        fmt: 優先する出力形式
+
+    Returns:
+        存在するファイルのパス（どちらも無ければ優先形式のパス）
+    """
+    preferred = table_path(path, fmt)
+    if preferred.exists():
+        return preferred
+
+    for other in OUTPUT_FORMATS:
+        candidate = Path(path).with_suffix(f".{other}")
+        if candidate.exists():
+            return candidate
+
+    return preferred
+
+
+def normalize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    保存用に列の型をスキーマ（schema.py）に揃える
+
+    Excelから読み込んだコード列は 'T' と 0 のように文字列と数値が混在するため、
+    文字列に揃えてからカテゴリ型にする。
+
+    Args:
+        df: DataFrame
+
+    Returns:
+        型を揃えたDataFrame（元のDataFrameは変更しない）
+    """
+    return apply_schema(df)
+
+
+def _arrow_schema(df: pd.DataFrame):
+    """DataFrameの列に対応するParquetスキーマを作成する"""
+    import pyarrow as pa
+
+    fields = []
+    for col, dtype in df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            arrow_type = pa.dictionary(pa.int32(), pa.string())
+        elif pd.api.types.is_bool_dtype(dtype):
+            arrow_type = pa.bool_()
+        elif pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_float_dtype(dtype):
+            # 拡張型（Int64等）は対応するNumPy型に揃える
+            arrow_type = pa.from_numpy_dtype(getattr(dtype, 'numpy_dtype', dtype))
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(str(col), arrow_type))
+
+    return pa.schema(fields)
+
+
+def write_table(df: pd.DataFrame, path: Path, fmt: Optional[str] = None) -> Path:
+    """
+    DataFrameを指定形式で保存する
+
+    Args:
+        df: DataFrame
+        path: 保存先パス（拡張子は出力形式に合わせて置き換えられる）
+        fmt: 出力形式（省略時はget_output_format()に従う）
+
+    Returns:
+        保存したファイルのパス
+    """
+    fmt = get_output_format(fmt)
+    output_path = table_path(path, fmt)
+
+    if fmt == CSV:
+        df.to_csv(output_path, index=False, encoding='utf-8-sig')
+        return output_path
+
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet形式で保存するには pyarrow が必要です（pip install pyarrow）") from e
+
+    df = normalize_dtypes(df)
+    table = pa.Table.from_pandas(df, schema=_arrow_schema(df), preserve_index=False)
+    pq.write_table(table, output_path, compression='zstd')
+
+    return output_path
+
+
+def append_table(df: pd.DataFrame, path: Path, fmt: Optional[str] = None) -> Path:
+    """
+    既存のデータファイルの末尾に行を追加する
+
+    CSVはファイル末尾への追記で済む。Parquetは追記できないため、
+    既存ファイルを読み込んで結合し書き直す（列指向のため読み込みは高速）。
+
+    Args:
+        df: 追加する行
+        path: データファイルのパス
+        fmt: 出力形式
+
+    Returns:
+        保存したファイルのパス
+    """
+    fmt = get_output_format(fmt)
+    output_path = table_path(path, fmt)
+
+    if not output_path.exists():
+        return write_table(df, path, fmt)
+
+    if fmt == CSV:
+        # 追記時はBOMを書かない（ファイル先頭にのみ必要）
+        df.to_csv(output_path, mode='a', header=False, index=False, encoding='utf-8')
+        return output_path
+
+    existing_df = read_table(output_path)
+    combined_df = pd.concat([existing_df, normalize_dtypes(df)], ignore_index=True)
+    return write_table(combined_df, path, fmt)
+
+
+def read_table(
+    path: Path,
+    columns: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """
+    データファイルを読み込む（形式は拡張子で判定）
+
+    Args:
+        path: データファイルのパス（.csv / .parquet）
+        columns: 読み込む列（省略時は全列）
+        dtype: CSV読み込み時に指定する列の型（省略時はスキーマの型）
+
+    Returns:
+        DataFrame（スキーマに登録された列はスキーマの型）
+    """
+    path = Path(path)
+
+    if path.suffix == f".{PARQUET}":
+        # 型を明示する前に保存したファイルもスキーマの型に揃える
+        return apply_schema(pd.read_parquet(path, columns=columns))
+
+    return pd.read_csv(path, usecols=columns, dtype=column_dtypes() if dtype is None else dtype)
+
+
+# 既存ファイルを分割して読み込む際の1回あたりの行数
+READ_CHUNK_ROWS = 100_000
+
+
+def iter_groups(
+    path: Path,
+    column: str,
+    dtype: Optional[Dict[str, str]] = None,
+    chunksize: int = READ_CHUNK_ROWS
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    column でソート済みのデータファイルを、値が連続する行のまとまりごとに少しずつ読み込む
+
+    ファイル全体をメモリに載せないため、読み込みはchunksize行ずつ行う。
+    同じ値の行が読み込み単位の境界をまたぐ場合は、同じ値のまとまりが続けて返る。
+
+    Args:
+        path: データファイルのパス（.csv / .parquet）
+        column: まとまりの判定に使う列（例: 年月）
+        dtype: CSV読み込み時に指定する列の型（省略時はスキーマの型）
+        chunksize: 1回に読み込む行数
+
+    Yields:
+        (列の値, 行のまとまり) のタプル（ファイル内の順序のまま）
+    """
+    path = Path(path)
+
+    if path.suffix == f".{PARQUET}":
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunksize)
+        chunks = (apply_schema(batch.to_pandas()) for batch in batches)
+    else:
+        chunks = pd.read_csv(path, dtype=column_dtypes() if dtype is None else dtype, chunksize=chunksize)
+
+    for chunk in chunks:
+        for value, group in chunk.groupby(column, sort=False, observed=True):
+            yield str(value), group.reset_index(drop=True)
+
+
+class TableWriter:
+    """
+    DataFrameを少しずつ書き足して1つのデータファイルを作成する
+
+    一時ファイルに書き込み、close()時に置き換えるため、書き込み中も
+    同じパスの既存ファイルを読み込める（iter_groups()と組み合わせたマージ用）。
+    CSVは先頭の書き込みでのみヘッダーを出力し、Parquetは書き込みごとに
+    1つの行グループとして追加する。
+
+    Parquetの列はスキーマ（schema.py）の型で保存する。スキーマに無い数値列は、
+    月ごとに整数のみ・欠損ありが変わっても型が揃うようfloat64で保存する。
+
+    Attributes:
+        path: 出力ファイルのパス
+        fmt: 出力形式（csv / parquet）
+        rows: 書き込んだ行数
+    """
+
+    def __init__(self, path: Path, fmt: Optional[str] = None):
+        """
+        Args:
+            path: 出力ファイルのパス（拡張子は出力形式に合わせて置き換えられる）
+            fmt: 出力形式（省略時はget_output_format()に従う）
+        """
+        self.fmt = get_output_format(fmt)
+        self.path = table_path(path, self.fmt)
+        self.rows = 0
+
+        self._tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        self._file = None
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame):
+        """
+        行を書き足す
+
+        Args:
+            df: 書き込む行（列は最初に書き込んだDataFrameと同じであること）
+        """
+        if self.fmt == CSV:
+            if self._file is None:
+                self._file = open(self._tmp_path, 'w', encoding='utf-8-sig', newline='')
+            df.to_csv(self._file, header=self.rows == 0, index=False)
+        else:
+            self._write_parquet(df)
+
+        self.rows += len(df)
+
+    def _write_parquet(self, df: pd.DataFrame):
+        """行グループとしてParquetファイルに書き足す"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet形式で保存するには pyarrow が必要です（pip install pyarrow）") from e
+
+        df = normalize_dtypes(df)
+        schema_columns = column_dtypes()
+        for col, dtype in df.dtypes.items():
+            if col in schema_columns or isinstance(dtype, pd.CategoricalDtype):
+                continue
+            if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                df[col] = df[col].astype('float64')
+
+        if self._writer is None:
+            self._schema = _arrow_schema(df)
+            self._writer = pq.ParquetWriter(self._tmp_path, self._schema, compression='zstd')
+
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=False))
+
+    def close(self) -> Optional[Path]:
+        """
+        書き込みを終えて出力ファイルを置き換える
+
+        Returns:
+            出力ファイルのパス（1行も書き込んでいない場合はNone、既存ファイルはそのまま）
+        """
+        if self._file is not None:
+            self._file.close()
+        if self._writer is not None:
+            self._writer.close()
+
+        if self._file is None and self._writer is None:
+            return None
+
+        self._file = self._writer = None
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self):
+        """書き込みを中止して一時ファイルを削除する（既存ファイルはそのまま）"""
+        if self._file is not None:
+            self._file.close()
+        if self._writer is not None:
+            self._writer.close()
+        self._file = self._writer = None
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+# パーティション分割レイアウトのディレクトリ名に使うキー（Hive形式: year_month=2025-11/）
+PARTITION_KEY = 'year_month'
+
+# パーティション内のデータファイル名（拡張子なし）
+PARTITION_FILE_STEM = 'part-0'
+
+
+def partition_dir(root: Path, value: str) -> Path:
+    """
+    パーティションのディレクトリを返す
+
+    Args:
+        root: パーティション分割データセットのルートディレクトリ
+        value: パーティションの値（例: 2025-11）
+
+    Returns:
+        root/year_month=<value>/
+    """
+    return Path(root) / f"{PARTITION_KEY}={value}"
+
+
+def list_partitions(root: Path) -> List[str]:
+    """
+    データセットに含まれるパーティションの値を昇順で返す
+
+    Args:
+        root: パーティション分割データセットのルートディレクトリ
+
+    Returns:
+        パーティションの値のリスト（例: ['2024-01', '2024-02', ...]）
+    """
+    root = Path(root)
+    if not root.is_dir():
+        return []
+
+    prefix = f"{PARTITION_KEY}="
+    return sorted(
+        path.name[len(prefix):]
+        for path in root.iterdir()
+        if path.is_dir() and path.name.startswith(prefix) and _partition_file(path) is not None
+    )
+
+
+def _partition_file(directory: Path) -> Optional[Path]:
+    """パーティション内のデータファイルを返す（無ければNone）"""
+    for fmt in OUTPUT_FORMATS:
+        path = directory / f"{PARTITION_FILE_STEM}.{fmt}"
+        if path.exists():
+            return path
+    return None
+
+
+def write_partitioned(
+    df: pd.DataFrame,
+    root: Path,
+    column: str = PARTITION_KEY,
+    fmt: Optional[str] = None
+) -> List[str]:
+    """
+    DataFrameを年月ごとのパーティション（Hive形式）に分けて保存する
+
+    dfに含まれる年月のパーティションだけを置き換え、他の年月には触れない。
+    パーティション列の値はディレクトリ名で表すため、データファイルには含めない。
+
+    Args:
+        df: DataFrame
+        root: データセットのルートディレクトリ
+        column: パーティション列（例: year_month、年月）
+        fmt: 出力形式（csv / parquet）
+
+    Returns:
+        書き込んだパーティションの値のリスト
+    """
+    fmt = get_output_format(fmt)
+    written = []
+
+    for value, part_df in df.groupby(column, sort=True, observed=True):
+        directory = partition_dir(root, str(value))
+        directory.mkdir(parents=True, exist_ok=True)
+
+        # 出力形式を変えた場合に古いファイルが残らないよう両形式とも削除
+        for old_fmt in OUTPUT_FORMATS:
+            (directory / f"{PARTITION_FILE_STEM}.{old_fmt}").unlink(missing_ok=True)
+
+        write_table(
+            part_df.drop(columns=[column]).reset_index(drop=True),
+            directory / PARTITION_FILE_STEM,
+            fmt
+        )
+        written.append(str(value))
+
+    return written
+
+
+def partition_row_counts(root: Path) -> Dict[str, int]:
+    """
+    パーティションごとの行数を返す
+
+    Parquetはファイルのメタデータから、CSVは行数を数えて求める
+    （データ本体は読み込まない）。
+
+    Args:
+        root: データセットのルートディレクトリ
+
+    Returns:
+        パーティションの値 → 行数
+    """
+    counts = {}
+    for value in list_partitions(root):
+        path = _partition_file(partition_dir(root, value))
+        if path.suffix == f".{PARQUET}":
+            import pyarrow.parquet as pq
+            counts[value] = pq.ParquetFile(path).metadata.num_rows
+        else:
+            with open(path, 'rb') as f:
+                counts[value] = max(sum(1 for _ in f) - 1, 0)
+    return counts
+
+
+def read_partitioned(
+    root: Path,
+    column: str = PARTITION_KEY,
+    values: Optional[List[str]] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    dtype: Optional[Dict[str, str]] = None
+) -> pd.DataFrame:
+    """
+    パーティション分割データセットを読み込む
+
+    ディレクトリ名で対象パーティションを絞り込む（パーティションプルーニング）ため、
+    対象外の年月のファイルは開かない。columnsを指定すると、Parquetでは
+    その列だけを読み込む（列の射影）。
+
+    Args:
+        root: データセットのルートディレクトリ
+        column: パーティション列の名前（結果の列名として復元する）
+        values: 読み込む年月のリスト（例: ['2025-11']）
+        start: 読み込む期間の開始年月（この値を含む）
+        end: 読み込む期間の終了年月（この値を含む）
+        columns: 読み込む列（省略時は全列）
+        dtype: CSV読み込み時に指定する列の型（省略時はスキーマの型）
+
+    Returns:
+        DataFrame（パーティション列を先頭に含む。列の型はスキーマに従う）
+    """
+    selected = list_partitions(root)
+    if values is not None:
+        wanted = set(values)
+        selected = [v for v in selected if v in wanted]
+    if start is not None:
+        selected = [v for v in selected if v >= start]
+    if end is not None:
+        selected = [v for v in selected if v <= end]
+
+    data_columns = None
+    if columns is not None:
+        data_columns = [c for c in columns if c != column]
+
+    frames = []
+    for value in selected:
+        part_df = read_table(_partition_file(partition_dir(root, value)), data_columns, dtype)
+        part_df.insert(0, column, value)
+        frames.append(part_df)
+
+    if not frames:
+        return pd.DataFrame(columns=columns or [column])
+
+    df = pd.concat(frames, ignore_index=True)
+
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+
+    return normalize_dtypes(df)
+
+
+def read_months(path: Path, months: List[str], column: str = PARTITION_KEY) -> pd.DataFrame:
+    """
+    データファイル（またはパーティション分割データセット）から指定した年月の行だけを読み込む
+
+    パーティション分割データセットは対象の年月のパーティションだけを開く。
+    統合ファイルは年月ごとに少しずつ読み、対象の年月の行だけを残す
+    （ファイル全体をメモリに載せない）。
+
+    Args:
+        path: データファイルのパス、またはパーティション分割データセットのルートディレクトリ
+        months: 読み込む年月のリスト（例: ['2025-11']）
+        column: 年月の列
+
+    Returns:
+        DataFrame（対象の年月の行が無ければ空のDataFrame）
+    """
+    path = Path(path)
+    if path.is_dir():
+        return read_partitioned(path, column=column, values=months)
+
+    wanted = set(months)
+    groups = [group for value, group in iter_groups(path, column) if value in wanted]
+    return pd.concat(groups, ignore_index=True) if groups else pd.DataFrame()
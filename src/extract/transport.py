@@ -0,0 +1,409 @@
+"""
+e-Statへのリクエストの再試行・流量制御を行う共通の通信層。
+
+EStatAPIClient（API）とExtractionEngine（ファイルダウンロード）の両方が
+Transport経由でリクエストを送る。Transportはrequests.Sessionと同じ
+get()を持ち、以下を行う：
+
+- 一時的な失敗（接続エラー・タイムアウト・429/5xx）の再試行
+  （ジッター付き指数バックオフ、Retry-Afterヘッダーがあればその秒数を待つ）
+- 再試行全体の待ち時間の上限（1リクエストの最悪の所要時間を見積もれるようにする）
+- ホスト単位の同時接続数の上限・レート制限
+- サーキットブレーカー（同じホストで失敗が続いた場合、一定時間リクエストを
+  送らずに即座に失敗させ、障害中のe-Statに再試行を集中させない）
+"""
+
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, Type
+from urllib.parse import urlparse
+
+import requests
+
+from concurrent_download import RateLimiter
+
+
+# 再試行する最大回数（初回を含む）
+DEFAULT_MAX_ATTEMPTS = 5
+
+# バックオフの基準秒数（n回目の再試行の待ち時間は最大 BACKOFF_BASE * 2**n 秒）
+DEFAULT_BACKOFF_BASE = 1.0
+
+# 1回の待ち時間の上限（秒）
+DEFAULT_BACKOFF_MAX = 60.0
+
+# 1リクエストあたりの再試行の待ち時間の合計の上限（秒）
+DEFAULT_RETRY_BUDGET = 300.0
+
+# 再試行するHTTPステータス
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# ホストあたりの同時接続数の上限
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 4
+
+# サーキットブレーカーを開く連続失敗回数（再試行を使い切ったリクエストの件数）
+DEFAULT_FAILURE_THRESHOLD = 5
+
+# サーキットブレーカーを開いてから試行を再開するまでの秒数
+DEFAULT_RESET_TIMEOUT = 60.0
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """サーキットブレーカーが開いているためリクエストを送らなかった"""
+
+
+@dataclass
+class RetryPolicy:
+    """
+    再試行の設定
+
+    Attributes:
+        max_attempts: 最大試行回数（初回を含む）
+        backoff_base: バックオフの基準秒数
+        backoff_max: 1回の待ち時間の上限（秒）
+        retry_budget: 再試行の待ち時間の合計の上限（秒）
+        status_codes: 再試行するHTTPステータス
+    """
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    backoff_base: float = DEFAULT_BACKOFF_BASE
+    backoff_max: float = DEFAULT_BACKOFF_MAX
+    retry_budget: float = DEFAULT_RETRY_BUDGET
+    status_codes: frozenset = RETRY_STATUS_CODES
+
+    def backoff(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """
+        再試行までの待ち時間を返す
+
+        指数バックオフの範囲内で一様に選ぶ（フルジッター）ことで、
+        並列のダウンロードが同時に再試行しないようにする。
+        Retry-Afterが指定されていればそれより短くはしない。
+
+        Args:
+            retry: 何回目の再試行か（0始まり）
+            retry_after: サーバーが指定した待ち時間（秒）
+
+        Returns:
+            待ち時間（秒）
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** retry))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_budget))
+        return delay
+
+    def next_delay(self, attempt: int, waited: float, retry_after: Optional[float] = None) -> Optional[float]:
+        """
+        attempt回目（0始まり）の試行が失敗した後の待ち時間を返す
+
+        Args:
+            attempt: 失敗した試行の番号（0始まり）
+            waited: これまでの待ち時間の合計（秒）
+            retry_after: サーバーが指定した待ち時間（秒）
+
+        Returns:
+            待ち時間（秒）、試行回数・待ち時間の上限に達した場合はNone
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+        delay = self.backoff(attempt, retry_after)
+        if waited + delay > self.retry_budget:
+            return None
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Retry-Afterヘッダー（秒数またはHTTP日付）を秒数に変換する
+
+    Args:
+        value: ヘッダーの値
+
+    Returns:
+        待ち時間（秒）、解釈できない場合はNone
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class CircuitBreaker:
+    """
+    ホスト単位のサーキットブレーカー
+
+    連続失敗がfailure_threshold回に達すると開き（open）、reset_timeout秒の間は
+    リクエストを拒否する。経過後は1件だけ試行を許し（half-open）、成功すれば閉じ、
+    失敗すれば再び開く。
+
+    失敗は1リクエスト（再試行を使い切ったもの）につき1回だけ記録する
+    （Transportは途中の再試行を失敗として数えない）。このため閾値は
+    RetryPolicy.max_attemptsとは独立に、失敗したリクエストの件数として決められる。
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT
+    ):
+        """
+        Args:
+            failure_threshold: ブレーカーを開く連続失敗回数
+            reset_timeout: 開いてから試行を再開するまでの秒数
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures: Dict[str, int] = {}
+        self._opened_at: Dict[str, float] = {}
+        self._trial: Dict[str, bool] = {}
+
+    def before_request(self, host: str) -> bool:
+        """
+        リクエストを送ってよいか確認する
+
+        Returns:
+            half-openの試行として許可された場合はTrue
+            （結果をrecord_success / record_failure / release_trialで必ず記録する）
+
+        Raises:
+            CircuitOpenError: ブレーカーが開いている場合
+        """
+        with self._lock:
+            opened_at = self._opened_at.get(host)
+            if opened_at is None:
+                return False
+
+            remaining = opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self._trial.get(host):
+                raise CircuitOpenError(
+                    f"{host} への失敗が続いているためリクエストを停止中です（残り{max(remaining, 0):.0f}秒）"
+                )
+
+            # 試行を1件だけ許可する（half-open）
+            self._trial[host] = True
+            return True
+
+    def record_success(self, host: str):
+        """成功を記録する（ブレーカーを閉じる）"""
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened_at.pop(host, None)
+            self._trial.pop(host, None)
+
+    def record_failure(self, host: str):
+        """失敗を記録する（連続失敗が閾値に達したらブレーカーを開く）"""
+        with self._lock:
+            self._failures[host] = self._failures.get(host, 0) + 1
+            if self._trial.pop(host, False) or self._failures[host] >= self.failure_threshold:
+                self._opened_at[host] = time.monotonic()
+
+    def release_trial(self, host: str):
+        """
+        half-openの試行を失敗として数えずに解放する
+
+        ホストの障害ではない理由（KeyboardInterrupt・不正なURL等）で試行が
+        中断した場合に使う。ブレーカーは開いたままで、次のリクエストが改めて試行になる。
+        """
+        with self._lock:
+            self._trial.pop(host, None)
+
+    def is_open(self, host: str) -> bool:
+        """ブレーカーが開いているかどうか"""
+        with self._lock:
+            return host in self._opened_at
+
+
+class Transport:
+    """
+    再試行・同時接続数制限・サーキットブレーカー付きのHTTP通信
+
+    requests.Sessionと同じget()を持つため、セッションを受け取る関数
+    （HTTPCache.fetch、stream_to_file等）にそのまま渡せる。
+
+    Attributes:
+        session: 実際に通信を行うHTTPセッション
+        policy: 再試行の設定
+        breaker: サーキットブレーカー
+        rate_limiter: ホスト単位のレート制限（Noneなら制限しない）
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        policy: Optional[RetryPolicy] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Args:
+            session: HTTPセッション（省略時は新規作成）
+            policy: 再試行の設定
+            breaker: サーキットブレーカー（複数のTransportで共有できる）
+            rate_limiter: ホスト単位のレート制限（各試行の前に待機する）
+            max_connections_per_host: ホストあたりの同時接続数の上限
+            sleep: 待機に使う関数（テスト用に差し替え可能）
+        """
+        self.session = session or requests.Session()
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.rate_limiter = rate_limiter
+        self.max_connections_per_host = max_connections_per_host
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+
+    def _slots(self, host: str) -> threading.BoundedSemaphore:
+        """ホストの同時接続数を制限するセマフォを返す"""
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_connections_per_host)
+            return self._host_slots[host]
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GETリクエストを送る（一時的な失敗は再試行する）"""
+        return self.request('GET', url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        リクエストを送る（一時的な失敗は再試行する）
+
+        再試行するステータスで試行回数・待ち時間の上限に達した場合は、
+        最後のレスポンスをそのまま返す（呼び出し側のraise_for_status()で例外になる）。
+
+        Args:
+            method: HTTPメソッド
+            url: リクエストURL
+            **kwargs: requests.Session.request()の引数
+
+        Returns:
+            レスポンス（stream=Trueの場合、close()するまで同時接続数の枠を使う）
+
+        Raises:
+            CircuitOpenError: サーキットブレーカーが開いている場合
+            requests.exceptions.RequestException: 再試行しても接続できなかった場合
+        """
+        host = urlparse(url).netloc
+        waited = 0.0
+
+        for attempt in range(self.policy.max_attempts):
+            trial = self.breaker.before_request(host)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(host)
+
+            slots = self._slots(host)
+            slots.acquire()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                slots.release()
+                delay = self.policy.next_delay(attempt, waited, None)
+                # 失敗は再試行を使い切ったリクエストにつき1回だけ数える
+                # （half-openの試行が失敗した場合はすぐにブレーカーを開き直す）
+                if delay is None or trial:
+                    self.breaker.record_failure(host)
+                if delay is None:
+                    raise
+                print(f"  ⚠ 通信エラーのため{delay:.1f}秒後に再試行します（{attempt + 1}/{self.policy.max_attempts}）: {e}")
+                self._sleep(delay)
+                waited += delay
+                continue
+            except BaseException:
+                slots.release()
+                # ホストの障害ではないため失敗として数えず、half-openの試行枠だけを解放する
+                if trial:
+                    self.breaker.release_trial(host)
+                raise
+
+            if response.status_code not in self.policy.status_codes:
+                self.breaker.record_success(host)
+                return self._release_on_close(response, slots, kwargs.get('stream', False))
+
+            delay = self.policy.next_delay(attempt, waited, parse_retry_after(response.headers.get('Retry-After')))
+            if delay is None or trial:
+                self.breaker.record_failure(host)
+            if delay is None:
+                return self._release_on_close(response, slots, kwargs.get('stream', False))
+
+            response.close()
+            slots.release()
+            print(f"  ⚠ HTTP {response.status_code} のため{delay:.1f}秒後に再試行します（{attempt + 1}/{self.policy.max_attempts}）")
+            self._sleep(delay)
+            waited += delay
+
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _release_on_close(
+        response: requests.Response,
+        slots: threading.BoundedSemaphore,
+        stream: bool
+    ) -> requests.Response:
+        """同時接続数の枠を、ストリーミングならレスポンスのclose()時、それ以外は即座に返す"""
+        if not stream:
+            slots.release()
+            return response
+
+        close = response.close
+        released = threading.Event()
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if not released.is_set():
+                    released.set()
+                    slots.release()
+
+        response.close = close_and_release
+        return response
+
+    def call(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        retry_on: Tuple[Type[BaseException], ...] = (requests.exceptions.ChunkedEncodingError,),
+        **kwargs
+    ) -> Any:
+        """
+        転送途中で切断される等、fnの途中で起きた一時的な失敗を再試行する
+
+        リクエスト自体の再試行はget()が行うため、ここではレスポンス本体の
+        受信中の失敗（retry_on）だけを対象にする。ダウンロードは中断した位置から
+        再開されるため、再試行で取得するのは残りの部分だけになる。
+
+        Args:
+            fn: 実行する関数
+            *args: fnの引数
+            retry_on: 再試行する例外
+            **kwargs: fnのキーワード引数
+
+        Returns:
+            fnの戻り値
+        """
+        waited = 0.0
+        for attempt in range(self.policy.max_attempts):
+            try:
+                return fn(*args, **kwargs)
+            except retry_on as e:
+                delay = self.policy.next_delay(attempt, waited, None)
+                if delay is None:
+                    raise
+                print(f"  ⚠ 転送が中断したため{delay:.1f}秒後に再開します（{attempt + 1}/{self.policy.max_attempts}）: {e}")
+                self._sleep(delay)
+                waited += delay
+
+        raise AssertionError("unreachable")
+
+    def close(self):
+        """HTTPセッションを閉じる"""
+        self.session.close()
@@ -0,0 +1,131 @@
+"""
+毎勤原表（.xls）の高速パーサー。
+
+pd.read_excelでシート全体をオブジェクト型のDataFrameとして読み込んでから
+行のスライス・列ごとの数値変換を行う代わりに、xlrdのセル配列から
+データ範囲だけを取り出し、あらかじめ確保したNumPy配列に直接格納する。
+
+結果はpd.read_excel(header=None)を使った従来の処理と同じになるようにしている：
+- 先頭6行（ヘッダー）と7行目（単位行）を除いた行をデータとする
+- コード列は整数値のセルを int、文字列はそのまま、空セルは NaN とする
+- 数値列は数値セル（および数値として解釈できる文字列）以外を NaN とし、
+  全ての値が整数で欠損が無い列は int64、それ以外は float64 とする
+- 数値列が全て NaN の行は削除する
+"""
+
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pandas as pd
+import xlrd
+
+
+# シート先頭のヘッダー（6行）と単位行（1行）
+HEADER_ROWS = 7
+
+# 先頭のコード列の数（産業コード・性別・就業形態）
+CODE_COLUMN_COUNT = 3
+
+# 空とみなすセル種別
+_EMPTY_TYPES = (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK)
+
+
+def _code_column(values: list, types: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """コード列（産業コード等）をオブジェクト配列として取り出す"""
+    out = np.empty(len(rows), dtype=object)
+    for i, (row, cell_type) in enumerate(zip(rows, types[rows])):
+        value = values[row]
+        if cell_type in _EMPTY_TYPES:
+            out[i] = np.nan
+        elif cell_type == xlrd.XL_CELL_NUMBER and float(value).is_integer():
+            out[i] = int(value)
+        else:
+            out[i] = value
+    return out
+
+
+def _numeric_column(values: list, types: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """数値列をfloat64配列として取り出す（数値以外はNaN）"""
+    out = np.full(len(rows), np.nan)
+    row_types = types[rows]
+
+    number_positions = np.flatnonzero(row_types == xlrd.XL_CELL_NUMBER)
+    out[number_positions] = np.fromiter(
+        (values[row] for row in rows[number_positions]),
+        dtype=np.float64,
+        count=len(number_positions)
+    )
+
+    # 文字列として保存された数値（まれ）は個別に変換を試みる
+    for position in np.flatnonzero(row_types == xlrd.XL_CELL_TEXT):
+        try:
+            out[position] = float(values[rows[position]])
+        except ValueError:
+            pass
+
+    return out
+
+
+def read_actual_wages_sheet(excel_path: Path, column_names: List[str]) -> pd.DataFrame:
+    """
+    毎勤原表Excelファイルの先頭シートをDataFrameに変換する
+
+    Args:
+        excel_path: Excelファイルのパス
+        column_names: 列名（先頭CODE_COLUMN_COUNT列がコード列、残りが数値列）
+
+    Returns:
+        処理済みDataFrame
+
+    Raises:
+        ValueError: シートの列数がcolumn_namesと一致しない場合
+    """
+    book = xlrd.open_workbook(str(excel_path), on_demand=True)
+
+    try:
+        sheet = book.sheet_by_index(0)
+
+        if sheet.ncols != len(column_names):
+            raise ValueError(
+                f"列数が想定と異なります: {sheet.ncols}列（想定: {len(column_names)}列）"
+            )
+
+        print(f"  ✓ 読み込み完了: {sheet.nrows}行 x {sheet.ncols}列")
+
+        # セル種別の行列（列 x 行）
+        types = np.array(
+            [sheet.col_types(col) for col in range(sheet.ncols)],
+            dtype=np.int8
+        ).reshape(sheet.ncols, sheet.nrows)
+        rows = np.arange(HEADER_ROWS, sheet.nrows)
+
+        columns = {}
+        numeric_names = column_names[CODE_COLUMN_COUNT:]
+
+        for col, name in enumerate(column_names):
+            values = sheet.col_values(col)
+            if col < CODE_COLUMN_COUNT:
+                columns[name] = _code_column(values, types[col], rows)
+            else:
+                columns[name] = _numeric_column(values, types[col], rows)
+    finally:
+        book.release_resources()
+
+    # 数値列が全てNaNの行を削除
+    if len(rows):
+        keep = ~np.logical_and.reduce([np.isnan(columns[name]) for name in numeric_names])
+    else:
+        keep = np.zeros(0, dtype=bool)
+
+    for name in numeric_names:
+        values = columns[name]
+        # 欠損が無く全て整数の列は整数型（pd.to_numericと同じ判定）
+        if len(values) and not np.isnan(values).any() and np.array_equal(values, np.floor(values)):
+            values = values.astype(np.int64)
+        columns[name] = values[keep]
+
+    for name in column_names[:CODE_COLUMN_COUNT]:
+        columns[name] = columns[name][keep]
+
+    return pd.DataFrame(columns, columns=column_names)